@@ -12,13 +12,21 @@ This script:
 4. Opens both files for review
 
 For custom discount rate: python analyze_leases.py --rate 0.10
+To keep the reports current as leases arrive: python src/lease_service.py --output-dir output
+
+The pipeline runs in this process. With the package installed
+(``pip install .``) the same run is ``spiceflow --output-dir output``.
 """
 
-import subprocess
 import sys
-import os
 from pathlib import Path
 
+try:
+    import process_leases
+except ImportError:  # source checkout without ``pip install .``
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+    import process_leases
+
 def main():
     # Default discount rate (fixed at 10% unless overridden)
     discount_rate = 0.10
@@ -38,17 +46,14 @@ def main():
     print("🚀 SpiceFlow Lease Analyzer")
     print("=" * 40)
     
-    # Run the main processing script
-    cmd = [
-        sys.executable, 
-        'src/process_leases.py',
+    # Run the processing pipeline in-process
+    argv = [
         '--discount-rate', str(discount_rate),
         '--output-dir', 'output'
     ]
     
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
+        process_leases.main(argv)
         
         # Check if files were created and offer to open them
         summary_file = Path('output/lease_summary.md')
@@ -61,11 +66,8 @@ def main():
             print("   - Read report: open output/executive_report.md")
             print("   - Edit discount rate: python scripts/analyze_leases.py --rate 0.10")
         
-    except subprocess.CalledProcessError as e:
+    except Exception as e:
         print(f"❌ Error running analysis: {e}")
-        print("Error output:", e.stderr)
-    except FileNotFoundError:
-        print("❌ Could not find src/process_leases.py - run from repo root directory")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
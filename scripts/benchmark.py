@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+SpiceFlow Performance Benchmarks
+================================
+
+Times the hot paths of the valuation stack on synthetic portfolios.
+
+Usage:
+    python scripts/benchmark.py valuation --sizes 10000 1000000
+    python scripts/benchmark.py irr --sizes 100000
+    python scripts/benchmark.py extraction --text-kb 256 1024
+    python scripts/benchmark.py simulation --leases 1000 --paths 10000 --workers 4
+    python scripts/benchmark.py document --repeat 5
+
+    python scripts/benchmark.py --save-baseline tests/benchmarks/baseline.json
+    python scripts/benchmark.py --compare tests/benchmarks/baseline.json --threshold 0.25
+
+Each benchmark prints wall-clock time for the reference (per-lease) path and
+the vectorised path, plus the speed-up. Per-lease timings above
+``--scalar-limit`` leases are extrapolated from a sample so 1M-lease runs
+finish in seconds. Every timing is the best of ``--repeat`` runs.
+
+``--save-baseline`` writes the timings as JSON; ``--compare`` re-runs the
+benchmarks recorded in a baseline and exits non-zero when any is more than
+``--threshold`` slower. Baselines are machine-specific: regenerate the
+committed one when the benchmark hardware changes. Everything runs offline
+(credit lookups are mocked). For per-function statistics see the
+pytest-benchmark suite in tests/benchmarks/.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from document_extractor import extract_lease_data_from_text
+from irr import lease_cash_flow_matrix, solve_irr
+from lease_valuation import LeaseParams, pv_buyout, pv_buyout_batch
+from process_leases import calculate_irr, find_documents, process_lease_document
+from risk_simulation import LeaseRisk, simulate_portfolio
+
+
+def synthetic_portfolio(n: int, seed: int = 42) -> dict:
+    """Columnar lease book with realistic ranges for rent, term and rates."""
+    rng = np.random.default_rng(seed)
+    return {
+        'annual_rent': rng.uniform(5_000, 500_000, n).round(),
+        'term_years': rng.integers(15, 46, n),
+        'escalator': rng.choice([0.0, 0.01, 0.015, 0.02, 0.025], n),
+        'discount_rate': rng.choice([0.08, 0.10, 0.12], n),
+        'buyout_pct': np.full(n, 0.85),
+        'balloon_cost': rng.choice([0.0, 25_000.0], n, p=[0.8, 0.2]),
+    }
+
+
+REPEAT = 1  # set from --repeat
+MIN_COMPARABLE_SECONDS = 0.005  # faster timings are timer noise; never flagged
+
+
+def _time(fn) -> float:
+    """Best wall-clock time of ``REPEAT`` calls."""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_valuation(args, results: Dict[str, float]):
+    """Compare per-lease ``pv_buyout`` calls with ``pv_buyout_batch``."""
+    print("📈 pv_buyout vs pv_buyout_batch")
+    print(f"{'leases':>10} | {'scalar (s)':>11} | {'batch (s)':>10} | {'speed-up':>8}")
+    for n in args.sizes:
+        book = synthetic_portfolio(n)
+        sample = min(n, args.scalar_limit)
+
+        def scalar():
+            for i in range(sample):
+                pv_buyout(
+                    annual_rent=float(book['annual_rent'][i]),
+                    term_years=int(book['term_years'][i]),
+                    escalator=float(book['escalator'][i]),
+                    discount_rate=float(book['discount_rate'][i]),
+                    buyout_pct=float(book['buyout_pct'][i]),
+                    balloon_cost=float(book['balloon_cost'][i]),
+                )
+
+        scalar_s = _time(scalar) * n / sample
+        batch_s = _time(lambda: pv_buyout_batch(**book))
+        note = "" if sample == n else " (extrapolated)"
+        print(f"{n:>10,} | {scalar_s:>11.3f} | {batch_s:>10.3f} | {scalar_s / batch_s:>7.0f}x{note}")
+        results[f'valuation.scalar[{n}]'] = scalar_s
+        results[f'valuation.batch[{n}]'] = batch_s
+
+
+def bench_irr(args, results: Dict[str, float]):
+    """Compare per-lease ``calculate_irr`` calls with one ``solve_irr`` pass."""
+    print("📈 calculate_irr vs solve_irr")
+    print(f"{'leases':>10} | {'scalar (s)':>11} | {'batch (s)':>10} | {'speed-up':>8}")
+    for n in args.sizes:
+        book = synthetic_portfolio(n)
+        offers = pv_buyout_batch(**book)
+        cash_flows = lease_cash_flow_matrix(offers, book['annual_rent'], book['term_years'], book['escalator'])
+        sample = min(n, args.scalar_limit // 10)
+
+        def scalar():
+            for i in range(sample):
+                calculate_irr(cash_flows[i, :book['term_years'][i] + 1].tolist())
+
+        scalar_s = _time(scalar) * n / sample
+        batch_s = _time(lambda: solve_irr(cash_flows))
+        note = "" if sample == n else " (extrapolated)"
+        print(f"{n:>10,} | {scalar_s:>11.3f} | {batch_s:>10.3f} | {scalar_s / batch_s:>7.0f}x{note}")
+        results[f'irr.scalar[{n}]'] = scalar_s
+        results[f'irr.batch[{n}]'] = batch_s
+
+
+LEASE_HEADER = (
+    "This lease is for a term of 25 years. The annual rent shall be $95,680. "
+    "Rent shall escalate at 2.5% annually. The premises consist of 36.8 acres "
+    "located in Kendall County, Illinois. Lessee: Lanceleaf Solar LLC. "
+)
+BOILERPLATE = (
+    "The lessee shall maintain the premises in good repair and comply with all applicable laws. "
+    "Notices shall be delivered to the addresses set forth herein. "
+)
+# Keywords with no completing value: worst case for lazy cross-sentence spans
+ADVERSARIAL = "rent term payment lessee $100 acres escalation increase county state located expires lease "
+
+
+def synthetic_text(size: int, filler: str, header: str = "") -> str:
+    """Lease text of ``size`` characters: header followed by repeated filler."""
+    body = filler * (size // len(filler) + 1)
+    return (header + body)[:size]
+
+
+def bench_extraction(args, results: Dict[str, float]):
+    """Time ``extract_lease_data_from_text`` on growing synthetic texts."""
+    print("📈 extract_lease_data_from_text scaling")
+    print(f"{'text (KB)':>10} | {'lease (s)':>10} | {'adversarial (s)':>15} | {'adv. s/MB':>9}")
+    for kb in args.text_kb:
+        size = kb * 1024
+        lease = synthetic_text(size, BOILERPLATE, LEASE_HEADER)
+        adversarial = synthetic_text(size, ADVERSARIAL)
+        lease_s = _time(lambda: extract_lease_data_from_text(lease, 'synthetic'))
+        adv_s = _time(lambda: extract_lease_data_from_text(adversarial, 'adversarial'))
+        print(f"{kb:>10,} | {lease_s:>10.3f} | {adv_s:>15.3f} | {adv_s / (size / 2**20):>9.2f}")
+        results[f'extraction.lease[{kb}KB]'] = lease_s
+        results[f'extraction.adversarial[{kb}KB]'] = adv_s
+
+
+def bench_simulation(args, results: Dict[str, float]):
+    """Time ``simulate_portfolio`` in-process and across worker processes."""
+    book = synthetic_portfolio(args.leases)
+    tiers = np.random.default_rng(7).choice(['low', 'medium', 'high'], args.leases)
+    leases = [
+        LeaseRisk(
+            LeaseParams(float(rent), int(term), float(esc)),
+            risk_tier=str(tier),
+            termination_year=15.75 if i % 3 == 0 else None,
+            renewal_terms=2,
+            renewal_years=5,
+            cpi_linked=i % 4 == 0,
+        )
+        for i, (rent, term, esc, tier) in enumerate(
+            zip(book['annual_rent'], book['term_years'], book['escalator'], tiers))
+    ]
+    print(f"📈 simulate_portfolio: {args.leases:,} leases x {args.paths:,} paths")
+    print(f"{'workers':>10} | {'time (s)':>10}")
+    for workers in sorted({1, args.workers}):
+        seconds = _time(lambda: simulate_portfolio(leases, n_paths=args.paths, seed=1, workers=workers))
+        print(f"{workers:>10} | {seconds:>10.3f}")
+        results[f'simulation[{args.leases}x{args.paths},workers={workers}]'] = seconds
+
+
+def bench_document(args, results: Dict[str, float]):
+    """Time ``process_lease_document`` over a folder with credit lookups mocked."""
+    documents = find_documents(Path(args.documents))
+    print(f"📈 process_lease_document: {len(documents)} documents in {args.documents}")
+    print(f"{'document':>40} | {'time (s)':>10}")
+
+    def fake_credit(name):
+        return {'company_name': name, 'risk_tier': 'medium', 'data_sources': ['Benchmark']}
+
+    total = 0.0
+    with patch('process_leases.quick_lookup', side_effect=fake_credit), \
+            open(os.devnull, 'w') as quiet:
+        for path in documents:
+            stdout, sys.stdout = sys.stdout, quiet
+            try:
+                seconds = _time(lambda: process_lease_document(path))
+            finally:
+                sys.stdout = stdout
+            total += seconds
+            print(f"{path.name[:40]:>40} | {seconds:>10.4f}")
+    print(f"{'total':>40} | {total:>10.4f}")
+    results['document.total'] = total
+
+
+BENCHMARKS = {
+    'valuation': bench_valuation,
+    'irr': bench_irr,
+    'extraction': bench_extraction,
+    'simulation': bench_simulation,
+    'document': bench_document,
+}
+
+
+def save_baseline(path: Path, args, results: Dict[str, float]):
+    """Write timings plus the arguments and machine that produced them."""
+    payload = {
+        'machine': platform.machine(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'args': {k: v for k, v in vars(args).items() if k not in ('save_baseline', 'compare')},
+        'results': results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def compare(baseline: Dict[str, float], results: Dict[str, float], threshold: float) -> bool:
+    """Print current vs baseline timings; False when any is over ``threshold`` slower."""
+    print(f"{'benchmark':>44} | {'baseline (s)':>12} | {'now (s)':>10} | {'change':>8}")
+    ok = True
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f"{name:>44} | {'-':>12} | {seconds:>10.4f} | {'new':>8}")
+            continue
+        change = seconds / baseline[name] - 1
+        flag = ''
+        if max(seconds, baseline[name]) < MIN_COMPARABLE_SECONDS:
+            flag = '  (below timer resolution)'
+        elif change > threshold:
+            flag, ok = '  ❌ slower', False
+        print(f"{name:>44} | {baseline[name]:>12.4f} | {seconds:>10.4f} | {change:>+8.0%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SpiceFlow hot paths')
+    parser.add_argument('benchmark', nargs='*',
+                        help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000],
+                        help='Portfolio sizes to benchmark')
+    parser.add_argument('--scalar-limit', type=int, default=20_000,
+                        help='Max leases timed on the per-lease path before extrapolating')
+    parser.add_argument('--text-kb', type=int, nargs='+', default=[128, 256, 512, 1024],
+                        help='Synthetic lease text sizes in KB for the extraction benchmark')
+    parser.add_argument('--leases', type=int, default=1_000, help='Leases in the simulation benchmark')
+    parser.add_argument('--paths', type=int, default=10_000, help='Paths in the simulation benchmark')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for the simulation benchmark (default: all cores)')
+    parser.add_argument('--documents', default='data/leases/',
+                        help='Folder for the document benchmark (default: data/leases/)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per timing; the best is kept (default: 3)')
+    parser.add_argument('--save-baseline', metavar='PATH', help='Write the timings to a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='Re-run the benchmarks of a baseline file and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slow-down for --compare as a fraction (default: 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        # Same sizes as the baseline, so the timings are comparable
+        for key, value in baseline['args'].items():
+            if key not in ('benchmark', 'threshold') and value is not None:
+                setattr(args, key, value)
+        if not args.benchmark:
+            args.benchmark = baseline['args']['benchmark']
+    if not args.benchmark:
+        args.benchmark = list(BENCHMARKS)
+
+    unknown = set(args.benchmark) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+
+    global REPEAT
+    REPEAT = args.repeat
+    results: Dict[str, float] = {}
+    for name in args.benchmark:
+        BENCHMARKS[name](args, results)
+        print()
+
+    if args.save_baseline:
+        save_baseline(Path(args.save_baseline), args, results)
+        print(f"💾 Baseline saved: {args.save_baseline}")
+    if baseline is not None:
+        print(f"📊 Compared with {args.compare} (threshold {args.threshold:+.0%})")
+        if not compare(baseline['results'], results, args.threshold):
+            print("❌ Performance regression")
+            sys.exit(1)
+        print("✅ No regressions")
+
+
+if __name__ == '__main__':
+    main()
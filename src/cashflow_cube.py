@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+"""Memory-mapped lease × year cash-flow cube for portfolio analytics.
+
+Usage
+-----
+    python src/cashflow_cube.py output/cashflow_cube --risk-tier low --years 1 10
+    python src/cashflow_cube.py output/cashflow_cube --state Illinois --discount-rate 0.08
+
+Row ``i`` of the cube is lease ``i``'s yearly rent over its valuation term
+(the ``LeaseParams.cash_flows`` stream), column ``j`` is valuation year
+``j + 1``. Years are relative, not calendar years: the cube holds no start
+dates, so year 1 is every lease's first year of rent from the run. The
+matrix is an ``.npy`` file opened with ``np.lib.format.open_memmap``, next
+to a small ``.npy`` of per-row inputs (rent, escalator, term, tier and
+state codes) and a JSON sidecar with the lease names, their
+``deal_store.lease_keys`` and the code pools, so opening a cube of millions
+of leases reads only the sidecar.
+
+``update`` diffs a run against the stored inputs: changed leases have their
+row rewritten in place, new ones are appended and missing ones are removed
+by moving the last row into their slot. The sidecar is marked incomplete
+while rows are being written, and a cube left incomplete by a crash is
+rebuilt from scratch on the next open.
+
+``select`` picks rows by risk tier or state and a range of years. A year
+range is a view of the mapped file; filtered rows are read a chunk at a time
+by the reductions, so calendars, present values, duration and convexity
+never hold more than ``CHUNK_ROWS`` rows in memory.
+
+>>> with CashFlowCube.open("output/cashflow_cube") as cube:
+...     cube.update(book)
+...     low = cube.select(risk_tier="low", years=(1, 10))
+...     low.calendar(), low.present_value(0.10), low.duration(0.10)
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from deal_store import lease_keys, state_of
+from extraction_cache import replace_file
+from lease_book import LeaseBook, StringPool
+
+__all__ = [
+    "CashFlowCube",
+    "CubeChanges",
+    "CubeSlice",
+    "DEFAULT_CUBE_DIR",
+]
+
+CUBE_VERSION = 2  # 1 had no lease keys and is rebuilt
+DEFAULT_CUBE_DIR = "cashflow_cube"
+DEFAULT_HORIZON = 50  # years; widened automatically for longer terms
+MIN_CAPACITY = 1024
+CHUNK_ROWS = 16384
+
+ROW_DTYPE = np.dtype([
+    ("annual_rent", np.float64),
+    ("escalator", np.float64),
+    ("term", np.int32),  # valuation term: total potential term when known
+    ("risk_tier", np.int32),  # -1 when unknown
+    ("state", np.int32),
+])
+
+CubeChanges = namedtuple("CubeChanges", ["added", "changed", "removed"])
+
+
+def _cash_flows(params: np.ndarray, horizon: int) -> np.ndarray:
+    """Yearly rents for a block of rows, zero after each lease's term."""
+    years = np.arange(horizon)
+    flows = params["annual_rent"][:, None] * (1.0 + params["escalator"][:, None]) ** years
+    flows[years >= params["term"][:, None]] = 0.0
+    return flows
+
+
+def _matching_codes(pool: StringPool, value: str) -> List[int]:
+    """Pool codes equal to ``value``, ignoring case."""
+    return [code for code, v in enumerate(pool.values) if v.lower() == value.lower()]
+
+
+class CubeSlice:
+    """Rows and years of a cube; reductions stream over the mapped file."""
+
+    def __init__(self, flows: np.ndarray, rows: Union[slice, np.ndarray], years: slice,
+                 names: List[str]):
+        self._flows = flows
+        self._rows = rows
+        self._years = years
+        self._names = names
+
+    def __len__(self) -> int:
+        if isinstance(self._rows, slice):
+            return self._rows.stop - self._rows.start
+        return len(self._rows)
+
+    @property
+    def years(self) -> np.ndarray:
+        """Valuation year of each column (1 = first year's rent)."""
+        return np.arange(self._years.start, self._years.stop) + 1
+
+    @property
+    def names(self) -> List[str]:
+        """Lease names of the selected rows, in row order."""
+        if isinstance(self._rows, slice):
+            return self._names[self._rows]
+        return [self._names[i] for i in self._rows]
+
+    def values(self) -> np.ndarray:
+        """The selected cash flows: a view when no rows are filtered out, else a copy."""
+        return self._flows[self._rows, self._years]
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        """Blocks of at most ``CHUNK_ROWS`` selected rows (views for unfiltered slices)."""
+        if isinstance(self._rows, slice):
+            for start in range(self._rows.start, self._rows.stop, CHUNK_ROWS):
+                stop = min(start + CHUNK_ROWS, self._rows.stop)
+                yield self._flows[start:stop, self._years]
+            return
+        for start in range(0, len(self._rows), CHUNK_ROWS):
+            yield self._flows[self._rows[start:start + CHUNK_ROWS], self._years]
+
+    def calendar(self) -> np.ndarray:
+        """Total cash flow in each selected year."""
+        total = np.zeros(len(self.years))
+        for block in self.chunks():
+            total += block.sum(axis=0)
+        return total
+
+    def discount_factors(self, discount_rate: float) -> np.ndarray:
+        """End-of-year discount factors for the selected years."""
+        return 1 / (1 + discount_rate) ** self.years
+
+    def present_value(self, discount_rate: float) -> float:
+        """Discounted total of the selected cash flows."""
+        return float(self.calendar() @ self.discount_factors(discount_rate))
+
+    def present_values(self, discount_rate: float) -> np.ndarray:
+        """Discounted total per selected lease."""
+        factors = self.discount_factors(discount_rate)
+        parts = [block @ factors for block in self.chunks()]
+        return np.concatenate(parts) if parts else np.zeros(0)
+
+    def duration(self, discount_rate: float, modified: bool = False) -> float:
+        """Macaulay duration in years (``modified=True``: divided by 1 + rate)."""
+        weighted = self.calendar() * self.discount_factors(discount_rate)
+        pv = weighted.sum()
+        if pv == 0:
+            return 0.0
+        duration = float(self.years @ weighted / pv)
+        return duration / (1 + discount_rate) if modified else duration
+
+    def convexity(self, discount_rate: float) -> float:
+        """Convexity: second derivative of PV with respect to the rate, over PV."""
+        weighted = self.calendar() * self.discount_factors(discount_rate)
+        pv = weighted.sum()
+        if pv == 0:
+            return 0.0
+        years = self.years
+        return float((years * (years + 1)) @ weighted / (pv * (1 + discount_rate) ** 2))
+
+
+class CashFlowCube:
+    """Persisted lease × year cash-flow matrix, updated incrementally."""
+
+    def __init__(self, path: Path, readonly: bool = False):
+        self.path = Path(path)
+        self.readonly = readonly
+        self.names: List[str] = []
+        self.keys: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._pools = {"risk_tier": StringPool(), "state": StringPool()}
+        self._flows: Optional[np.ndarray] = None
+        self._params: Optional[np.ndarray] = None
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.path / "cube.json"
+
+    @property
+    def _flows_path(self) -> Path:
+        return self.path / "flows.npy"
+
+    @property
+    def _params_path(self) -> Path:
+        return self.path / "rows.npy"
+
+    @classmethod
+    def open(cls, path: Path, readonly: bool = False,
+             horizon: int = DEFAULT_HORIZON) -> "CashFlowCube":
+        """Open a cube; a missing, old or incomplete one starts empty.
+
+        ``readonly=True`` maps the files read-only and raises
+        ``FileNotFoundError`` when there is no complete cube at ``path``.
+        """
+        cube = cls(path, readonly)
+        if cube._load():
+            return cube
+        if readonly:
+            raise FileNotFoundError(f"No complete cash-flow cube at {path}")
+        cube.path.mkdir(parents=True, exist_ok=True)
+        cube._allocate(MIN_CAPACITY, horizon)
+        cube._save_meta()
+        return cube
+
+    def _load(self) -> bool:
+        try:
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if meta.get("version") != CUBE_VERSION or not meta.get("complete"):
+            return False
+        mode = "r" if self.readonly else "r+"
+        try:
+            flows = np.lib.format.open_memmap(self._flows_path, mode=mode)
+            params = np.lib.format.open_memmap(self._params_path, mode=mode)
+        except (FileNotFoundError, ValueError):
+            return False
+        if flows.shape[0] != params.shape[0] or params.dtype != ROW_DTYPE or len(meta["names"]) > len(params):
+            return False
+        self._flows, self._params = flows, params
+        self.names = meta["names"]
+        self.keys = meta["keys"]
+        self._index = {key: row for row, key in enumerate(self.keys)}
+        for field, values in (("risk_tier", meta["risk_tiers"]), ("state", meta["states"])):
+            for value in values:
+                self._pools[field].code(value)
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Flush and unmap the cube files."""
+        if self._flows is not None and not self.readonly:
+            self._flows.flush()
+            self._params.flush()
+        self._flows = self._params = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def horizon(self) -> int:
+        """Number of year columns."""
+        return self._flows.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of cash flows in use (the file may hold spare rows)."""
+        return len(self) * self.horizon * self._flows.itemsize
+
+    # -- storage ---------------------------------------------------------
+    def _save_meta(self, complete: bool = True):
+        payload = {
+            "version": CUBE_VERSION,
+            "complete": complete,
+            "names": self.names,
+            "keys": self.keys,
+            "risk_tiers": self._pools["risk_tier"].values,
+            "states": self._pools["state"].values,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        replace_file(tmp, self._meta_path)
+
+    def _allocate(self, capacity: int, horizon: int):
+        """(Re)create the files with room for ``capacity`` rows, keeping current rows."""
+        size = len(self)
+        staged = []
+        for path in (self._flows_path, self._params_path):
+            fd, tmp = tempfile.mkstemp(dir=self.path, prefix=f".{path.name}.", suffix=".tmp")
+            os.close(fd)
+            staged.append(tmp)
+        flows = np.lib.format.open_memmap(staged[0], mode="w+", dtype=np.float64, shape=(capacity, horizon))
+        params = np.lib.format.open_memmap(staged[1], mode="w+", dtype=ROW_DTYPE, shape=(capacity,))
+        if self._flows is not None:
+            width = self.horizon
+            for start in range(0, size, CHUNK_ROWS):
+                stop = min(start + CHUNK_ROWS, size)
+                flows[start:stop, :width] = self._flows[start:stop]
+            params[:size] = self._params[:size]
+            self.close()
+        flows.flush()
+        params.flush()
+        del flows, params
+        replace_file(staged[0], self._flows_path)
+        replace_file(staged[1], self._params_path)
+        self._flows = np.lib.format.open_memmap(self._flows_path, mode="r+")
+        self._params = np.lib.format.open_memmap(self._params_path, mode="r+")
+
+    def _reserve(self, rows: int, horizon: int):
+        """Grow the files (doubling rows) to fit ``rows`` leases of ``horizon`` years."""
+        capacity = self._flows.shape[0]
+        if rows <= capacity and horizon <= self.horizon:
+            return
+        if rows > capacity:
+            capacity = max(rows, 2 * capacity)
+        self._allocate(capacity, max(horizon, self.horizon))
+
+    def _write_rows(self, rows: np.ndarray, params: np.ndarray):
+        """Store inputs and rebuilt cash flows for ``rows``, a chunk at a time."""
+        for start in range(0, len(rows), CHUNK_ROWS):
+            chunk = rows[start:start + CHUNK_ROWS]
+            block = params[start:start + CHUNK_ROWS]
+            self._params[chunk] = block
+            self._flows[chunk] = _cash_flows(block, self.horizon)
+
+    def _remove(self, key: str):
+        """Drop one lease by moving the last row into its slot."""
+        row = self._index.pop(key)
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self._flows[row] = self._flows[last]
+            self._params[row] = self._params[last]
+            self.names[row] = self.names[last]
+            self.keys[row] = moved
+            self._index[moved] = row
+        self.names.pop()
+        self.keys.pop()
+        self._flows[last] = 0.0
+
+    # -- building --------------------------------------------------------
+    def _inputs(self, book: LeaseBook) -> np.ndarray:
+        """Per-lease cube inputs for a book, with codes from this cube's pools."""
+        params = np.zeros(len(book), dtype=ROW_DTYPE)
+        params["annual_rent"] = book.column("annual_rent")
+        params["escalator"] = book.column("escalator")
+        total_term = book.column("total_potential_term")
+        params["term"] = np.where(total_term > 0, total_term, book.column("term_years"))
+        for field, source, key in (("risk_tier", "risk_tier", None), ("state", "location", state_of)):
+            codes, values = book.encoded(source)
+            pool = self._pools[field]
+            # Trailing -1 so code -1 (None) maps to itself
+            remap = np.array([pool.code(key(v) if key else v) for v in values] + [-1], dtype=np.int32)
+            params[field] = remap[codes]
+        return params
+
+    def update(self, results) -> CubeChanges:
+        """Bring the cube in line with a run (a LeaseBook or LeaseResult objects).
+
+        Leases are matched on ``deal_store.lease_keys``, so leases sharing a
+        name keep separate rows, as in the deal store. Only rows whose rent,
+        escalator, term, tier or state changed are recomputed.
+        """
+        if self.readonly:
+            raise PermissionError(f"Cash-flow cube at {self.path} is open read-only")
+        book = results if isinstance(results, LeaseBook) else LeaseBook.from_results(results)
+        incoming = self._inputs(book)
+        names = book.column("name")
+        keys = lease_keys(names)
+        positions = {key: i for i, key in enumerate(keys)}
+
+        self._save_meta(complete=False)
+        removed = [key for key in self._index if key not in positions]
+        for key in removed:
+            self._remove(key)
+
+        kept, kept_rows, added = [], [], []
+        for key, i in positions.items():
+            row = self._index.get(key)
+            if row is None:
+                added.append(i)
+            else:
+                kept.append(i)
+                kept_rows.append(row)
+        kept_rows = np.array(kept_rows, dtype=np.int64)
+        kept = np.array(kept, dtype=np.int64)
+        added = np.array(added, dtype=np.int64)
+
+        size = len(self.names)
+        self._reserve(size + len(added), int(incoming["term"].max(initial=0)))
+        differs = self._params[kept_rows] != incoming[kept]
+        self._write_rows(kept_rows[differs], incoming[kept[differs]])
+        new_rows = np.arange(size, size + len(added))
+        self._write_rows(new_rows, incoming[added])
+        for row, i in zip(new_rows.tolist(), added.tolist()):
+            self.names.append(names[i])
+            self.keys.append(keys[i])
+            self._index[keys[i]] = row
+
+        self._flows.flush()
+        self._params.flush()
+        self._save_meta()
+        return CubeChanges(added=len(added), changed=int(differs.sum()), removed=len(removed))
+
+    # -- queries ---------------------------------------------------------
+    def select(self, risk_tier: Optional[str] = None, state: Optional[str] = None,
+               years: Optional[Tuple[int, int]] = None) -> CubeSlice:
+        """Leases in a risk tier and/or state over ``years`` (first, last), inclusive.
+
+        Tier and state match case-insensitively; the state is the last part
+        of the lease location, as in ``deal_store.state_of``.
+        """
+        size = len(self.names)
+        first, last = years if years is not None else (1, self.horizon)
+        if not 1 <= first <= last:
+            raise ValueError(f"Invalid year range {first}-{last}; years start at 1")
+        if first > self.horizon:
+            raise ValueError(f"Year {first} is past the cube's {self.horizon}-year horizon")
+        columns = slice(first - 1, min(last, self.horizon))
+
+        if risk_tier is None and state is None:
+            return CubeSlice(self._flows, slice(0, size), columns, self.names)
+        mask = np.ones(size, dtype=bool)
+        for field, value in (("risk_tier", risk_tier), ("state", state)):
+            if value is not None:
+                mask &= np.isin(self._params[field][:size], _matching_codes(self._pools[field], value))
+        return CubeSlice(self._flows, np.flatnonzero(mask), columns, self.names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cash-flow calendar and rate sensitivity from a cash-flow cube')
+    parser.add_argument('cube', help=f'Cube directory (process_leases --cashflow-cube writes <output-dir>/{DEFAULT_CUBE_DIR})')
+    parser.add_argument('--risk-tier', help='low, medium or high')
+    parser.add_argument('--state', help='State, e.g. Illinois')
+    parser.add_argument('--years', type=int, nargs=2, metavar=('FIRST', 'LAST'),
+                        help='Valuation years to include (default: all)')
+    parser.add_argument('--discount-rate', type=float, default=0.10, help='Discount rate (default: 0.10)')
+    args = parser.parse_args()
+
+    try:
+        cube = CashFlowCube.open(Path(args.cube), readonly=True)
+    except FileNotFoundError as e:
+        print(f"❌ {e} - run process_leases.py --cashflow-cube first")
+        return
+
+    with cube:
+        try:
+            selection = cube.select(risk_tier=args.risk_tier, state=args.state, years=args.years)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        rate = args.discount_rate
+        print(f"📊 {len(selection):,} of {len(cube):,} leases, years {selection.years[0]}-{selection.years[-1]}\n")
+        print("| Year | Cash flow | Discounted |")
+        for year, flow, df in zip(selection.years, selection.calendar(), selection.discount_factors(rate)):
+            if flow:
+                print(f"| {year} | ${flow:,.0f} | ${flow * df:,.0f} |")
+        print(f"\nPresent value @ {rate:.1%}: ${selection.present_value(rate):,.0f}")
+        print(f"Duration: {selection.duration(rate):.2f} years "
+              f"(modified {selection.duration(rate, modified=True):.2f}), "
+              f"convexity {selection.convexity(rate):.1f}")
+
+
+if __name__ == '__main__':
+    main()
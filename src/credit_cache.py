@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Persistent Credit Assessment Cache
+==================================
+
+Remembers counterparty lookups between calls and between runs, keyed on the
+cleaned company name (``CreditLookup._clean_company_name``, case-folded).
+
+Two layers:
+- an in-process LRU for repeat developers within a run
+- a SQLite table on disk so later runs skip the network entirely
+
+Each entry records the source that produced it. Freshness is judged at read
+time against a per-source TTL, so tightening a TTL applies to existing
+entries. Lookups that found nothing are cached too (negative caching) under
+their own, shorter TTL.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+NOT_FOUND = "not_found"
+DAY = 24 * 60 * 60
+DEFAULT_TTLS = {
+    "SEC EDGAR": 7 * DAY,
+    NOT_FOUND: 1 * DAY,
+}
+DEFAULT_TTL = 7 * DAY
+DEFAULT_MEMORY_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class CachedCredit:
+    """One cached lookup: ``data`` is None for a negative entry."""
+    source: str
+    data: Optional[Dict[str, Any]]
+    stored_at: float
+
+
+class CreditCache:
+    """Two-level (memory LRU + SQLite) TTL cache for credit lookups."""
+
+    def __init__(self, path: Optional[Path] = None, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL, memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+                 clock=time.time):
+        self.path = Path(path) if path is not None else None
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._clock = clock
+        self._memory: "OrderedDict[str, CachedCredit]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def get(self, clean_name: str) -> Optional[CachedCredit]:
+        """Fresh entry for clean_name, or None on a miss or stale entry."""
+        key = self._key(clean_name)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._load(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.expired(entry.source, entry.stored_at):
+                self._memory.pop(key, None)
+                self.stale += 1
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+            return entry
+
+    def put(self, clean_name: str, source: str, data: Optional[Dict[str, Any]]):
+        """Store a lookup result; pass ``data=None`` with NOT_FOUND for negatives."""
+        key = self._key(clean_name)
+        entry = CachedCredit(source=source, data=data, stored_at=self._clock())
+        with self._lock:
+            self._remember(key, entry)
+            db = self._connect()
+            if db is not None:
+                with db:
+                    db.execute(
+                        "INSERT OR REPLACE INTO credit_cache (clean_name, source, payload, stored_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, source, json.dumps(data), entry.stored_at),
+                    )
+
+    def ttl_for(self, source: str) -> float:
+        """Time-to-live in seconds for entries from ``source``."""
+        return self.ttls.get(source, self.default_ttl)
+
+    def expired(self, source: str, stored_at: float) -> bool:
+        """Whether a result ``source`` produced at ``stored_at`` is past its TTL."""
+        return self._clock() - stored_at > self.ttl_for(source)
+
+    def clear(self):
+        """Drop every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+            db = self._connect()
+            if db is not None:
+                with db:
+                    db.execute("DELETE FROM credit_cache")
+
+    def close(self):
+        """Close the SQLite connection (reopened on next use)."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/stale counters for this process."""
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale}
+
+    # -- internals ------------------------------------------------------
+    @staticmethod
+    def _key(clean_name: str) -> str:
+        return clean_name.casefold()
+
+    def _remember(self, key: str, entry: CachedCredit):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _load(self, key: str) -> Optional[CachedCredit]:
+        db = self._connect()
+        if db is None:
+            return None
+        row = db.execute(
+            "SELECT source, payload, stored_at FROM credit_cache WHERE clean_name = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return CachedCredit(source=row[0], data=json.loads(row[1]), stored_at=row[2])
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by the credit worker threads; every use holds self._lock
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS credit_cache ("
+                "clean_name TEXT PRIMARY KEY, source TEXT NOT NULL, "
+                "payload TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
@@ -7,28 +7,101 @@ Quick credit assessment using public data sources:
 - SEC EDGAR API for public company status
 - Basic entity age and incorporation lookup
 - Risk tier mapping for discount rate assignment
+
+SEC queries share one pooled HTTP session per client, are throttled by a
+token bucket to SEC's fair-use limit (10 requests/second) and identical
+clean names are deduplicated while a request is in flight, so
+``lookup_many`` over hundreds of developers costs one request per distinct
+company. An optional CreditCache (see credit_cache.py) remembers results,
+including not-found searches, across calls and runs.
 """
 
 import requests
 import re
 import json
 import argparse
-from typing import Dict, Optional, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Any
 from datetime import datetime
 import time
 
+from credit_cache import NOT_FOUND, CreditCache
+from entity_matcher import EntityMatcher, load_registry
+
+SEC_BASE_URL = "https://data.sec.gov"
+SEC_MAX_REQUESTS_PER_SECOND = 10.0
+SEC_SOURCE = "SEC EDGAR"
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``acquire`` blocks until a token is free."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until the bucket has refilled enough."""
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
 
 class CreditLookup:
     """Credit assessment client for lease counterparties."""
     
-    def __init__(self):
+    def __init__(self, base_url: str = SEC_BASE_URL,
+                 max_requests_per_second: float = SEC_MAX_REQUESTS_PER_SECOND,
+                 max_workers: int = 8, timeout: float = 10,
+                 cache: Optional[CreditCache] = None):
         # SEC EDGAR API endpoint (free, no key required)
-        self.sec_base_url = "https://data.sec.gov"
+        self.sec_base_url = base_url
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.cache = cache
         self.headers = {
             "User-Agent": "SpiceFlow Finance (hello@spiceflow.com)",
             "Accept": "application/json"
         }
-    
+        # One keep-alive session, pooled wide enough for every worker thread
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._rate_limiter = TokenBucket(max_requests_per_second)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Shut down worker threads and release pooled connections."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     def lookup_company(self, company_name: str) -> Dict[str, Any]:
         """
         Perform credit lookup for a company name.
@@ -44,7 +117,55 @@ class CreditLookup:
         
         # Clean company name for search
         clean_name = self._clean_company_name(company_name)
-        
+        return self._assess(company_name, clean_name, self._sec_future(clean_name).result())
+
+    def lookup_many(self, company_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up a batch of companies concurrently.
+
+        Names that clean to the same search term share a single SEC request.
+
+        Returns:
+            Dict mapping each distinct, non-empty input name to its
+            ``lookup_company`` result.
+        """
+        pending = {}
+        for name in dict.fromkeys(company_names):
+            if name:
+                clean_name = self._clean_company_name(name)
+                pending[name] = (clean_name, self._sec_future(clean_name))
+        return {name: self._assess(name, clean_name, future.result())
+                for name, (clean_name, future) in pending.items()}
+
+    def _sec_future(self, clean_name: str) -> Future:
+        """SEC lookup for clean_name, joining any identical request in flight."""
+        if self.cache is not None:
+            cached = self.cache.get(clean_name)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached.data)
+                return future
+        with self._lock:
+            future = self._inflight.get(clean_name)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="sec-lookup")
+            future = self._executor.submit(self._sec_lookup, clean_name)
+            self._inflight[clean_name] = future
+        # Registered outside the lock: a lookup that already finished runs
+        # _forget right here, and _forget takes the lock itself
+        future.add_done_callback(lambda _, key=clean_name: self._forget(key))
+        return future
+
+    def _forget(self, clean_name: str):
+        with self._lock:
+            self._inflight.pop(clean_name, None)
+
+    def _assess(self, company_name: str, clean_name: str,
+                sec_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the credit assessment dict from SEC lookup data."""
         # Initialize result structure
         result = {
             "company_name": company_name,
@@ -58,11 +179,10 @@ class CreditLookup:
             "lookup_timestamp": datetime.now().isoformat()
         }
         
-        # Try SEC lookup for public company status
-        sec_data = self._sec_lookup(clean_name)
+        # Merge SEC lookup for public company status
         if sec_data:
             result.update(sec_data)
-            result["data_sources"].append("SEC EDGAR")
+            result["data_sources"].append(SEC_SOURCE)
         
         # Apply risk tier logic
         result["risk_tier"] = self._determine_risk_tier(result)
@@ -95,7 +215,8 @@ class CreditLookup:
                 'output': 'atom'
             }
             
-            response = requests.get(search_endpoint, params=params, headers=self.headers, timeout=10)
+            self._rate_limiter.acquire()
+            response = self.session.get(search_endpoint, params=params, timeout=self.timeout)
             
             if response.status_code == 200:
                 # Parse response for public company indicators
@@ -106,11 +227,18 @@ class CreditLookup:
                 is_public = any(indicator in content for indicator in public_indicators)
                 
                 if is_public:
-                    return {
+                    sec_data = {
                         "public_company": True,
                         "years_since_incorp": 10,  # Conservative estimate for established public cos
                         "state_of_incorp": "DE"    # Most public companies incorporate in Delaware
                     }
+                    if self.cache is not None:
+                        self.cache.put(company_name, SEC_SOURCE, sec_data)
+                    return sec_data
+                
+                # A clean search with no filings: cache the negative, not errors
+                if self.cache is not None:
+                    self.cache.put(company_name, NOT_FOUND, None)
             
         except Exception as e:
             print(f"SEC lookup failed for {company_name}: {e}")
@@ -127,11 +255,11 @@ class CreditLookup:
         """Determine risk tier based on company data."""
         
         # Public company with long history = low risk
-        if data.get("public_company") and data.get("years_since_incorp", 0) >= 10:
+        if data.get("public_company") and (data.get("years_since_incorp") or 0) >= 10:
             return "low"
         
         # Established private company = medium risk  
-        if data.get("years_since_incorp", 0) >= 5:
+        if (data.get("years_since_incorp") or 0) >= 5:
             return "medium"
         
         # Default to high risk for new/unknown entities
@@ -177,51 +305,138 @@ KNOWN_ENTITIES = {
     }
 }
 
+# Alternative names (subsidiaries, project companies) -> KNOWN_ENTITIES key
+KNOWN_ENTITY_ALIASES: Dict[str, List[str]] = {}
+
+_known_matcher: Optional[EntityMatcher] = None
+_default_client: Optional[CreditLookup] = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> CreditLookup:
+    """Process-wide CreditLookup shared by quick_lookup callers."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = CreditLookup()
+        return _default_client
 
-def quick_lookup(company_name: str) -> Dict[str, Any]:
-    """Quick lookup using known entities database."""
+
+def configure_default_client(**kwargs) -> CreditLookup:
+    """Replace the shared client, e.g. ``configure_default_client(cache=...)``."""
+    global _default_client
+    with _default_client_lock:
+        previous, _default_client = _default_client, CreditLookup(**kwargs)
+    if previous is not None:
+        previous.close()
+    return _default_client
+
+
+def get_known_matcher() -> EntityMatcher:
+    """Matcher over KNOWN_ENTITIES, built once and reused."""
+    global _known_matcher
+    with _default_client_lock:
+        if _known_matcher is None:
+            _known_matcher = EntityMatcher(KNOWN_ENTITIES, KNOWN_ENTITY_ALIASES)
+        return _known_matcher
+
+
+def load_entity_registry(path) -> int:
+    """Merge a JSON/CSV entity registry into KNOWN_ENTITIES; returns its size."""
+    global _known_matcher
+    entities, aliases = load_registry(path)
+    with _default_client_lock:
+        KNOWN_ENTITIES.update(entities)
+        for name, names in aliases.items():
+            KNOWN_ENTITY_ALIASES.setdefault(name, []).extend(names)
+        _known_matcher = None
+    return len(entities)
+
+
+def _known_entity_lookup(company_name: str, fuzzy: bool = False) -> Optional[Dict[str, Any]]:
+    """Match against the known entities database, or None."""
+    clean_name = company_name.lower().strip()
+    
+    # Longest known name (or alias) inside the company name
+    match = get_known_matcher().lookup(company_name, fuzzy=fuzzy)
+    if match is None:
+        return None
+    
+    result = {
+        "company_name": company_name,
+        "clean_name": clean_name,
+        **match.data,
+        "data_sources": ["Known Entities DB (fuzzy)" if match.fuzzy else "Known Entities DB"],
+        "lookup_timestamp": datetime.now().isoformat()
+    }
+    # Registry rows may omit the tier; derive it like an SEC result
+    result.setdefault("risk_tier", get_default_client()._determine_risk_tier(result))
+    
+    # Apply discount rate
+    result["recommended_discount"] = get_default_client()._get_discount_rate(result["risk_tier"])
+    
+    return result
+
+
+def quick_lookup(company_name: str, fuzzy: bool = False) -> Dict[str, Any]:
+    """Quick lookup using known entities database.
+    
+    With ``fuzzy=True`` misspelt names (e.g. OCR output) can still match a
+    known entity through the trigram stage before falling back to SEC.
+    """
     if not company_name:
         return {}
     
-    clean_name = company_name.lower().strip()
-    
-    # Check against known entities
-    for known_key, data in KNOWN_ENTITIES.items():
-        if known_key in clean_name:
-            result = {
-                "company_name": company_name,
-                "clean_name": clean_name,
-                **data,
-                "data_sources": ["Known Entities DB"],
-                "lookup_timestamp": datetime.now().isoformat()
-            }
-            
-            # Apply discount rate
-            lookup_client = CreditLookup()
-            result["recommended_discount"] = lookup_client._get_discount_rate(result["risk_tier"])
-            
-            return result
+    known = _known_entity_lookup(company_name, fuzzy)
+    if known is not None:
+        return known
     
     # Fall back to full lookup
-    lookup_client = CreditLookup()
-    return lookup_client.lookup_company(company_name)
+    return get_default_client().lookup_company(company_name)
+
+
+def quick_lookup_many(company_names: Iterable[str], fuzzy: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Batch quick_lookup: known entities first, the rest via one SEC batch."""
+    results = {}
+    unknown = []
+    for name in dict.fromkeys(company_names):
+        if not name:
+            continue
+        known = _known_entity_lookup(name, fuzzy)
+        if known is not None:
+            results[name] = known
+        else:
+            unknown.append(name)
+    if unknown:
+        results.update(get_default_client().lookup_many(unknown))
+    return results
 
 
 def main():
     """CLI interface for credit lookup."""
     parser = argparse.ArgumentParser(description='Credit risk lookup for solar lease counterparties')
-    parser.add_argument('company_name', help='Company name to lookup')
+    parser.add_argument('company_name', nargs='+', help='Company name(s) to lookup')
     parser.add_argument('--output', choices=['json', 'summary'], default='summary', 
                        help='Output format')
+    parser.add_argument('--cache', help='SQLite credit cache file (default: no cache)')
+    parser.add_argument('--registry', help='Extra known-entity registry (.json or .csv)')
+    parser.add_argument('--fuzzy', action='store_true', help='Allow approximate known-entity matches')
     
     args = parser.parse_args()
+    if args.registry:
+        load_entity_registry(args.registry)
+    if args.cache:
+        configure_default_client(cache=CreditCache(args.cache))
     
-    # Perform lookup
-    result = quick_lookup(args.company_name)
+    # Perform lookups (one batch, so distinct SEC queries run concurrently)
+    results = quick_lookup_many(args.company_name, fuzzy=args.fuzzy)
     
     if args.output == 'json':
-        print(json.dumps(result, indent=2))
-    else:
+        payload = results if len(results) > 1 else next(iter(results.values()), {})
+        print(json.dumps(payload, indent=2))
+        return
+    
+    for result in results.values():
         # Summary format
         print(f"Credit Assessment: {result.get('company_name', 'Unknown')}")
         print(f"Risk Tier: {result.get('risk_tier', 'unknown').title()}")
@@ -0,0 +1,364 @@
+"""Dated lease cash flows: payment frequency, stub periods and day counts.
+
+Usage
+-----
+>>> from datetime import date
+>>> from dated_cash_flows import PaymentSchedule, dated_present_values
+>>> schedule = PaymentSchedule(
+...     start=date(2024, 10, 1),
+...     term_years=30.75,
+...     frequency="semi-annual",
+...     first_payment=date(2025, 1, 15),
+... )
+>>> dated_present_values([170000], [0.02], schedule, discount_rate=0.10).round(2)
+array([1952451.58])
+
+``lease_valuation`` prices whole annual rents paid at the end of integer
+years. Here a lease pays ``annual_rent / frequency`` per period. Rent
+escalates on each anniversary of ``start``, and each payment is discounted
+XNPV-style with ``(1 + r) ** -t``, where ``t`` is the day-count year
+fraction from the valuation date. Short or long stub periods (a first
+payment off the regular cycle, or a term that is not a whole number of
+periods) pay rent in proportion to their day-count length.
+
+Leases that share a ``PaymentSchedule`` share one date grid, built once.
+Per (rate, schedule) the discount factors are folded into one weight per
+escalation year and cached. Pricing a lease then comes down to one dot
+product of its growth factors with those weights, and leases are grouped
+by schedule so a book is priced in a few array operations. Terms resolve
+to whole months (30.75 years = 369 months).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Optional, Sequence, Union
+
+import numpy as np
+
+from irr import CONVERGED, NO_IRR, NOT_CONVERGED, IRRResult
+
+__all__ = [
+    "DAY_COUNTS",
+    "FREQUENCIES",
+    "DateGrid",
+    "PaymentSchedule",
+    "clear_caches",
+    "date_grid",
+    "dated_cash_flows",
+    "dated_present_values",
+    "discount_factors",
+    "xirr",
+    "xnpv",
+    "year_fraction",
+]
+
+FREQUENCIES = {"annual": 1, "semi-annual": 2, "quarterly": 4, "monthly": 12}
+DAY_COUNTS = ("ACT/365F", "ACT/360", "30/360")
+
+# Distinct schedules / (rate, schedule) pairs kept by the caches
+GRID_CACHE_SIZE = 1024
+FACTOR_CACHE_SIZE = 4096
+
+# Candidate rates scanned for an XNPV sign change
+_XIRR_GRID = np.array(
+    [-0.99, -0.9, -0.5, -0.2, -0.05, 0.0, 0.05, 0.1, 0.2, 0.5, 1.0, 3.0, 10.0, 100.0]
+)
+
+DateLike = Union[date, str, np.datetime64]
+
+
+def _as_date(value: DateLike) -> date:
+    return np.datetime64(value, "D").astype(date)
+
+
+def _days(values) -> np.ndarray:
+    return np.asarray(values, dtype="datetime64[D]")
+
+
+def _add_months(dates, months) -> np.ndarray:
+    """``dates`` moved by ``months``, clamping the day to the month's end."""
+    dates = _days(dates)
+    month = dates.astype("datetime64[M]")
+    day = (dates - month.astype("datetime64[D]")).astype(np.int64)
+    target = month + np.asarray(months, dtype=np.int64)
+    month_days = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    return target.astype("datetime64[D]") + np.minimum(day, month_days - 1)
+
+
+def _whole_months(start, dates) -> np.ndarray:
+    """Complete months from ``start`` to each of ``dates``."""
+    start = _days(start)
+    dates = _days(dates)
+    months = (dates.astype("datetime64[M]") - start.astype("datetime64[M]")).astype(np.int64)
+    return np.where(_add_months(start, months) > dates, months - 1, months)
+
+
+def year_fraction(start, end, day_count: str = "ACT/365F") -> np.ndarray:
+    """Year fraction from ``start`` to ``end`` (element-wise).
+
+    ``ACT/365F`` and ``ACT/360`` divide actual days; ``30/360`` is the US
+    bond basis (day 31 counts as 30, and the end day only when the start
+    day is 30 or 31).
+    """
+    start = _days(start)
+    end = _days(end)
+    if day_count == "ACT/365F":
+        return (end - start).astype(np.int64) / 365.0
+    if day_count == "ACT/360":
+        return (end - start).astype(np.int64) / 360.0
+    if day_count == "30/360":
+        months = (end.astype("datetime64[M]") - start.astype("datetime64[M]")).astype(np.int64)
+        d1 = (start - start.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+        d2 = (end - end.astype("datetime64[M]").astype("datetime64[D]")).astype(np.int64) + 1
+        d1 = np.minimum(d1, 30)
+        d2 = np.where(d1 == 30, np.minimum(d2, 30), d2)
+        return (30 * months + (d2 - d1)) / 360.0
+    raise ValueError(f"Unknown day count {day_count!r}; choose from {', '.join(DAY_COUNTS)}")
+
+
+@dataclass(frozen=True)
+class PaymentSchedule:
+    """When a lease pays; leases with equal schedules share a date grid."""
+
+    start: date  # commencement; rent escalates on each anniversary
+    term_years: float  # resolved to whole months
+    frequency: Union[str, int] = "annual"  # name from FREQUENCIES or payments per year
+    first_payment: Optional[date] = None  # off-cycle first payment date (front stub)
+    day_count: str = "ACT/365F"
+
+    def __post_init__(self) -> None:
+        frequency = FREQUENCIES.get(self.frequency, self.frequency)
+        if frequency not in FREQUENCIES.values():
+            raise ValueError(f"Unknown frequency {self.frequency!r}; choose from {', '.join(FREQUENCIES)}")
+        if self.day_count not in DAY_COUNTS:
+            raise ValueError(f"Unknown day count {self.day_count!r}; choose from {', '.join(DAY_COUNTS)}")
+        if not self.term_years > 0:
+            raise ValueError("term_years must be positive")
+        object.__setattr__(self, "frequency", frequency)
+        object.__setattr__(self, "start", _as_date(self.start))
+        if self.first_payment is not None:
+            object.__setattr__(self, "first_payment", _as_date(self.first_payment))
+
+    @property
+    def term_months(self) -> int:
+        return int(round(self.term_years * 12))
+
+    @property
+    def end(self) -> date:
+        return _add_months(self.start, self.term_months).astype(date)
+
+    def grid(self) -> "DateGrid":
+        return date_grid(self)
+
+
+@dataclass(frozen=True)
+class DateGrid:
+    """Payment dates of a schedule with each period's accrual and escalation year."""
+
+    schedule: PaymentSchedule
+    dates: np.ndarray  # datetime64[D] payment dates (end of each period)
+    period_starts: np.ndarray  # datetime64[D]
+    accrual: np.ndarray  # share of a regular period's rent paid (1.0 except stubs)
+    escalation_year: np.ndarray  # escalations applied to each payment
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def year_fractions(self, valuation_date: Optional[DateLike] = None) -> np.ndarray:
+        """Day-count time of each payment from ``valuation_date`` (default: start)."""
+        origin = self.schedule.start if valuation_date is None else valuation_date
+        return year_fraction(origin, self.dates, self.schedule.day_count)
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+@lru_cache(maxsize=GRID_CACHE_SIZE)
+def date_grid(schedule: PaymentSchedule) -> DateGrid:
+    """The (cached) payment grid of ``schedule``."""
+    step = 12 // schedule.frequency
+    start = np.datetime64(schedule.start, "D")
+    end = np.datetime64(schedule.end, "D")
+    anchor = start if schedule.first_payment is None else np.datetime64(schedule.first_payment, "D")
+    if schedule.first_payment is not None and not start < anchor <= end:
+        raise ValueError("first_payment must fall after start and within the term")
+    # Regular payment dates step whole periods from the anchor (month ends
+    # clamped); the grid starts one period before it to cover ``start``
+    count = schedule.term_months // step + 2
+    points = _add_months(anchor, step * np.arange(-1, count))
+    dates = np.append(points[(points > start) & (points < end)], end)
+    period_starts = np.concatenate([[start], dates[:-1]])
+    # Stubs (either end off the grid) pay rent in proportion to their length
+    regular_period = np.isin(period_starts, points) & np.isin(dates, points)
+    stub = year_fraction(period_starts, dates, schedule.day_count) * schedule.frequency
+    accrual = np.where(regular_period, 1.0, stub)
+    escalation_year = _whole_months(start, period_starts) // 12
+    return DateGrid(
+        schedule=schedule,
+        dates=_read_only(dates),
+        period_starts=_read_only(period_starts),
+        accrual=_read_only(accrual),
+        escalation_year=_read_only(escalation_year),
+    )
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def discount_factors(schedule: PaymentSchedule, rate: float,
+                     valuation_date: Optional[date] = None) -> np.ndarray:
+    """Cached ``(1 + rate) ** -t`` for each payment of ``schedule``.
+
+    Payments dated before ``valuation_date`` have already been made and get
+    a factor of zero.
+    """
+    grid = date_grid(schedule)
+    times = grid.year_fractions(valuation_date)
+    factors = np.where(times >= 0, (1.0 + rate) ** -times, 0.0)
+    return _read_only(factors)
+
+
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def _year_weights(schedule: PaymentSchedule, rate: float, valuation_date: Optional[date]) -> np.ndarray:
+    """Discounted accrual per escalation year, per unit of annual rent."""
+    grid = date_grid(schedule)
+    weights = grid.accrual * discount_factors(schedule, rate, valuation_date) / schedule.frequency
+    return _read_only(np.bincount(grid.escalation_year, weights=weights))
+
+
+def clear_caches() -> None:
+    """Drop every cached grid and factor table."""
+    date_grid.cache_clear()
+    discount_factors.cache_clear()
+    _year_weights.cache_clear()
+
+
+def dated_cash_flows(
+    annual_rent: Sequence[float] | np.ndarray | float,
+    escalator: Sequence[float] | np.ndarray | float,
+    schedule: PaymentSchedule,
+) -> np.ndarray:
+    """Payment amounts of leases sharing ``schedule``, one row per lease.
+
+    Columns line up with ``schedule.grid().dates``.
+    """
+    grid = date_grid(schedule)
+    rent, esc = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(annual_rent, dtype=float)),
+        np.atleast_1d(np.asarray(escalator, dtype=float)),
+    )
+    per_period = grid.accrual / schedule.frequency
+    return rent[:, None] * per_period * (1.0 + esc[:, None]) ** grid.escalation_year
+
+
+def dated_present_values(
+    annual_rent: Sequence[float] | np.ndarray,
+    escalator: Sequence[float] | np.ndarray | float,
+    schedules: PaymentSchedule | Sequence[PaymentSchedule],
+    discount_rate: float = 0.10,
+    valuation_date: Optional[DateLike] = None,
+) -> np.ndarray:
+    """PV of each lease's remaining dated payments at ``discount_rate``.
+
+    ``schedules`` is one schedule shared by every lease or one per lease.
+    Leases are grouped by schedule; each group costs one growth-factor
+    table over its distinct escalators and a dot product with the cached
+    per-year weights.
+    """
+    rent, esc = np.broadcast_arrays(
+        np.asarray(annual_rent, dtype=float), np.asarray(escalator, dtype=float)
+    )
+    if rent.ndim != 1:
+        raise ValueError("Lease columns must be one-dimensional")
+    if isinstance(schedules, PaymentSchedule):
+        groups = {schedules: np.arange(len(rent))}
+    else:
+        if len(schedules) != len(rent):
+            raise ValueError("Need one schedule per lease")
+        positions = {}
+        for i, schedule in enumerate(schedules):
+            positions.setdefault(schedule, []).append(i)
+        groups = {schedule: np.array(idx) for schedule, idx in positions.items()}
+    valuation_date = None if valuation_date is None else _as_date(valuation_date)
+
+    pv = np.zeros(len(rent))
+    for schedule, idx in groups.items():
+        weights = _year_weights(schedule, float(discount_rate), valuation_date)
+        rates, inverse = np.unique(esc[idx], return_inverse=True)
+        growth = (1.0 + rates[:, None]) ** np.arange(len(weights))
+        pv[idx] = rent[idx] * (growth @ weights)[inverse]
+    return pv
+
+
+def xnpv(rate: float, cash_flows, dates, valuation_date: Optional[DateLike] = None,
+         day_count: str = "ACT/365F"):
+    """NPV of dated cash flows, like a spreadsheet's XNPV.
+
+    ``cash_flows`` is one series or a 2-D array with one series per row, all
+    sharing ``dates``; ``valuation_date`` defaults to the first date.
+    """
+    dates = _days(dates)
+    origin = dates[0] if valuation_date is None else valuation_date
+    factors = (1.0 + rate) ** -year_fraction(origin, dates, day_count)
+    values = np.asarray(cash_flows, dtype=float) @ factors
+    return float(values) if np.ndim(values) == 0 else values
+
+
+def xirr(
+    cash_flows,
+    dates,
+    *,
+    day_count: str = "ACT/365F",
+    guess: float = 0.10,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> IRRResult:
+    """Rate zeroing the XNPV of every cash-flow row at once.
+
+    Rows share ``dates``; times run from the first date. As in
+    ``irr.solve_irr``, each row is bracketed on a fixed rate grid (the
+    sign change nearest ``guess``). Then a safeguarded Newton iteration
+    runs, falling back to bisection whenever a step leaves the bracket.
+    Rows with no sign change on the grid get ``NO_IRR``.
+    """
+    cf = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    times = year_fraction(_days(dates)[0], dates, day_count)
+    n = cf.shape[0]
+    rate = np.full(n, np.nan)
+    status = np.full(n, NO_IRR, dtype=np.int8)
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        npv_grid = cf @ (1.0 + _XIRR_GRID[None, :]) ** -times[:, None]
+    crosses = np.sign(npv_grid[:, :-1]) * np.sign(npv_grid[:, 1:]) <= 0
+    distance = np.maximum.reduce([np.zeros(len(_XIRR_GRID) - 1),
+                                  _XIRR_GRID[:-1] - guess, guess - _XIRR_GRID[1:]])
+    choice = np.argmin(np.where(crosses, distance, np.inf), axis=1)
+    active = np.flatnonzero(crosses[np.arange(n), choice])
+    k = choice[active]
+    a, b = _XIRR_GRID[k], _XIRR_GRID[k + 1]
+    fa = npv_grid[active, k]
+    r = np.clip(np.full(active.size, guess), a, b)
+    block = cf[active]
+
+    iterations = 0
+    while active.size and iterations < max_iterations:
+        iterations += 1
+        discount = (1.0 + r[:, None]) ** -times
+        f = (block * discount).sum(axis=1)
+        df = -(block * times * discount).sum(axis=1) / (1.0 + r)
+        same_side = np.sign(f) == np.sign(fa)
+        a, fa, b = np.where(same_side, r, a), np.where(same_side, f, fa), np.where(same_side, b, r)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = r - f / df
+        bisect = ~np.isfinite(newton) | (newton <= np.minimum(a, b)) | (newton >= np.maximum(a, b))
+        r_new = np.where(bisect, 0.5 * (a + b), newton)
+        done = (np.abs(r_new - r) <= tolerance * (1.0 + np.abs(r))) | (f == 0)
+        rate[active[done]] = np.where(f[done] == 0, r[done], r_new[done])
+        status[active[done]] = CONVERGED
+        keep = ~done
+        active, r, a, b, fa, block = active[keep], r_new[keep], a[keep], b[keep], fa[keep], block[keep]
+    rate[active] = r
+    status[active] = NOT_CONVERGED
+    return IRRResult(rate=rate, status=status, iterations=iterations)
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Deal Store
+==========
+
+Embedded SQLite store for valued leases, their credit assessments and the
+history of pipeline runs. process_leases.py writes each run here with bulk
+upserts, and renders leases.json and the Markdown reports from it;
+downstream tools query the store instead of re-parsing leases.json.
+
+Tables:
+- leases: one row per lease with its terms and latest valuation, keyed on
+  ``lease_key`` (see ``lease_keys``) and kept in input order
+  (indexed on developer, location, state, risk tier and buyout offer)
+- credit_assessments: distinct credit payloads, shared by leases
+- runs / valuations: one row per run, and per lease per run
+
+The database runs in WAL mode, so report readers and CLI queries see the
+last committed run while the pipeline writes the next one.
+
+Usage:
+    python deal_store.py output/deals.sqlite3 --risk-tier low --state Illinois --min-buyout 500000
+    python deal_store.py output/deals.sqlite3 --developer "Nexamp Solar LLC" --output json
+    python deal_store.py output/deals.sqlite3 --runs
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from lease_book import LeaseBook
+
+DEFAULT_STORE_NAME = 'deals.sqlite3'
+SCHEMA_VERSION = 3  # 1 keyed leases and valuations on the bare name; 2 required an IRR
+
+# LeaseResult's fields, in order; StoredLease rows can be fed to LeaseBook
+LEASE_FIELDS = [
+    'name', 'annual_rent', 'annual_rent_per_acre', 'term_years', 'renewal_options',
+    'total_potential_term', 'escalator', 'risk_tier', 'location', 'acres', 'developer',
+    'pv_value', 'undiscounted_value', 'buyout_offer', 'multiple', 'discount_rate', 'credit_data',
+]
+StoredLease = namedtuple('StoredLease', LEASE_FIELDS)
+
+ORDER_COLUMNS = {'position', 'name', 'buyout_offer', 'pv_value', 'annual_rent', 'multiple', 'acres', 'term_years'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    discount_rate REAL,
+    leases INTEGER NOT NULL,
+    total_buyout REAL NOT NULL,
+    total_pv REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS credit_assessments (
+    credit_id TEXT PRIMARY KEY,
+    company_name TEXT COLLATE NOCASE,
+    risk_tier TEXT COLLATE NOCASE,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    lease_key TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    annual_rent REAL NOT NULL,
+    annual_rent_per_acre REAL,
+    term_years INTEGER NOT NULL,
+    renewal_options TEXT,
+    total_potential_term INTEGER,
+    escalator REAL NOT NULL,
+    risk_tier TEXT COLLATE NOCASE,
+    location TEXT COLLATE NOCASE,
+    state TEXT COLLATE NOCASE,
+    acres REAL,
+    developer TEXT COLLATE NOCASE,
+    pv_value REAL NOT NULL,
+    undiscounted_value REAL NOT NULL,
+    buyout_offer REAL NOT NULL,
+    multiple REAL,
+    discount_rate REAL NOT NULL,
+    credit_id TEXT REFERENCES credit_assessments (credit_id),
+    run_id INTEGER NOT NULL REFERENCES runs (run_id)
+);
+CREATE INDEX IF NOT EXISTS leases_developer ON leases (developer);
+CREATE INDEX IF NOT EXISTS leases_location ON leases (location);
+CREATE INDEX IF NOT EXISTS leases_state ON leases (state);
+CREATE INDEX IF NOT EXISTS leases_risk_tier ON leases (risk_tier, buyout_offer);
+CREATE INDEX IF NOT EXISTS leases_buyout_offer ON leases (buyout_offer);
+CREATE INDEX IF NOT EXISTS leases_position ON leases (position);
+CREATE INDEX IF NOT EXISTS leases_name ON leases (name);
+CREATE TABLE IF NOT EXISTS valuations (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    lease_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    discount_rate REAL NOT NULL,
+    pv_value REAL NOT NULL,
+    buyout_offer REAL NOT NULL,
+    PRIMARY KEY (run_id, lease_key)
+);
+CREATE INDEX IF NOT EXISTS valuations_lease_key ON valuations (lease_key);
+"""
+
+_LEASE_COLUMNS = [
+    'lease_key', 'name', 'position', 'annual_rent', 'annual_rent_per_acre', 'term_years', 'renewal_options',
+    'total_potential_term', 'escalator', 'risk_tier', 'location', 'state', 'acres', 'developer',
+    'pv_value', 'undiscounted_value', 'buyout_offer', 'multiple', 'discount_rate', 'credit_id', 'run_id',
+]
+_UPSERT_LEASE = (
+    f"INSERT INTO leases ({', '.join(_LEASE_COLUMNS)}) VALUES ({', '.join('?' * len(_LEASE_COLUMNS))}) "
+    f"ON CONFLICT (lease_key) DO UPDATE SET "
+    + ', '.join(f"{c} = excluded.{c}" for c in _LEASE_COLUMNS if c != 'lease_key')
+)
+_COPIED_LEASE_COLUMNS = ', '.join(_LEASE_COLUMNS[1:])
+_SELECT_LEASE = (
+    "SELECT l.name, l.annual_rent, l.annual_rent_per_acre, l.term_years, l.renewal_options, "
+    "l.total_potential_term, l.escalator, l.risk_tier, l.location, l.acres, l.developer, "
+    "l.pv_value, l.undiscounted_value, l.buyout_offer, l.multiple, l.discount_rate, c.credit_id, c.payload "
+    "FROM leases l LEFT JOIN credit_assessments c ON c.credit_id = l.credit_id"
+)
+
+
+def state_of(location: Optional[str]) -> Optional[str]:
+    """State part of a free-text location: "Kendall County, Illinois" -> "Illinois"."""
+    if not location or location == 'Unknown':
+        return None
+    return location.rsplit(',', 1)[-1].strip() or None
+
+
+def lease_keys(names: Iterable[str]) -> List[str]:
+    """Unique keys for a run's leases: the name, with "#2", "#3"... on repeats.
+
+    Two documents can extract to the same lease name; keying on the name
+    alone would collapse them into one row. Repeats are numbered in input
+    order, so re-running the same documents yields the same keys.
+    """
+    seen = set()
+    keys = []
+    for name in names:
+        key, n = name, 1
+        while key in seen:
+            n += 1
+            key = f"{name}#{n}"
+        seen.add(key)
+        keys.append(key)
+    return keys
+
+
+def _credit_row(credit: Optional[dict]) -> Optional[Tuple[str, Any, Any, str]]:
+    if not credit:
+        return None
+    canonical = json.dumps(credit, sort_keys=True, default=str)
+    credit_id = hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+    # Stored in the assessment's own key order so leases.json renders unchanged
+    return credit_id, credit.get('company_name'), credit.get('risk_tier'), json.dumps(credit, default=str)
+
+
+class DealStore:
+    """SQLite deal store; open one per thread (connections are not shared)."""
+
+    def __init__(self, path: Path, readonly: bool = False):
+        self.path = Path(path)
+        self.readonly = readonly
+        if readonly:
+            self.db = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.db = sqlite3.connect(self.path, timeout=30)
+            # WAL: readers keep reading the last commit while a run is written
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self._migrate()
+            self.db.executescript(SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _migrate(self):
+        """Rebuild an older store's tables in the current schema.
+
+        Version 1 keyed leases on the name, so each name becomes its own
+        ``lease_key`` (names were unique then). Version 2 declared
+        ``multiple`` NOT NULL, which leases without an IRR cannot satisfy.
+        """
+        if self.db.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(leases)")}
+        if not columns:
+            return
+        rekey = 'lease_key' not in columns
+        tables = ('leases', 'valuations') if rekey else ('leases',)
+        indexes = [row[0] for row in self.db.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join('?' * len(tables))})", tables)]
+        key = 'name' if rekey else 'lease_key'
+        script = (
+            "BEGIN;"
+            + ''.join(f"DROP INDEX {index};" for index in indexes)
+            + ''.join(f"ALTER TABLE {table} RENAME TO {table}_old;" for table in tables)
+            + SCHEMA
+            + f"INSERT INTO leases (lease_key, {_COPIED_LEASE_COLUMNS}) "
+            f"SELECT {key}, {_COPIED_LEASE_COLUMNS} FROM leases_old;"
+        )
+        if rekey:
+            script += (
+                "INSERT INTO valuations (run_id, lease_key, name, discount_rate, pv_value, buyout_offer) "
+                "SELECT run_id, name, name, discount_rate, pv_value, buyout_offer FROM valuations_old;"
+            )
+        self.db.executescript(
+            script + ''.join(f"DROP TABLE {table}_old;" for table in tables) + "COMMIT;"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    # -- writing --------------------------------------------------------
+    def record_run(self, results, discount_rate: Optional[float] = None) -> int:
+        """Store a pipeline run's leases in one transaction; returns the run id.
+
+        Leases are upserted by ``lease_keys`` of their names, so leases
+        sharing a name stay separate rows in input order; leases missing
+        from this run are deleted from ``leases`` (their valuation history
+        is kept).
+        """
+        book = results if isinstance(results, LeaseBook) else LeaseBook.from_results(results)
+        totals = book.totals()
+        credit_rows: Dict[str, tuple] = {}
+        credit_ids = []
+        by_object: Dict[int, Optional[tuple]] = {}  # the book interns equal assessments
+        for row in book:
+            credit = row.credit_data
+            if id(credit) not in by_object:
+                by_object[id(credit)] = _credit_row(credit)
+            entry = by_object[id(credit)]
+            if entry is not None:
+                credit_rows.setdefault(entry[0], entry)
+            credit_ids.append(entry[0] if entry else None)
+
+        names = book.column('name').tolist()
+        keys = lease_keys(names)
+
+        with self.db:
+            run_id = self.db.execute(
+                "INSERT INTO runs (recorded_at, discount_rate, leases, total_buyout, total_pv) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (time.time(), discount_rate, totals.count, totals.total_buyout, totals.total_pv),
+            ).lastrowid
+            self.db.executemany(
+                "INSERT OR IGNORE INTO credit_assessments (credit_id, company_name, risk_tier, payload) "
+                "VALUES (?, ?, ?, ?)",
+                credit_rows.values(),
+            )
+            self.db.executemany(_UPSERT_LEASE, self._lease_rows(book, keys, credit_ids, run_id))
+            self.db.executemany(
+                "INSERT INTO valuations (run_id, lease_key, name, discount_rate, pv_value, buyout_offer) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                zip([run_id] * len(book), keys, names, *(book.column(f).tolist() for f in
+                                                         ('discount_rate', 'pv_value', 'buyout_offer'))),
+            )
+            self.db.execute("DELETE FROM leases WHERE run_id != ?", (run_id,))
+            self.db.execute(
+                "DELETE FROM credit_assessments WHERE credit_id NOT IN "
+                "(SELECT credit_id FROM leases WHERE credit_id IS NOT NULL)"
+            )
+        return run_id
+
+    @staticmethod
+    def _lease_rows(book: LeaseBook, keys: List[str], credit_ids: List[Optional[str]],
+                    run_id: int) -> Iterable[tuple]:
+        columns = {field: book.column(field).tolist() for field in LEASE_FIELDS if field != 'credit_data'}
+        for i, name in enumerate(columns['name']):
+            per_acre = columns['annual_rent_per_acre'][i]
+            multiple = columns['multiple'][i]
+            location = columns['location'][i]
+            yield (
+                keys[i], name, i, columns['annual_rent'][i], None if per_acre != per_acre else per_acre,
+                columns['term_years'][i], columns['renewal_options'][i],
+                columns['total_potential_term'][i] or None, columns['escalator'][i],
+                columns['risk_tier'][i], location, state_of(location), columns['acres'][i],
+                columns['developer'][i], columns['pv_value'][i], columns['undiscounted_value'][i],
+                columns['buyout_offer'][i], None if multiple != multiple else multiple,
+                columns['discount_rate'][i],
+                credit_ids[i], run_id,
+            )
+
+    # -- reading --------------------------------------------------------
+    def query(self, risk_tier: Optional[str] = None, state: Optional[str] = None,
+              location: Optional[str] = None, developer: Optional[str] = None,
+              min_buyout: Optional[float] = None, max_buyout: Optional[float] = None,
+              order_by: str = 'position', descending: bool = False,
+              limit: Optional[int] = None) -> List[StoredLease]:
+        """Leases matching every given filter (text filters are case-insensitive).
+
+        ``location`` matches a substring; the other text filters are exact.
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order by {order_by!r}; choose from {sorted(ORDER_COLUMNS)}")
+        clauses, params = [], []
+        for column, value in (('l.risk_tier', risk_tier), ('l.state', state), ('l.developer', developer)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if location is not None:
+            clauses.append("l.location LIKE ?")
+            params.append(f"%{location}%")
+        if min_buyout is not None:
+            clauses.append("l.buyout_offer >= ?")
+            params.append(min_buyout)
+        if max_buyout is not None:
+            clauses.append("l.buyout_offer <= ?")
+            params.append(max_buyout)
+        sql = _SELECT_LEASE
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY l.{order_by} {'DESC' if descending else 'ASC'}, l.position"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        credits: Dict[str, dict] = {}  # parse each shared payload once
+        leases = []
+        for *fields, credit_id, payload in self.db.execute(sql, params):
+            if credit_id is None:
+                credit = {}
+            elif credit_id in credits:
+                credit = credits[credit_id]
+            else:
+                credit = credits[credit_id] = json.loads(payload)
+            leases.append(StoredLease(*fields, credit))
+        return leases
+
+    def book(self, **filters) -> LeaseBook:
+        """Stored leases (filtered as in ``query``) as a LeaseBook, in pipeline order."""
+        return LeaseBook.from_results(self.query(**filters))
+
+    def runs(self, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Most recent runs first."""
+        cursor = self.db.execute(
+            "SELECT run_id, recorded_at, discount_rate, leases, total_buyout, total_pv "
+            "FROM runs ORDER BY run_id DESC LIMIT ?", (-1 if limit is None else limit,)
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def history(self, lease_key: str) -> List[Dict[str, Any]]:
+        """Valuations of one lease across runs, oldest first.
+
+        ``lease_key`` is the lease name, or "name#2"... for a repeated name.
+        """
+        cursor = self.db.execute(
+            "SELECT v.run_id, r.recorded_at, v.discount_rate, v.pv_value, v.buyout_offer "
+            "FROM valuations v JOIN runs r ON r.run_id = v.run_id WHERE v.lease_key = ? ORDER BY v.run_id",
+            (lease_key,),
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+
+def main():
+    """CLI for querying a deal store."""
+    parser = argparse.ArgumentParser(description='Query the SpiceFlow deal store')
+    parser.add_argument('store', help=f'Deal store file (process_leases writes <output-dir>/{DEFAULT_STORE_NAME})')
+    parser.add_argument('--risk-tier', help='low, medium or high')
+    parser.add_argument('--state', help='State, e.g. Illinois')
+    parser.add_argument('--location', help='Substring of the location')
+    parser.add_argument('--developer', help='Exact developer name')
+    parser.add_argument('--min-buyout', type=float, help='Minimum buyout offer in dollars')
+    parser.add_argument('--max-buyout', type=float, help='Maximum buyout offer in dollars')
+    parser.add_argument('--order-by', default='buyout_offer', choices=sorted(ORDER_COLUMNS),
+                        help='Sort column (default: buyout_offer, largest first)')
+    parser.add_argument('--ascending', action='store_true', help='Sort ascending')
+    parser.add_argument('--limit', type=int, help='Maximum rows to show')
+    parser.add_argument('--runs', action='store_true', help='List recent pipeline runs instead of leases')
+    parser.add_argument('--output', choices=['json', 'summary'], default='summary', help='Output format')
+    args = parser.parse_args()
+
+    if not Path(args.store).exists():
+        print(f"❌ No deal store at {args.store} - run process_leases.py first")
+        return
+
+    with DealStore(Path(args.store), readonly=True) as store:
+        if args.runs:
+            runs = store.runs(args.limit or 10)
+            if args.output == 'json':
+                print(json.dumps(runs, indent=2))
+                return
+            for run in runs:
+                recorded = time.strftime('%Y-%m-%d %H:%M', time.localtime(run['recorded_at']))
+                print(f"#{run['run_id']} {recorded}: {run['leases']} leases, "
+                      f"${run['total_buyout']:,.0f} recommended")
+            return
+
+        leases = store.query(
+            risk_tier=args.risk_tier, state=args.state, location=args.location,
+            developer=args.developer, min_buyout=args.min_buyout, max_buyout=args.max_buyout,
+            order_by=args.order_by, descending=not args.ascending, limit=args.limit,
+        )
+
+    if args.output == 'json':
+        print(json.dumps([lease._asdict() for lease in leases], indent=2))
+        return
+    for lease in leases:
+        print(f"{lease.name} ({lease.location}): ${lease.buyout_offer:,.0f} offer, "
+              f"{lease.risk_tier.title()} risk, {lease.developer}")
+    print(f"📊 {len(leases)} leases, ${sum(lease.buyout_offer for lease in leases):,.0f} total")
+
+
+if __name__ == '__main__':
+    main()
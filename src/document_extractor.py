@@ -10,30 +10,86 @@ Falls back to JSON if available for testing/validation.
 import re
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import subprocess
 import sys
 
-def extract_text_from_pdf(file_path: Path) -> str:
-    """Extract text from PDF using pdfplumber or fallback to system tools."""
+from extraction_cache import ExtractionCache, file_digest
+import instrumentation
+
+# Cache keys for ExtractionCache: bump TEXT_EXTRACTION_VERSION when PDF/DOCX
+# text extraction (or the early-stop fields) changes, EXTRACTOR_VERSION when
+# the regex patterns change. Early-stopped text is cached under EARLY_STOP_SUFFIX.
+TEXT_EXTRACTION_VERSION = "3"
+EXTRACTOR_VERSION = "3"
+EARLY_STOP_SUFFIX = "-early"
+
+# pdftotext fallback reads this many pages per subprocess call
+PDFTOTEXT_PAGE_CHUNK = 8
+
+def iter_pdf_pages(file_path: Path, first_page: int = 1, last_page: Optional[int] = None) -> Iterator[str]:
+    """Yield the text of each PDF page in order, one page at a time.
+    
+    Uses pdfplumber when installed, releasing each page's parsed layout once
+    its text is read, otherwise streams page ranges through pdftotext -f/-l.
+    """
     try:
         import pdfplumber
-        with pdfplumber.open(file_path) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return text
     except ImportError:
-        # Fallback to system pdftotext if available
+        instrumentation.count('pdftotext_fallbacks')
+        yield from _iter_pdftotext_pages(file_path, first_page, last_page)
+        return
+    with pdfplumber.open(file_path) as pdf:
+        for page in pdf.pages[first_page - 1:last_page]:
+            yield page.extract_text() or ""
+            page.flush_cache()
+
+def _iter_pdftotext_pages(file_path: Path, first_page: int, last_page: Optional[int]) -> Iterator[str]:
+    """Stream pages from pdftotext in PDFTOTEXT_PAGE_CHUNK-sized ranges."""
+    start = first_page
+    while last_page is None or start <= last_page:
+        end = start + PDFTOTEXT_PAGE_CHUNK - 1
+        if last_page is not None:
+            end = min(end, last_page)
         try:
             result = subprocess.run(
-                ['pdftotext', str(file_path), '-'], 
+                ['pdftotext', '-f', str(start), '-l', str(end), str(file_path), '-'],
                 capture_output=True, text=True, check=True
             )
-            return result.stdout
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"⚠️  Cannot extract PDF text from {file_path}. Install pdfplumber: pip install pdfplumber")
-            return ""
+        except subprocess.CalledProcessError:
+            if start == first_page:
+                raise
+            return  # first page of this range is past the end of the document
+        # pdftotext terminates every page with a form feed
+        pages = result.stdout.split('\f')[:-1]
+        yield from pages
+        if len(pages) < end - start + 1:
+            return
+        start = end + 1
+
+def extract_text_from_pdf(file_path: Path, stop_when_complete: bool = False,
+                          max_pages: Optional[int] = None) -> str:
+    """Extract text from PDF using pdfplumber or fallback to system tools.
+    
+    Pages are streamed. With ``stop_when_complete`` reading stops as soon as
+    a LeaseFieldMatcher has seen rent, term and escalator, so long exhibits
+    after the key terms are never parsed.
+    """
+    matcher = LeaseFieldMatcher() if stop_when_complete else None
+    pages = []
+    try:
+        for page_text in iter_pdf_pages(file_path, last_page=max_pages):
+            pages.append(page_text)
+            if matcher is not None:
+                matcher.feed(page_text)
+                if matcher.complete:
+                    break
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        instrumentation.count('extraction_failures')
+        print(f"⚠️  Cannot extract PDF text from {file_path}. Install pdfplumber: pip install pdfplumber")
+        return ""
+    instrumentation.observe('pdf_pages_read', len(pages), bounds=(1, 2, 3, 5, 10, 20, 50, 100))
+    return "\n".join(pages)
 
 def extract_text_from_docx(file_path: Path) -> str:
     """Extract text from Word document."""
@@ -45,15 +101,200 @@ def extract_text_from_docx(file_path: Path) -> str:
             text += paragraph.text + "\n"
         return text
     except ImportError:
+        instrumentation.count('extraction_failures')
         print(f"⚠️  Cannot extract DOCX text from {file_path}. Install python-docx: pip install python-docx")
         return ""
 
+# Pattern tables, compiled once at import. Lazy spans that may cross
+# sentences are bounded to SPAN characters so each search stays linear in
+# the document length; unbounded ``.*?`` goes quadratic on long leases.
+# Within each table the first pattern that yields a valid value wins.
+# The tables are deliberately not folded into one alternation per field: an
+# alternation reports a single alternative per position and consumes its
+# span, so a match later rejected by validation would hide a lower-priority
+# pattern, and overlapping term mentions would drop out of _term_candidates.
+SPAN = 200
+
+def _compile_all(patterns):
+    return tuple(re.compile(p.replace('.*?', '.{0,%d}?' % SPAN)) for p in patterns)
+
+WHITESPACE = re.compile(r'\s+')
+
+# Extract annual rent - look for dollar amounts with rent context
+RENT_PATTERNS = _compile_all([
+    r'annual\s+rental\s+payment[:\s]+\$([0-9,]+)',
+    r'annual\s+rent.*?\$([0-9,]+)',
+    r'rent.*?\$([0-9,]+).*?per\s+year',
+    r'\$([0-9,]+).*?annual',
+    r'payment.*?\$([0-9,]+)',
+    r'lease\s+payment.*?\$([0-9,]+)',
+    r'rent.*?of\s+\$([0-9,]+)',
+    r'sum\s+of\s+\$([0-9,]+)',
+    r'amount\s+of\s+\$([0-9,]+)',
+    r'compensation.*?\$([0-9,]+)',
+    r'shall\s+pay.*?\$([0-9,]+)',
+    r'per\s+acre.*?\$([0-9,]+)',
+    r'\$([0-9,]+).*?per\s+acre',
+    r'([0-9,]+)\s+dollars?.*?annual',
+    r'total.*?rent.*?\$([0-9,]+)'
+])
+
+NUMBER_WORDS = {
+    'one':1,'two':2,'three':3,'four':4,'five':5,'six':6,'seven':7,'eight':8,'nine':9,'ten':10,
+    'eleven':11,'twelve':12,'thirteen':13,'fourteen':14,'fifteen':15,'sixteen':16,'seventeen':17,
+    'eighteen':18,'nineteen':19,'twenty':20,'thirty':30,'forty':40,'fifty':50,'sixty':60
+}
+
+TERM_PATTERNS = _compile_all([
+    r'for\s+([0-9]+)\s+years?',                 # "for 25 years"
+    r'term.*?([0-9]+)\s+years?',
+    r'([0-9]+)\s+year\s+term',
+    r'lease\s+term.*?([0-9]+)',
+    r'initial\s+term.*?([0-9]+)\s+years?',
+    r'period\s+of\s+([0-9]+)\s+years?',
+    r'for\s+a\s+term\s+of\s+([0-9]+)',
+    r'([0-9]+)\s+years?.*?term',
+    r'commencing.*?([0-9]+)\s+years?',
+    r'lease.*?([0-9]+)\s+years?.*?period',
+    r'expires.*?([0-9]+)\s+years?',
+    r'(' + '|'.join(NUMBER_WORDS.keys()) + r')\s*\([0-9]+\)?\s+years?',  # word (digit)
+    r'(' + '|'.join(NUMBER_WORDS.keys()) + r')\s+years?',
+])
+
+RENEWAL_PATTERN = re.compile(r'([0-9]+)\s+renewal\s+terms?\s+of\s+([0-9]+)\s+years?')
+
+# Extract escalator percentage
+ESCALATOR_PATTERNS = _compile_all([
+    r'escalat.*?([0-9]+(?:\.[0-9]+)?)\s*%',
+    r'increas.*?([0-9]+(?:\.[0-9]+)?)\s*%.*?(?:annual|per\s+year)',  # allow "per year"
+    r'([0-9]+(?:\.[0-9]+)?)\s*%.*?escalat',
+    r'([0-9]+(?:\.[0-9]+)?)\s*percent.*?(?:annual|per\s+year).*?increas'
+])
+
+# Extract acreage
+ACRES_PATTERNS = _compile_all([
+    r'([0-9,]+(?:\.[0-9]+)?)\s+acres?',  # allow thousands separator
+    r'acres?.*?([0-9,]+(?:\.[0-9]+)?)',
+    r'([0-9,]+)\s+acres?\s+more\s+or\s+less'
+])
+
+# Rent expressed per acre (possibly multiple rates)
+PER_ACRE_RATE_PATTERN = re.compile(r'\$([0-9,]+(?:\.[0-9]+)?)\s+per\s+(?:utilized\s+)?acre')
+
+# Extract location (state patterns)
+COUNTY_STATE_PATTERN = re.compile(r'([a-z]+)\s+county[\s,]+([a-z]+)')  # "X County, Y"
+STATE_PATTERNS = _compile_all([
+    r'state\s+of\s+([a-z]+)',                       # "state of Wyoming"
+    r'in\s+the\s+state\s+of\s+([a-z]+)',          # "in the state of Wyoming"
+    r'([a-z]+)\s+state',                             # "Wyoming state"
+    r'county[,\s]+([a-z]+)',                        # trailing after county
+    r'within\s+([a-z]+)\s+county',
+    r'located\s+in\s+([a-z]+)',
+    r'situated\s+in\s+([a-z]+)',
+    r'([a-z]+)\s+county'                            # capture county last
+])
+
+# Extract developer/lessee company names; name runs are capped at a few
+# words so a long stretch of prose cannot be rescanned at every offset.
+COMPANY_PATTERNS = _compile_all([
+    r'lessee[:\s]+([a-z\s,\.]{1,80}llc)',
+    r'lessee[:\s]+([a-z\s,\.]{1,80}inc)',
+    r'developer[:\s]+([a-z\s,\.]{1,80}llc)',
+    r'([a-z\s]{1,60}solar[a-z\s]{0,60}llc)',
+    r'([a-z\s]{1,60}energy[a-z\s]{0,60}llc)',
+    r'([a-z\s]{1,60}renewable[a-z\s]{0,60}llc)'
+])
+
+
+def clean_text(text: str) -> str:
+    """Collapse whitespace and lower-case text for pattern matching."""
+    return WHITESPACE.sub(' ', text).lower()
+
+def _match_rent(text_clean: str) -> Optional[int]:
+    """First annual rent in the $1K-$10M range, by pattern priority."""
+    for pattern in RENT_PATTERNS:
+        match = pattern.search(text_clean)
+        if match:
+            try:
+                rent_amount = int(match.group(1).replace(',', ''))
+                # Validate reasonable rent range ($1K to $10M annually)
+                if 1000 <= rent_amount <= 10000000:
+                    return rent_amount
+            except ValueError:
+                continue
+    return None
+
+def _term_candidates(text_clean: str) -> List[int]:
+    """Every term length (in years) mentioned in the text."""
+    term_candidates = []
+    for pattern in TERM_PATTERNS:
+        for m in pattern.finditer(text_clean):
+            val = m.group(1)
+            years_val = None
+            if val.isdigit():
+                years_val = int(val)
+            else:
+                years_val = NUMBER_WORDS.get(val.lower(), None)
+            if years_val:
+                term_candidates.append(years_val)
+    return term_candidates
+
+def _match_escalator(text_clean: str) -> Optional[float]:
+    """First escalator in the 0.5%-5% range as a decimal, by pattern priority."""
+    for pattern in ESCALATOR_PATTERNS:
+        match = pattern.search(text_clean)
+        if match:
+            try:
+                escalator_pct = float(match.group(1))
+                # Validate reasonable escalator range (0.5% to 5% annually)
+                if 0.5 <= escalator_pct <= 5.0:
+                    return escalator_pct / 100.0
+            except ValueError:
+                continue
+    return None
+
+class LeaseFieldMatcher:
+    """Incrementally tracks which key lease fields a page stream has shown.
+    
+    Each page is matched together with the last SPAN characters of the
+    previous one, so a clause split across a page break is still seen.
+    A field only counts once a value passes the same range checks used by
+    extract_lease_data_from_text; terms must fall in the usual 15-35 years.
+    """
+    
+    REQUIRED_FIELDS = ("annual_rent", "term_years", "escalator")
+    
+    def __init__(self, required_fields=REQUIRED_FIELDS):
+        self.required = set(required_fields)
+        self.found = set()
+        self._tail = ""
+    
+    @property
+    def complete(self) -> bool:
+        return self.required <= self.found
+    
+    def feed(self, page_text: str):
+        """Match one more page of raw text."""
+        window = self._tail + " " + clean_text(page_text)
+        self._tail = window[-SPAN:]
+        missing = self.required - self.found
+        if "annual_rent" in missing and _match_rent(window) is not None:
+            self.found.add("annual_rent")
+        if "term_years" in missing and any(15 <= t <= 35 for t in _term_candidates(window)):
+            self.found.add("term_years")
+        if "escalator" in missing and _match_escalator(window) is not None:
+            self.found.add("escalator")
+
+def default_lease_name(filename: str) -> str:
+    """Readable lease name derived from a file name."""
+    return filename.replace('.pdf', '').replace('.docx', '').replace('_', ' ').title()
+
 def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
     """Extract lease terms from document text using pattern matching."""
     
     # Default values
     lease_data = {
-        "name": filename.replace('.pdf', '').replace('.docx', '').replace('_', ' ').title(),
+        "name": default_lease_name(filename),
         "annual_rent": None,
         "term_years": None,
         "escalator": 0.0,
@@ -65,79 +306,16 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
     }
     
     # Clean text for pattern matching
-    text_clean = re.sub(r'\s+', ' ', text.replace('\n', ' ')).lower()
+    text_clean = clean_text(text)
     
     # Extract annual rent - look for dollar amounts with rent context
-    rent_patterns = [
-        r'annual\s+rental\s+payment[:\s]+\$([0-9,]+)',
-        r'annual\s+rent.*?\$([0-9,]+)',
-        r'rent.*?\$([0-9,]+).*?per\s+year',
-        r'\$([0-9,]+).*?annual',
-        r'payment.*?\$([0-9,]+)',
-        r'lease\s+payment.*?\$([0-9,]+)',
-        r'rent.*?of\s+\$([0-9,]+)',
-        r'sum\s+of\s+\$([0-9,]+)',
-        r'amount\s+of\s+\$([0-9,]+)',
-        r'compensation.*?\$([0-9,]+)',
-        r'shall\s+pay.*?\$([0-9,]+)',
-        r'per\s+acre.*?\$([0-9,]+)',
-        r'\$([0-9,]+).*?per\s+acre',
-        r'([0-9,]+)\s+dollars?.*?annual',
-        r'total.*?rent.*?\$([0-9,]+)'
-    ]
-    
-    for pattern in rent_patterns:
-        match = re.search(pattern, text_clean)
-        if match:
-            try:
-                rent_amount = int(match.group(1).replace(',', ''))
-                # Validate reasonable rent range ($1K to $10M annually)
-                if 1000 <= rent_amount <= 10000000:
-                    lease_data["annual_rent"] = rent_amount
-                    break
-            except ValueError:
-                continue
+    lease_data["annual_rent"] = _match_rent(text_clean)
     
     # Extract term years
-    number_words = {
-        'one':1,'two':2,'three':3,'four':4,'five':5,'six':6,'seven':7,'eight':8,'nine':9,'ten':10,
-        'eleven':11,'twelve':12,'thirteen':13,'fourteen':14,'fifteen':15,'sixteen':16,'seventeen':17,
-        'eighteen':18,'nineteen':19,'twenty':20,'thirty':30,'forty':40,'fifty':50,'sixty':60
-    }
-
-    term_patterns = [
-        r'for\s+([0-9]+)\s+years?',                 # "for 25 years"
-        r'term.*?([0-9]+)\s+years?',
-        r'([0-9]+)\s+year\s+term',
-        r'lease\s+term.*?([0-9]+)',
-        r'initial\s+term.*?([0-9]+)\s+years?',
-        r'period\s+of\s+([0-9]+)\s+years?',
-        r'for\s+a\s+term\s+of\s+([0-9]+)',
-        r'([0-9]+)\s+years?.*?term',
-        r'commencing.*?([0-9]+)\s+years?',
-        r'lease.*?([0-9]+)\s+years?.*?period',
-        r'expires.*?([0-9]+)\s+years?',
-        r'(' + '|'.join(number_words.keys()) + r')\s*\([0-9]+\)?\s+years?',  # word (digit)
-        r'(' + '|'.join(number_words.keys()) + r')\s+years?',
-    ]
-
-    renewal_pattern = r'([0-9]+)\s+renewal\s+terms?\s+of\s+([0-9]+)\s+years?'
-
-    term_candidates = []
-
-    for pattern in term_patterns:
-        for m in re.finditer(pattern, text_clean):
-            val = m.group(1)
-            years_val = None
-            if val.isdigit():
-                years_val = int(val)
-            else:
-                years_val = number_words.get(val.lower(), None)
-            if years_val:
-                term_candidates.append(years_val)
+    term_candidates = _term_candidates(text_clean)
 
     # renewal matches
-    renewal_match = re.search(renewal_pattern, text_clean)
+    renewal_match = RENEWAL_PATTERN.search(text_clean)
     total_term_from_renewal = None
     if renewal_match:
         try:
@@ -168,34 +346,13 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
         lease_data["needs_review"] = False
     
     # Extract escalator percentage
-    escalator_patterns = [
-        r'escalat.*?([0-9]+(?:\.[0-9]+)?)\s*%',
-        r'increas.*?([0-9]+(?:\.[0-9]+)?)\s*%.*?(?:annual|per\s+year)',  # allow "per year"
-        r'([0-9]+(?:\.[0-9]+)?)\s*%.*?escalat',
-        r'([0-9]+(?:\.[0-9]+)?)\s*percent.*?(?:annual|per\s+year).*?increas'
-    ]
-    
-    for pattern in escalator_patterns:
-        match = re.search(pattern, text_clean)
-        if match:
-            try:
-                escalator_pct = float(match.group(1))
-                # Validate reasonable escalator range (0.5% to 5% annually)
-                if 0.5 <= escalator_pct <= 5.0:
-                    lease_data["escalator"] = escalator_pct / 100.0
-                    break
-            except ValueError:
-                continue
+    escalator = _match_escalator(text_clean)
+    if escalator is not None:
+        lease_data["escalator"] = escalator
     
     # Extract acreage
-    acres_patterns = [
-        r'([0-9,]+(?:\.[0-9]+)?)\s+acres?',  # allow thousands separator
-        r'acres?.*?([0-9,]+(?:\.[0-9]+)?)',
-        r'([0-9,]+)\s+acres?\s+more\s+or\s+less'
-    ]
-    
-    for pattern in acres_patterns:
-        match = re.search(pattern, text_clean)
+    for pattern in ACRES_PATTERNS:
+        match = pattern.search(text_clean)
         if match:
             try:
                 lease_data["acres"] = float(match.group(1).replace(',', ''))
@@ -204,7 +361,7 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
                 continue
 
     # Check for rent expressed per acre (capture possibly multiple rates) and choose the highest
-    per_acre_rates = re.findall(r'\$([0-9,]+(?:\.[0-9]+)?)\s+per\s+(?:utilized\s+)?acre', text_clean)
+    per_acre_rates = PER_ACRE_RATE_PATTERN.findall(text_clean)
     if per_acre_rates and lease_data.get("acres"):
         try:
             rates_float = [float(r.replace(',', '')) for r in per_acre_rates]
@@ -219,19 +376,8 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
             pass
     
     # Extract location (state patterns)
-    state_patterns = [
-        r'state\s+of\s+([a-z]+)',                       # "state of Wyoming"
-        r'in\s+the\s+state\s+of\s+([a-z]+)',          # "in the state of Wyoming"
-        r'([a-z]+)\s+state',                             # "Wyoming state"
-        r'county[,\s]+([a-z]+)',                        # trailing after county
-        r'within\s+([a-z]+)\s+county',
-        r'located\s+in\s+([a-z]+)',
-        r'situated\s+in\s+([a-z]+)',
-        r'([a-z]+)\s+county'                            # capture county last
-    ]
-    
     # Combined pattern: "X County, Y" capturing both
-    combined_match = re.search(r'([a-z]+)\s+county[\s,]+([a-z]+)', text_clean)
+    combined_match = COUNTY_STATE_PATTERN.search(text_clean)
     if combined_match:
         county = combined_match.group(1).title()
         state = combined_match.group(2).title()
@@ -240,8 +386,8 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
 
     # If not already set, iterate other patterns
     if lease_data["location"] is None:
-        for pattern in state_patterns:
-            match = re.search(pattern, text_clean)
+        for pattern in STATE_PATTERNS:
+            match = pattern.search(text_clean)
             if match:
                 location = match.group(1).title()
                 if len(location) > 2:  # Avoid initials
@@ -249,17 +395,8 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
                     break
     
     # Extract developer/lessee company names
-    company_patterns = [
-        r'lessee[:\s]+([a-z\s,\.]+llc)',
-        r'lessee[:\s]+([a-z\s,\.]+inc)',
-        r'developer[:\s]+([a-z\s,\.]+llc)',
-        r'([a-z\s]+solar[a-z\s]*llc)',
-        r'([a-z\s]+energy[a-z\s]*llc)',
-        r'([a-z\s]+renewable[a-z\s]*llc)'
-    ]
-    
-    for pattern in company_patterns:
-        match = re.search(pattern, text_clean)
+    for pattern in COMPANY_PATTERNS:
+        match = pattern.search(text_clean)
         if match:
             company = match.group(1).strip().title()
             if len(company) > 5:  # Reasonable company name length
@@ -268,8 +405,18 @@ def extract_lease_data_from_text(text: str, filename: str) -> Dict[str, Any]:
     
     return lease_data
 
-def process_document(file_path: Path) -> Optional[Dict[str, Any]]:
-    """Process a single document file and extract lease data."""
+def process_document(file_path: Path, cache: Optional[ExtractionCache] = None,
+                     stop_when_complete: bool = False) -> Optional[Dict[str, Any]]:
+    """Process a single document file and extract lease data.
+    
+    With an ExtractionCache, the extracted text and parsed lease data are
+    reused for any file whose contents were seen before.
+    
+    ``stop_when_complete`` stops reading a PDF once rent, term and escalator
+    have been seen. It is off by default: a longer term, renewals, acreage,
+    location or developer stated on later pages would be missed. Its
+    results are cached apart from full extractions.
+    """
     
     file_ext = file_path.suffix.lower()
     
@@ -282,24 +429,48 @@ def process_document(file_path: Path) -> Optional[Dict[str, Any]]:
             print(f"❌ Error reading JSON {file_path}: {e}")
             return None
     
-    # Extract text based on file type
-    if file_ext == '.pdf':
-        text = extract_text_from_pdf(file_path)
-    elif file_ext == '.docx':
-        text = extract_text_from_docx(file_path)
-    else:
+    if file_ext not in ('.pdf', '.docx'):
         print(f"⚠️  Unsupported file type: {file_path}")
         return None
     
+    suffix = EARLY_STOP_SUFFIX if stop_when_complete and file_ext == '.pdf' else ""
+    text_version, lease_version = TEXT_EXTRACTION_VERSION + suffix, EXTRACTOR_VERSION + suffix
+    digest = file_digest(file_path) if cache is not None else None
+    if cache is not None:
+        lease_data = cache.get_lease(digest, lease_version)
+        if lease_data is not None:
+            instrumentation.count('lease_cache_hits')
+            # Same contents may arrive under a different file name
+            lease_data["name"] = default_lease_name(file_path.stem)
+            return lease_data
+    
+    text = cache.get_text(digest, text_version) if cache is not None else None
+    if text is not None:
+        instrumentation.count('text_cache_hits')
+    else:
+        # Extract text based on file type
+        with instrumentation.stage('text_extraction'):
+            if file_ext == '.pdf':
+                text = extract_text_from_pdf(file_path, stop_when_complete=stop_when_complete)
+            else:
+                text = extract_text_from_docx(file_path)
+        if cache is not None and text.strip():
+            cache.put_text(digest, text_version, text)
+    
     if not text.strip():
+        instrumentation.count('empty_documents')
         print(f"⚠️  No text extracted from {file_path}")
         return None
     
     # Extract lease data from text
-    lease_data = extract_lease_data_from_text(text, file_path.stem)
+    with instrumentation.stage('field_extraction'):
+        lease_data = extract_lease_data_from_text(text, file_path.stem)
+    if cache is not None:
+        cache.put_lease(digest, lease_version, lease_data)
     
     # Validate required fields
     if lease_data["annual_rent"] is None or lease_data["term_years"] is None:
+        instrumentation.count('incomplete_extractions')
         print(f"⚠️  Missing critical data in {file_path} (rent: {lease_data['annual_rent']}, term: {lease_data['term_years']})")
         # Don't return None - provide what we found for manual review
     
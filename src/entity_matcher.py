@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Counterparty Entity Matcher
+===========================
+
+Finds known counterparties (developers, sponsors, parents, subsidiaries)
+inside free-text company names such as "Boulevard Associates LLC (NextEra)".
+
+- Exact stage: an Aho-Corasick automaton built once from every entity name
+  and alias, so a lookup is linear in the length of the query no matter how
+  many entities are loaded. Matches must sit on word boundaries. When several
+  names match, the longest wins; ties go to the earliest position, then the
+  alphabetically first name, so results never depend on load order.
+- Fuzzy stage (optional): a trigram index that tolerates OCR and typing
+  errors from the document extractor, e.g. "Lanceleef Solar".
+
+Registries load from JSON (``{name: {...fields}}`` or a list of objects with
+a ``name``) or CSV (one row per entity, ``aliases`` separated by ``;``).
+"""
+
+import csv
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+DEFAULT_FUZZY_THRESHOLD = 0.6
+
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+_BOOL_STRINGS = {'true': True, 'yes': True, '1': True, 'false': False, 'no': False, '0': False, '': False}
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace runs to single spaces."""
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def _trigrams(normalized: str) -> Counter:
+    padded = f" {normalized} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+@dataclass(frozen=True)
+class EntityMatch:
+    """A matched entity: ``name`` is the canonical registry key."""
+    name: str
+    data: Mapping[str, Any]
+    matched: str
+    score: float = 1.0
+
+    @property
+    def fuzzy(self) -> bool:
+        return self.score < 1.0
+
+
+class EntityMatcher:
+    """Multi-pattern matcher over an entity registry."""
+
+    def __init__(self, entities: Mapping[str, Mapping[str, Any]],
+                 aliases: Optional[Mapping[str, Iterable[str]]] = None):
+        """
+        Args:
+            entities: canonical name -> entity fields
+            aliases: canonical name -> alternative names (subsidiaries, DBAs)
+        """
+        self.entities = dict(entities)
+        patterns: Dict[str, str] = {}  # normalized pattern -> canonical name
+        for name in sorted(self.entities):
+            patterns.setdefault(normalize_name(name), name)
+        for name, names in sorted((aliases or {}).items()):
+            if name not in self.entities:
+                raise ValueError(f"Alias given for unknown entity: {name}")
+            for alias in names:
+                patterns.setdefault(normalize_name(alias), name)
+        patterns.pop('', None)
+
+        self._patterns = sorted(patterns)
+        self._owner = [patterns[p] for p in self._patterns]
+        self._owner_of = patterns
+        self._build_automaton()
+        self._build_trigram_index()
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    # -- construction ---------------------------------------------------
+    @classmethod
+    def from_file(cls, path: Path) -> "EntityMatcher":
+        """Build a matcher from a JSON or CSV registry file."""
+        entities, aliases = load_registry(path)
+        return cls(entities, aliases)
+
+    def _build_automaton(self):
+        # goto[node] maps a character to the next node; out[node] lists
+        # pattern indices ending at node, including via failure links
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for index, pattern in enumerate(self._patterns):
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                node = nxt
+            out[node].append(index)
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for node in queue:  # breadth-first; queue grows as we go
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                out[child].extend(out[fail[child]])
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def _build_trigram_index(self):
+        self._grams = [_trigrams(p) for p in self._patterns]
+        self._gram_totals = [sum(grams.values()) for grams in self._grams]
+        self._index: Dict[str, List[int]] = {}
+        for index, grams in enumerate(self._grams):
+            for gram in grams:
+                self._index.setdefault(gram, []).append(index)
+
+    # -- matching -------------------------------------------------------
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Every word-bounded (start, end, pattern) in the normalized text."""
+        normalized = normalize_name(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        found = []
+        node = 0
+        for pos, ch in enumerate(normalized):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for index in out[node]:
+                pattern = self._patterns[index]
+                start, end = pos + 1 - len(pattern), pos + 1
+                if (start == 0 or normalized[start - 1] == ' ') and \
+                        (end == len(normalized) or normalized[end] == ' '):
+                    found.append((start, end, pattern))
+        return found
+
+    def match(self, text: str) -> Optional[EntityMatch]:
+        """Longest exact entity match in text, or None."""
+        found = self.find_all(text)
+        if not found:
+            return None
+        start, end, pattern = min(found, key=lambda m: (-(m[1] - m[0]), m[0], m[2]))
+        name = self._owner_of[pattern]
+        return EntityMatch(name=name, data=self.entities[name], matched=pattern)
+
+    def fuzzy_match(self, text: str, threshold: float = DEFAULT_FUZZY_THRESHOLD) -> Optional[EntityMatch]:
+        """
+        Best trigram match: the share of an entity name's trigrams found in
+        text. Returns None when no entity reaches ``threshold``.
+        """
+        query = _trigrams(normalize_name(text))
+        shared: Counter = Counter()
+        for gram, count in query.items():
+            for index in self._index.get(gram, ()):
+                shared[index] += min(count, self._grams[index][gram])
+
+        best = None
+        for index, overlap in shared.items():
+            score = overlap / self._gram_totals[index]
+            key = (-score, -len(self._patterns[index]), self._patterns[index])
+            if score >= threshold and (best is None or key < best[0]):
+                best = (key, index, score)
+        if best is None:
+            return None
+        _, index, score = best
+        name = self._owner[index]
+        return EntityMatch(name=name, data=self.entities[name], matched=self._patterns[index], score=score)
+
+    def lookup(self, text: str, fuzzy: bool = False,
+               threshold: float = DEFAULT_FUZZY_THRESHOLD) -> Optional[EntityMatch]:
+        """Exact match first, then (optionally) the fuzzy stage."""
+        return self.match(text) or (self.fuzzy_match(text, threshold) if fuzzy else None)
+
+
+def _parse_row(row: Mapping[str, str]) -> Dict[str, Any]:
+    """Type the CSV columns the credit pipeline relies on."""
+    data: Dict[str, Any] = {k: v for k, v in row.items() if k not in ('name', 'aliases') and v not in (None, '')}
+    if 'public_company' in data:
+        data['public_company'] = _BOOL_STRINGS[str(data['public_company']).strip().lower()]
+    if 'years_since_incorp' in data:
+        data['years_since_incorp'] = int(data['years_since_incorp'])
+    return data
+
+
+def load_registry(path: Path) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[str]]]:
+    """Read (entities, aliases) from a .json or .csv registry."""
+    path = Path(path)
+    entities: Dict[str, Dict[str, Any]] = {}
+    aliases: Dict[str, List[str]] = {}
+
+    if path.suffix.lower() == '.csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                name = row['name'].strip().lower()
+                entities[name] = _parse_row(row)
+                names = [a.strip() for a in (row.get('aliases') or '').split(';') if a.strip()]
+                if names:
+                    aliases[name] = names
+    elif path.suffix.lower() == '.json':
+        with open(path, encoding='utf-8') as f:
+            raw = json.load(f)
+        records = [{'name': k, **v} for k, v in raw.items()] if isinstance(raw, dict) else raw
+        for record in records:
+            record = dict(record)
+            name = record.pop('name').strip().lower()
+            names = record.pop('aliases', [])
+            entities[name] = record
+            if names:
+                aliases[name] = list(names)
+    else:
+        raise ValueError(f"Unsupported registry format: {path.suffix} (expected .json or .csv)")
+
+    return entities, aliases
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Extraction Cache
+==================================
+
+Persists document extraction results on disk, keyed by the SHA-256 of the
+file contents so renamed or re-dropped files still hit.
+
+Two stages are cached separately:
+- raw text, keyed by (content hash, TEXT_EXTRACTION_VERSION)
+- parsed lease dict, keyed by (content hash, EXTRACTOR_VERSION)
+
+Bumping EXTRACTOR_VERSION after a regex change only re-runs the cheap
+pattern stage; PDF parsing is reused. The cache is size bounded and evicts
+least-recently-used entries (by file mtime, refreshed on every hit).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_DIR = Path('.spiceflow-cache')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB
+
+# Read once at import: os.umask can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def file_digest(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def replace_file(tmp, path: Path):
+    """Rename a finished temporary file onto ``path``, fixing its mode first.
+
+    ``tempfile.mkstemp`` creates files readable by their owner only. The
+    file keeps ``path``'s existing mode, or gets the one ``open()`` would
+    give a new file (0o666 less the umask).
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    os.chmod(tmp, mode)
+    os.replace(tmp, path)
+
+
+class ExtractionCache:
+    """On-disk text + lease-data cache with LRU eviction."""
+
+    def __init__(self, root: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes: Optional[int] = None  # scanned lazily on first write
+
+    # -- text stage -----------------------------------------------------
+    def get_text(self, digest: str, version: str) -> Optional[str]:
+        """Cached raw text for a document, or None."""
+        path = self._path('text', digest, version, '.txt')
+        data = self._read(path)
+        return data.decode('utf-8') if data is not None else None
+
+    def put_text(self, digest: str, version: str, text: str):
+        """Store raw extracted text."""
+        self._write(self._path('text', digest, version, '.txt'), text.encode('utf-8'))
+
+    # -- lease stage ----------------------------------------------------
+    def get_lease(self, digest: str, version: str) -> Optional[Dict[str, Any]]:
+        """Cached parsed lease dict for a document, or None."""
+        path = self._path('lease', digest, version, '.json')
+        data = self._read(path)
+        return json.loads(data) if data is not None else None
+
+    def put_lease(self, digest: str, version: str, lease_data: Dict[str, Any]):
+        """Store the parsed lease dict."""
+        self._write(self._path('lease', digest, version, '.json'), json.dumps(lease_data).encode('utf-8'))
+
+    # -- maintenance ----------------------------------------------------
+    def clear(self):
+        """Drop every cached entry."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._total_bytes = 0
+
+    def size_bytes(self) -> int:
+        """Total bytes currently stored."""
+        return sum(p.stat().st_size for p in self._entries())
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits max_bytes."""
+        entries = []
+        for p in self._entries():
+            try:
+                st = p.stat()
+            except FileNotFoundError:  # evicted by a concurrent run
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process."""
+        return {"hits": self.hits, "misses": self.misses}
+
+    # -- internals ------------------------------------------------------
+    def _path(self, stage: str, digest: str, version: str, suffix: str) -> Path:
+        return self.root / stage / digest[:2] / f"{digest}-v{version}{suffix}"
+
+    def _entries(self):
+        for stage in ('text', 'lease'):
+            stage_dir = self.root / stage
+            if stage_dir.exists():
+                yield from (p for p in stage_dir.glob('*/*') if p.suffix != '.tmp')
+
+    def _read(self, path: Path) -> Optional[bytes]:
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:  # evicted by a concurrent run
+            pass
+        self.hits += 1
+        return data
+
+    def _write(self, path: Path, data: bytes):
+        if self._total_bytes is None:
+            self._total_bytes = self.size_bytes()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            replaced = path.stat().st_size  # overwriting an entry frees its bytes
+        except FileNotFoundError:
+            replaced = 0
+        # Write-then-rename so concurrent workers never see partial entries
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        replace_file(tmp, path)
+        self._total_bytes += len(data) - replaced
+        if self._total_bytes > self.max_bytes:
+            self.evict()
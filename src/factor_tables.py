@@ -0,0 +1,103 @@
+"""Cached discount, growth and annuity factor tables.
+
+Discount rates and escalators come from a short list (the 10 % house rate,
+1-3 % escalators), so the per-year powers ``(1 + r) ** -t`` and
+``(1 + g) ** t`` are computed once per rate and read back from a table.
+Tables cover terms ``0..MAX_TERM`` and live in bounded LRU caches
+(``functools.lru_cache`` is thread-safe) shared by the scalar and batch
+valuation paths.
+
+Usage
+-----
+>>> from factor_tables import factor_table, growing_annuity_factors
+>>> table = factor_table(0.10)
+>>> round(float(table.discount[2]), 6), round(float(table.annuity[2]), 6)
+(0.826446, 1.735537)
+>>> round(float(growing_annuity_factors(0.10, 0.025)[23] * 95680 * 0.80), 2)
+819461.21
+
+Every array handed out is read-only; copy before modifying.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+__all__ = [
+    "MAX_TERM",
+    "TABLE_CACHE_SIZE",
+    "FactorTable",
+    "cache_stats",
+    "clear_caches",
+    "factor_table",
+    "growing_annuity_factors",
+]
+
+MAX_TERM = 50  # longest lease term served from a table, in years
+TABLE_CACHE_SIZE = 128
+
+
+def _frozen(values: np.ndarray) -> np.ndarray:
+    values.setflags(write=False)
+    return values
+
+
+@dataclass(frozen=True)
+class FactorTable:
+    """Per-year factors for one rate over terms ``0..max_term``.
+
+    ``discount[t]`` is ``(1 + rate) ** -t``, ``growth[t]`` is
+    ``(1 + rate) ** t`` and ``annuity[t]`` is the PV of 1 paid at the end
+    of each of the first ``t`` years (``annuity[0] == 0``).
+    """
+
+    rate: float
+    max_term: int
+    discount: np.ndarray
+    growth: np.ndarray
+    annuity: np.ndarray
+
+
+def _check_term(max_term: int) -> None:
+    if not 0 <= max_term <= MAX_TERM:
+        raise ValueError(f"max_term must be between 0 and {MAX_TERM}")
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def factor_table(rate: float, max_term: int = MAX_TERM) -> FactorTable:
+    """The (cached) factor table for ``rate`` covering ``0..max_term``."""
+    _check_term(max_term)
+    growth = np.power(1.0 + float(rate), np.arange(max_term + 1, dtype=float))
+    discount = 1 / growth
+    annuity = np.concatenate(([0.0], np.cumsum(discount[1:])))
+    return FactorTable(float(rate), max_term, _frozen(discount), _frozen(growth), _frozen(annuity))
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def growing_annuity_factors(rate: float, escalator: float, max_term: int = MAX_TERM) -> np.ndarray:
+    """Cumulative PV of rent escalating at ``escalator``, discounted at ``rate``.
+
+    Entry ``t`` is ``sum((1 + g) ** (k - 1) / (1 + r) ** k for k in 1..t)``,
+    so a lease's rent PV is ``annual_rent * factors[term]``.
+    """
+    terms = factor_table(rate, max_term).discount[1:] * factor_table(escalator, max_term).growth[:-1]
+    return _frozen(np.concatenate(([0.0], np.cumsum(terms))))
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit and miss counts across both table caches."""
+    infos = [factor_table.cache_info(), growing_annuity_factors.cache_info()]
+    return {
+        "hits": sum(i.hits for i in infos),
+        "misses": sum(i.misses for i in infos),
+        "entries": sum(i.currsize for i in infos),
+    }
+
+
+def clear_caches() -> None:
+    """Drop every cached factor table."""
+    factor_table.cache_clear()
+    growing_annuity_factors.cache_clear()
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Pipeline Instrumentation
+========================
+
+Per-stage timers, counters and histograms for the lease pipeline, exported
+as a JSON run report or a Prometheus text file, plus a profiler that writes
+cProfile stats and flamegraph-ready folded stacks.
+
+Instrumentation is off by default. While disabled, ``stage()`` hands back a
+shared no-op context manager and ``count()`` / ``observe()`` return after a
+single flag check, so the calls can stay in hot paths.
+
+Usage:
+    import instrumentation as inst
+    inst.enable()
+    with inst.stage('credit_lookup'):
+        ...
+    inst.count('extraction_cache_hits')
+    inst.write_report(Path('output/run_report.json'))
+    inst.write_prometheus(Path('output/spiceflow.prom'))
+
+    with inst.profiled(Path('output/profile')):   # profile.prof + profile.folded
+        main()
+
+Process-pool workers keep their own registry; ``take()`` returns a worker's
+metrics and resets them, and ``merge()`` folds them into the parent's.
+"""
+
+import bisect
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from extraction_cache import replace_file
+
+# Seconds; roughly Prometheus' default buckets, extended down for sub-ms stages
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_SAMPLE_INTERVAL = 0.005  # seconds between stack samples under profiled()
+
+
+class Histogram:
+    """Bucketed distribution with count, sum, min and max."""
+
+    __slots__ = ('bounds', 'buckets', 'count', 'total', 'min', 'max')
+
+    def __init__(self, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        self.bounds = tuple(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def observe(self, value: float):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, data: Dict[str, Any]):
+        """Add a histogram exported by ``as_dict`` (same bounds)."""
+        for i, n in enumerate(data['buckets']):
+            self.buckets[i] += n
+        self.count += data['count']
+        self.total += data['sum']
+        if data['count']:
+            self.min = min(self.min, data['min'])
+            self.max = max(self.max, data['max'])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max if self.count else 0.0,
+            'bounds': list(self.bounds),
+            'buckets': list(self.buckets),
+        }
+
+
+class Registry:
+    """Stage timings, counters and histograms for one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stages: Dict[str, Histogram] = {}
+            self.counters: Counter = Counter()
+            self.histograms: Dict[str, Histogram] = {}
+            self.started = time.time()
+
+    def observe_stage(self, name: str, seconds: float):
+        with self._lock:
+            hist = self.stages.get(name)
+            if hist is None:
+                hist = self.stages[name] = Histogram()
+            hist.observe(seconds)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name: str, value: float, bounds: Sequence[float] = DEFAULT_BUCKETS):
+        with self._lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = Histogram(bounds)
+            hist.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Everything recorded so far as JSON-serialisable dicts."""
+        with self._lock:
+            return {
+                'stages': {name: h.as_dict() for name, h in sorted(self.stages.items())},
+                'counters': dict(sorted(self.counters.items())),
+                'histograms': {name: h.as_dict() for name, h in sorted(self.histograms.items())},
+            }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Fold in another registry's ``snapshot`` (e.g. from a pool worker)."""
+        with self._lock:
+            for kind in ('stages', 'histograms'):
+                target = getattr(self, kind)
+                for name, data in snapshot[kind].items():
+                    if name not in target:
+                        target[name] = Histogram(data['bounds'])
+                    target[name].merge(data)
+            self.counters.update(snapshot['counters'])
+
+
+class _Stage:
+    """Times one ``with`` block into a registry stage."""
+
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry: Registry, name: str):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NoOpStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_STAGE = _NoOpStage()
+REGISTRY = Registry()
+_enabled = False
+
+
+def enable():
+    """Start recording (from a clean registry)."""
+    global _enabled
+    REGISTRY.reset()
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def configure(enabled: bool):
+    """Process-pool initializer: match the parent's on/off state.
+
+    The registry is rebuilt first: a forked worker may have inherited its
+    lock while a parent thread held it.
+    """
+    global REGISTRY
+    REGISTRY = Registry()
+    enable() if enabled else disable()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def stage(name: str):
+    """Context manager timing a pipeline stage (no-op while disabled)."""
+    if not _enabled:
+        return _NOOP_STAGE
+    return _Stage(REGISTRY, name)
+
+
+def count(name: str, n: int = 1):
+    """Increment a counter such as ``extraction_cache_hits``."""
+    if _enabled:
+        REGISTRY.count(name, n)
+
+
+def observe(name: str, value: float, bounds: Sequence[float] = DEFAULT_BUCKETS):
+    """Record a value in a histogram."""
+    if _enabled:
+        REGISTRY.observe(name, value, bounds)
+
+
+def take() -> Optional[Dict[str, Any]]:
+    """A worker's snapshot, resetting it so the next task starts clean (None when disabled)."""
+    if not _enabled:
+        return None
+    snapshot = REGISTRY.snapshot()
+    REGISTRY.reset()
+    return snapshot
+
+
+def merge(snapshot: Optional[Dict[str, Any]]):
+    """Fold a worker's ``take()`` into this process's registry."""
+    if _enabled and snapshot is not None:
+        REGISTRY.merge(snapshot)
+
+
+# -- export -------------------------------------------------------------
+def report(**run_info: Any) -> Dict[str, Any]:
+    """JSON run report: ``run_info`` plus every stage, counter and histogram."""
+    payload = {'recorded_at': REGISTRY.started, 'wall_seconds': time.time() - REGISTRY.started}
+    payload.update(run_info)
+    payload.update(REGISTRY.snapshot())
+    return payload
+
+
+def prometheus(prefix: str = 'spiceflow') -> str:
+    """Metrics in the Prometheus text exposition format."""
+    snapshot = REGISTRY.snapshot()
+    lines = [f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage",
+             f"# TYPE {prefix}_stage_seconds histogram"]
+    for name, hist in snapshot['stages'].items():
+        lines += _histogram_lines(f"{prefix}_stage_seconds", hist, f'stage="{name}",')
+    for name, value in snapshot['counters'].items():
+        lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+    for name, hist in snapshot['histograms'].items():
+        lines.append(f"# TYPE {prefix}_{name} histogram")
+        lines += _histogram_lines(f"{prefix}_{name}", hist, '')
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: str, hist: Dict[str, Any], labels: str):
+    cumulative = 0
+    for bound, n in zip(hist['bounds'] + ['+Inf'], hist['buckets']):
+        cumulative += n
+        yield f'{metric}_bucket{{{labels}le="{bound}"}} {cumulative}'
+    plain = f"{{{labels.rstrip(',')}}}" if labels else ''
+    yield f"{metric}_sum{plain} {hist['sum']}"
+    yield f"{metric}_count{plain} {hist['count']}"
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    replace_file(tmp, path)
+
+
+def write_report(path: Path, **run_info: Any) -> Path:
+    """Write the JSON run report."""
+    _write_atomic(path, json.dumps(report(**run_info), indent=2))
+    return path
+
+
+def write_prometheus(path: Path) -> Path:
+    """Write a Prometheus text file (e.g. for node_exporter's textfile collector)."""
+    _write_atomic(path, prometheus())
+    return path
+
+
+# -- profiling ----------------------------------------------------------
+class StackSampler:
+    """Samples the profiled thread's Python stack on a timer thread."""
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def folded(self) -> str:
+        """Stacks in the folded format read by flamegraph.pl and speedscope."""
+        return ''.join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+@contextmanager
+def profiled(prefix: Path, interval: float = DEFAULT_SAMPLE_INTERVAL) -> Iterator[Tuple[Path, Path]]:
+    """Profile the block into ``<prefix>.prof`` (cProfile) and ``<prefix>.folded``.
+
+    Only the calling thread is sampled; work in process-pool workers shows
+    up as time waiting on futures.
+    """
+    prof_path = Path(f"{prefix}.prof")
+    folded_path = Path(f"{prefix}.folded")
+    prof_path.parent.mkdir(parents=True, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval)
+    sampler.start()
+    profiler.enable()
+    try:
+        yield prof_path, folded_path
+    finally:
+        profiler.disable()
+        sampler.stop()
+        profiler.dump_stats(prof_path)
+        _write_atomic(folded_path, sampler.folded())
@@ -0,0 +1,275 @@
+"""Vectorised internal-rate-of-return solver for lease cash-flow books.
+
+Usage
+-----
+>>> from irr import solve_irr
+>>> result = solve_irr([[-1000, 600, 600], [-500, 100, 100, 400]])
+>>> result.rate.round(4)
+array([0.1307, 0.0763])
+>>> result.converged
+array([ True,  True])
+
+Every row is a cash-flow series where index 0 is the (usually negative)
+investment at t=0.  Ragged rows are zero-padded, which leaves NPV unchanged.
+NPV and its derivative are evaluated for all leases at once with Horner's
+rule in ``x = 1 / (1 + r)``.  Each row gets a sign-change bracket from a
+fixed rate grid, then a safeguarded Newton iteration that falls back to
+bisection whenever a step leaves the bracket.  Rows with no bracket (odd
+sign patterns, touching roots) are handed to ``numpy.roots``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+
+__all__ = [
+    "CONVERGED",
+    "POLYNOMIAL_ROOT",
+    "NOT_CONVERGED",
+    "NO_IRR",
+    "IRRResult",
+    "lease_cash_flow_matrix",
+    "solve_irr",
+]
+
+# Per-lease status codes reported in IRRResult.status
+CONVERGED = 0  # bracketed Newton/bisection converged
+POLYNOMIAL_ROOT = 1  # no bracket on the grid; real root found by numpy.roots
+NOT_CONVERGED = 2  # bracket found but iteration budget exhausted
+NO_IRR = 3  # no real rate above -100% zeroes the NPV
+
+STATUS_NAMES = {
+    CONVERGED: "converged",
+    POLYNOMIAL_ROOT: "polynomial_root",
+    NOT_CONVERGED: "not_converged",
+    NO_IRR: "no_irr",
+}
+
+# Candidate rates scanned for a sign change.
+_BRACKET_GRID = np.array(
+    [-0.99, -0.9, -0.5, -0.2, -0.05, 0.0, 0.05, 0.1, 0.2, 0.5, 1.0, 3.0, 10.0, 100.0]
+)
+
+
+@dataclass
+class IRRResult:
+    """Per-lease IRR solutions; ``rate`` is NaN wherever no IRR was found."""
+
+    rate: np.ndarray
+    status: np.ndarray
+    iterations: int
+
+    @property
+    def converged(self) -> np.ndarray:
+        """Boolean mask of leases with a trustworthy rate."""
+        return (self.status == CONVERGED) | (self.status == POLYNOMIAL_ROOT)
+
+    def status_names(self) -> list[str]:
+        """Readable status label for every lease."""
+        return [STATUS_NAMES[int(s)] for s in self.status]
+
+
+def _as_matrix(cash_flows) -> np.ndarray:
+    """Return a 2-D float matrix, zero-padding ragged rows."""
+    if isinstance(cash_flows, np.ndarray):
+        matrix = np.asarray(cash_flows, dtype=float)
+        return matrix[None, :] if matrix.ndim == 1 else matrix
+    rows = [np.asarray(row, dtype=float) for row in cash_flows]
+    width = max((len(row) for row in rows), default=0)
+    matrix = np.zeros((len(rows), width))
+    for i, row in enumerate(rows):
+        matrix[i, : len(row)] = row
+    return matrix
+
+
+# Below this many leases the per-step ufunc overhead of Horner's rule
+# outweighs the cost of raising x to every power at once.
+_HORNER_MIN_LEASES = 64
+
+
+def _npv(cf_t: np.ndarray, rate: np.ndarray) -> np.ndarray:
+    """NPV of each column of the time-major matrix ``cf_t`` at its ``rate``."""
+    x = 1.0 / (1.0 + rate)
+    if cf_t.shape[1] < _HORNER_MIN_LEASES:
+        powers = x ** np.arange(cf_t.shape[0])[:, None]
+        return (cf_t * powers).sum(axis=0)
+    p = cf_t[-1].copy()
+    for t in range(cf_t.shape[0] - 2, -1, -1):
+        p *= x
+        p += cf_t[t]
+    return p
+
+
+def _npv_and_slope(cf_t: np.ndarray, rate: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """NPV and dNPV/dr of each column of ``cf_t`` at its ``rate``."""
+    x = 1.0 / (1.0 + rate)
+    if cf_t.shape[1] < _HORNER_MIN_LEASES:
+        years = np.arange(cf_t.shape[0])[:, None]
+        powers = x ** years
+        p = (cf_t * powers).sum(axis=0)
+        dp = (years[1:] * cf_t[1:] * powers[:-1]).sum(axis=0)
+    else:
+        p = cf_t[-1].copy()
+        dp = np.zeros_like(p)
+        for t in range(cf_t.shape[0] - 2, -1, -1):
+            dp *= x
+            dp += p
+            p *= x
+            p += cf_t[t]
+    # d/dr of sum(cf_t * x**t) is p'(x) * dx/dr with dx/dr = -x**2
+    return p, -dp * x * x
+
+
+def _columns(cf_t: np.ndarray, idx: np.ndarray) -> np.ndarray:
+    """Columns ``idx`` of ``cf_t``, skipping the gather when all are kept."""
+    return cf_t if idx.size == cf_t.shape[1] else cf_t[:, idx]
+
+
+def _polynomial_root(cf_row: np.ndarray, guess: float) -> float:
+    """Real IRR above -100% closest to ``guess`` via the companion matrix."""
+    coeffs = np.trim_zeros(cf_row[::-1], "f")
+    if len(coeffs) < 2:
+        return np.nan
+    roots = np.roots(coeffs)
+    real = roots[np.abs(roots.imag) <= 1e-9 * np.maximum(1.0, np.abs(roots.real))].real
+    real = real[real > 0]
+    if real.size == 0:
+        return np.nan
+    rates = 1.0 / real - 1.0
+    return float(rates[np.argmin(np.abs(rates - guess))])
+
+
+def _bracket(cf_t: np.ndarray, guess: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Grid interval with an NPV sign change nearest ``guess`` for each lease.
+
+    Intervals are tried from the guess outwards and only leases still
+    without a bracket are evaluated, so a conventional book usually costs
+    two or three NPV sweeps.  Unbracketed leases come back as NaN.
+    """
+    n = cf_t.shape[1]
+    lo = np.full(n, np.nan)
+    hi = np.full(n, np.nan)
+    f_lo = np.full(n, np.nan)
+    grid = _BRACKET_GRID
+    order = sorted(
+        range(len(grid) - 1),
+        key=lambda k: max(0.0, grid[k] - guess, guess - grid[k + 1]),
+    )
+    npv_at: dict[int, np.ndarray] = {}
+    pending = np.arange(n)
+    with np.errstate(over="ignore", invalid="ignore"):
+        for k in order:
+            if pending.size == 0:
+                break
+            for j in (k, k + 1):
+                if j not in npv_at:
+                    values = np.full(n, np.nan)
+                    values[pending] = _npv(_columns(cf_t, pending), np.full(pending.size, grid[j]))
+                    npv_at[j] = values
+            f_a, f_b = npv_at[k][pending], npv_at[k + 1][pending]
+            crosses = np.sign(f_a) * np.sign(f_b) <= 0
+            found = pending[crosses]
+            lo[found], hi[found], f_lo[found] = grid[k], grid[k + 1], f_a[crosses]
+            pending = pending[~crosses]
+    return lo, hi, f_lo
+
+
+def solve_irr(
+    cash_flows: Sequence[Sequence[float]] | np.ndarray,
+    *,
+    guess: float = 0.10,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> IRRResult:
+    """Solve the IRR of every cash-flow row at once.
+
+    Parameters
+    ----------
+    cash_flows
+        2-D array (or ragged sequence) with one lease per row; column ``t``
+        is the cash flow at the end of year ``t``.
+    guess
+        Preferred rate when a row has more than one IRR.
+    tolerance
+        Convergence threshold on the rate step, relative to ``1 + |r|``.
+    max_iterations
+        Newton/bisection budget shared by all rows.
+    """
+    cf = _as_matrix(cash_flows)
+    n = cf.shape[0]
+    rate = np.full(n, np.nan)
+    status = np.full(n, NO_IRR, dtype=np.int8)
+    if n == 0 or cf.shape[1] < 2:
+        return IRRResult(rate=rate, status=status, iterations=0)
+
+    # Time-major copy so Horner's rule reads contiguous rows.
+    cf_t = np.ascontiguousarray(cf.T)
+    lo, hi, f_lo = _bracket(cf_t, guess)
+    bracketed = np.isfinite(lo)
+    exact_lo = bracketed & (f_lo == 0)
+    rate[exact_lo] = lo[exact_lo]
+    status[exact_lo] = CONVERGED
+
+    # Safeguarded Newton: accept the step only while it stays in the bracket.
+    active = np.flatnonzero(bracketed & ~exact_lo)
+    block = _columns(cf_t, active)
+    r = np.clip(np.full(active.size, guess), lo[active], hi[active])
+    a, b, fa = lo[active], hi[active], f_lo[active]
+    iterations = 0
+    while active.size and iterations < max_iterations:
+        iterations += 1
+        f, df = _npv_and_slope(block, r)
+        same_side = np.sign(f) == np.sign(fa)
+        a = np.where(same_side, r, a)
+        fa = np.where(same_side, f, fa)
+        b = np.where(same_side, b, r)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = r - f / df
+        bisect = ~np.isfinite(newton) | (newton <= np.minimum(a, b)) | (newton >= np.maximum(a, b))
+        r_new = np.where(bisect, 0.5 * (a + b), newton)
+        done = (np.abs(r_new - r) <= tolerance * (1.0 + np.abs(r))) | (f == 0)
+        finished = active[done]
+        rate[finished] = np.where(f[done] == 0, r[done], r_new[done])
+        status[finished] = CONVERGED
+        keep = ~done
+        if not keep.all():
+            active, r, a, b, fa = active[keep], r_new[keep], a[keep], b[keep], fa[keep]
+            block = block[:, keep]
+        else:
+            r = r_new
+    rate[active] = r
+    status[active] = NOT_CONVERGED
+
+    for i in np.flatnonzero(~bracketed):
+        root = _polynomial_root(cf[i], guess)
+        if np.isfinite(root):
+            rate[i] = root
+            status[i] = POLYNOMIAL_ROOT
+
+    return IRRResult(rate=rate, status=status, iterations=iterations)
+
+
+def lease_cash_flow_matrix(
+    investment: Sequence[float] | np.ndarray,
+    annual_rent: Sequence[float] | np.ndarray,
+    term_years: Sequence[int] | np.ndarray,
+    escalator: Sequence[float] | np.ndarray | float = 0.0,
+) -> np.ndarray:
+    """Buyout cash flows for a book: ``-investment`` then escalating rents.
+
+    Row ``i`` holds ``term_years[i]`` rents after the investment and zeros
+    beyond, ready for ``solve_irr``.
+    """
+    investment, rent, terms, esc = np.broadcast_arrays(
+        np.asarray(investment, dtype=float),
+        np.asarray(annual_rent, dtype=float),
+        np.asarray(term_years, dtype=np.int64),
+        np.asarray(escalator, dtype=float),
+    )
+    width = int(terms.max(initial=0))
+    years = np.arange(width)
+    rents = rent[:, None] * (1 + esc[:, None]) ** years
+    rents[years >= terms[:, None]] = 0.0
+    return np.column_stack([-investment, rents])
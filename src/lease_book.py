@@ -0,0 +1,417 @@
+"""Columnar storage for valued leases.
+
+Usage
+-----
+>>> book = LeaseBook.from_results(results)
+>>> book.totals().total_buyout
+>>> for row in book:                     # LeaseResult-compatible row views
+...     print(row.name, row.buyout_offer)
+
+``LeaseBook`` keeps one NumPy structured array for the numeric fields and
+interns every string column (name, location, developer, risk tier, renewal
+options) into a per-column pool, so a repeated developer or location costs a
+4-byte code rather than a Python string per lease. Credit assessments are
+interned by content, so leases sharing a lookup result share one dict.
+Portfolio aggregates are vectorised passes over the columns.
+
+``PortfolioAccumulator`` computes the same aggregates in one streaming pass
+over any iterable of leases, keeping only the top-N offers in a heap, and
+``LeaseBook.records`` decodes rows a batch at a time for writers that touch
+every field.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import math
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+__all__ = [
+    "LeaseBook",
+    "LeaseRecord",
+    "LeaseRow",
+    "PortfolioAccumulator",
+    "PortfolioTotals",
+    "StringPool",
+]
+
+NUMERIC_FIELDS = [
+    ("annual_rent", np.float64),
+    ("annual_rent_per_acre", np.float64),  # NaN when acres unknown
+    ("term_years", np.int32),
+    ("total_potential_term", np.int32),  # 0 when unknown
+    ("escalator", np.float64),
+    ("acres", np.float64),
+    ("pv_value", np.float64),
+    ("undiscounted_value", np.float64),
+    ("buyout_offer", np.float64),
+    ("multiple", np.float64),  # NaN when the lease has no IRR
+    ("discount_rate", np.float64),
+]
+STRING_FIELDS = ["name", "renewal_options", "risk_tier", "location", "developer"]
+# Whole-number floats read back as int so reports print "$95,680", not "$95,680.0"
+_INTEGRAL_FIELDS = {"annual_rent", "acres"}
+# Stored as whole years; a part year rounds up, as LeaseParams.cash_flows pays it in full
+_YEAR_FIELDS = {"term_years", "total_potential_term"}
+# Numeric fields stored as NaN when None
+NULLABLE_FIELDS = {"annual_rent_per_acre", "multiple"}
+
+# ``LeaseResult``'s field order
+RECORD_FIELDS = [
+    "name", "annual_rent", "annual_rent_per_acre", "term_years", "renewal_options",
+    "total_potential_term", "escalator", "risk_tier", "location", "acres", "developer",
+    "pv_value", "undiscounted_value", "buyout_offer", "multiple", "discount_rate", "credit_data",
+]
+LeaseRecord = namedtuple("LeaseRecord", RECORD_FIELDS)
+
+LEASE_DTYPE = np.dtype(
+    NUMERIC_FIELDS
+    + [(f"{name}_code", np.int32) for name in STRING_FIELDS]
+    + [("credit_code", np.int32)]
+)
+
+
+class StringPool:
+    """Interned values for one column; code ``-1`` means None."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[Any] = []
+        self._codes: Dict[Any, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def code(self, value, key=None) -> int:
+        """Code for ``value``, adding it on first sight (``key`` for unhashables)."""
+        if value is None:
+            return -1
+        key = value if key is None else key
+        code = self._codes.get(key)
+        if code is None:
+            code = len(self.values)
+            self._codes[key] = code
+            self.values.append(value)
+        return code
+
+    def value(self, code: int):
+        return None if code < 0 else self.values[code]
+
+
+@dataclass(frozen=True)
+class PortfolioTotals:
+    """Portfolio aggregates used by the summary and executive reports."""
+
+    count: int
+    total_buyout: float
+    total_pv: float
+    total_annual_rent: float
+    total_acres: float
+    avg_multiple: float  # over leases with an IRR; NaN when none has one
+    weighted_term: float
+    max_buyout: float
+    risk_breakdown: Dict[str, int]
+
+
+class PortfolioAccumulator:
+    """One-pass ``PortfolioTotals`` plus the ``top_n`` largest buyout offers.
+
+    Memory is O(top_n) however many leases are added; ``top_n=None`` keeps
+    every lease.
+    """
+
+    def __init__(self, top_n: Optional[int] = None):
+        self.top_n = top_n
+        self.count = 0
+        self.total_buyout = 0.0
+        self.total_pv = 0.0
+        self.total_annual_rent = 0.0
+        self.total_acres = 0.0
+        self.total_multiple = 0.0
+        self.multiple_count = 0  # leases with an IRR
+        self.rent_weighted_term = 0.0
+        self.max_buyout = 0.0
+        self.risk_breakdown: Dict[str, int] = {}
+        self._heap: List[tuple] = []  # (offer, -arrival, lease): min-heap of the top offers
+
+    def add(self, lease) -> None:
+        """Fold one ``LeaseResult``-shaped lease into the aggregates."""
+        offer = lease.buyout_offer
+        rent = lease.annual_rent
+        self.count += 1
+        self.total_buyout += offer
+        self.total_pv += lease.pv_value
+        self.total_annual_rent += rent
+        self.total_acres += lease.acres or 0
+        if lease.multiple is not None:
+            self.total_multiple += lease.multiple
+            self.multiple_count += 1
+        self.rent_weighted_term += lease.term_years * rent
+        self.max_buyout = max(self.max_buyout, offer)
+        tier = lease.risk_tier
+        self.risk_breakdown[tier] = self.risk_breakdown.get(tier, 0) + 1
+
+        # Earlier arrivals win ties, matching a stable descending sort
+        entry = (offer, -self.count, lease)
+        if self.top_n is None or len(self._heap) < self.top_n:
+            heapq.heappush(self._heap, entry)
+        elif self.top_n and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def update(self, leases: Iterable) -> "PortfolioAccumulator":
+        """Add every lease; returns self for chaining."""
+        for lease in leases:
+            self.add(lease)
+        return self
+
+    def top(self) -> List[Any]:
+        """Kept leases, largest offer first (ties in arrival order)."""
+        return [lease for _, _, lease in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+    def totals(self) -> PortfolioTotals:
+        rent = self.total_annual_rent
+        return PortfolioTotals(
+            count=self.count,
+            total_buyout=self.total_buyout,
+            total_pv=self.total_pv,
+            total_annual_rent=rent,
+            total_acres=self.total_acres,
+            avg_multiple=self.total_multiple / self.multiple_count if self.multiple_count else float("nan"),
+            weighted_term=self.rent_weighted_term / rent if rent else 0.0,
+            max_buyout=self.max_buyout,
+            risk_breakdown=dict(self.risk_breakdown),
+        )
+
+
+class LeaseRow:
+    """Read-only view of one lease with ``LeaseResult``'s attribute names."""
+
+    __slots__ = ("_book", "_index")
+
+    def __init__(self, book: "LeaseBook", index: int):
+        self._book = book
+        self._index = index
+
+    def __repr__(self) -> str:
+        return f"LeaseRow({self.name!r}, buyout_offer={self.buyout_offer!r})"
+
+    @property
+    def credit_data(self) -> dict:
+        return self._book._credit.value(int(self._book._rows["credit_code"][self._index]))
+
+
+def _numeric_property(field: str):
+    integral = field in _INTEGRAL_FIELDS
+
+    def getter(row: LeaseRow):
+        value = row._book._rows[field][row._index].item()
+        if field in NULLABLE_FIELDS:
+            return None if value != value else value
+        if field == "total_potential_term":
+            return value or None
+        if integral and value.is_integer():
+            return int(value)
+        return value
+
+    return property(getter)
+
+
+def _string_property(field: str):
+    def getter(row: LeaseRow):
+        code = int(row._book._rows[f"{field}_code"][row._index])
+        return row._book._pools[field].value(code)
+
+    return property(getter)
+
+
+for _field, _ in NUMERIC_FIELDS:
+    setattr(LeaseRow, _field, _numeric_property(_field))
+for _field in STRING_FIELDS:
+    setattr(LeaseRow, _field, _string_property(_field))
+
+
+class LeaseBook:
+    """Growable columnar store of ``LeaseResult`` records."""
+
+    def __init__(self, capacity: int = 0):
+        self._rows = np.zeros(capacity, dtype=LEASE_DTYPE)
+        self._size = 0
+        self._pools = {field: StringPool() for field in STRING_FIELDS}
+        self._credit = StringPool()
+
+    @classmethod
+    def from_results(cls, results: Iterable) -> "LeaseBook":
+        """Build a book from ``LeaseResult`` objects (or anything shaped like one)."""
+        results = list(results)
+        book = cls(capacity=len(results))
+        book.extend(results)
+        return book
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, Any]) -> "LeaseBook":
+        """Build a book from per-field columns (see ``lease_io.read_columns``).
+
+        Numeric columns may use NaN or None for missing values. String
+        columns and ``credit_data`` are either per-row values or a
+        ``(codes, values)`` dictionary encoding in which code -1 is None.
+        """
+        size = len(columns["annual_rent"])
+        book = cls(capacity=size)
+        rows = book._rows
+        for field, _ in NUMERIC_FIELDS:
+            values = np.asarray(columns[field], dtype=np.float64)
+            if field not in NULLABLE_FIELDS:
+                values = np.nan_to_num(values, nan=0.0)
+            rows[field] = values
+        for field in STRING_FIELDS + ["credit_data"]:
+            if field == "credit_data":
+                pool, target = book._credit, "credit_code"
+                code = lambda v: pool.code(v or {}, key=json.dumps(v or {}, sort_keys=True, default=str))
+            else:
+                pool, target = book._pools[field], f"{field}_code"
+                code = pool.code
+            encoded = columns[field]
+            if isinstance(encoded, tuple):
+                codes, values = encoded
+                # Trailing -1 so code -1 (None) maps to itself
+                remap = np.array([code(v) for v in values] + [-1], dtype=np.int32)
+                if field == "credit_data":
+                    remap[-1] = code(None)
+                rows[target] = remap[np.asarray(codes)]
+            else:
+                rows[target] = np.fromiter((code(v) for v in encoded), dtype=np.int32, count=size)
+        book._size = size
+        return book
+
+    # -- building -------------------------------------------------------
+    def append(self, result) -> None:
+        """Add one ``LeaseResult``."""
+        self.extend([result])
+
+    def extend(self, results: Iterable, batch_size: int = 65536) -> None:
+        """Add ``LeaseResult`` objects, converting them in batches of rows."""
+        batch = []
+        for result in results:
+            batch.append(self._encode(result))
+            if len(batch) == batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def _encode(self, result) -> tuple:
+        numeric = []
+        for field, _ in NUMERIC_FIELDS:
+            value = getattr(result, field)
+            if value is None:
+                value = np.nan if field in NULLABLE_FIELDS else 0
+            elif field in _YEAR_FIELDS:
+                value = math.ceil(value)
+            numeric.append(value)
+        codes = [self._pools[field].code(getattr(result, field)) for field in STRING_FIELDS]
+        credit = result.credit_data or {}
+        credit_code = self._credit.code(credit, key=json.dumps(credit, sort_keys=True, default=str))
+        return (*numeric, *codes, credit_code)
+
+    def _write(self, batch: List[tuple]) -> None:
+        end = self._size + len(batch)
+        if end > len(self._rows):
+            grown = np.zeros(max(16, end, 2 * len(self._rows)), dtype=LEASE_DTYPE)
+            grown[: self._size] = self._rows[: self._size]
+            self._rows = grown
+        self._rows[self._size:end] = np.array(batch, dtype=LEASE_DTYPE)
+        self._size = end
+
+    # -- access ---------------------------------------------------------
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: int) -> LeaseRow:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("LeaseBook index out of range")
+        return LeaseRow(self, index)
+
+    def __iter__(self) -> Iterator[LeaseRow]:
+        return (LeaseRow(self, i) for i in range(self._size))
+
+    def records(self, batch_size: int = 4096) -> Iterator[LeaseRecord]:
+        """Rows as ``LeaseRecord`` tuples, decoded ``batch_size`` rows at a time.
+
+        Values match ``LeaseRow``'s; much faster when every field is read.
+        """
+        for start in range(0, self._size, batch_size):
+            rows = self._rows[start: min(start + batch_size, self._size)]
+            columns = []
+            for field in RECORD_FIELDS:
+                if field == "credit_data":
+                    columns.append([self._credit.value(c) for c in rows["credit_code"].tolist()])
+                elif field in self._pools:
+                    pool = self._pools[field]
+                    columns.append([pool.value(c) for c in rows[f"{field}_code"].tolist()])
+                elif field in NULLABLE_FIELDS:
+                    columns.append([None if v != v else v for v in rows[field].tolist()])
+                elif field == "total_potential_term":
+                    columns.append([v or None for v in rows[field].tolist()])
+                elif field in _INTEGRAL_FIELDS:
+                    columns.append([int(v) if v.is_integer() else v for v in rows[field].tolist()])
+                else:
+                    columns.append(rows[field].tolist())
+            yield from map(LeaseRecord._make, zip(*columns))
+
+    def column(self, field: str) -> np.ndarray:
+        """Numeric column (read-only view), or decoded values for a string column."""
+        if field in self._pools:
+            values = np.array(self._pools[field].values + [None], dtype=object)
+            return values[self._rows[f"{field}_code"][: self._size]]
+        view = self._rows[field][: self._size]
+        view.flags.writeable = False
+        return view
+
+    def encoded(self, field: str) -> Tuple[np.ndarray, List[Any]]:
+        """Dictionary encoding of a string column or ``credit_data``: (codes view, values)."""
+        if field == "credit_data":
+            return self._rows["credit_code"][: self._size], self._credit.values
+        return self._rows[f"{field}_code"][: self._size], self._pools[field].values
+
+    def sorted_by(self, field: str, reverse: bool = False) -> List[LeaseRow]:
+        """Rows ordered by a numeric column; ties keep insertion order."""
+        values = self._rows[field][: self._size]
+        order = np.argsort(-values if reverse else values, kind="stable")
+        return [LeaseRow(self, int(i)) for i in order]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column array (excluding interned pools)."""
+        return self._rows[: self._size].nbytes
+
+    # -- aggregates -----------------------------------------------------
+    def totals(self) -> PortfolioTotals:
+        """All portfolio aggregates in vectorised passes."""
+        rows = self._rows[: self._size]
+        rent = rows["annual_rent"]
+        total_rent = float(rent.sum())
+        multiples = rows["multiple"][~np.isnan(rows["multiple"])]
+        tier_codes = rows["risk_tier_code"]
+        counts = np.bincount(tier_codes[tier_codes >= 0], minlength=len(self._pools["risk_tier"]))
+        # Pool codes follow first appearance, matching dict-insertion order
+        breakdown = {
+            self._pools["risk_tier"].values[code]: int(n) for code, n in enumerate(counts) if n
+        }
+        return PortfolioTotals(
+            count=self._size,
+            total_buyout=float(rows["buyout_offer"].sum()),
+            total_pv=float(rows["pv_value"].sum()),
+            total_annual_rent=total_rent,
+            total_acres=float(rows["acres"].sum()),
+            avg_multiple=float(multiples.mean()) if len(multiples) else float("nan"),
+            weighted_term=float((rows["term_years"] * rent).sum() / total_rent) if total_rent else 0.0,
+            max_buyout=float(rows["buyout_offer"].max(initial=0.0)),
+            risk_breakdown=breakdown,
+        )
@@ -0,0 +1,300 @@
+"""Columnar export and import of valued leases: Parquet, Arrow IPC and CSV.
+
+Usage
+-----
+>>> from lease_io import write_leases, read_columns, read_leases
+>>> write_leases(book, "output/leases.parquet")
+>>> cols = read_columns("output/leases.arrow", ["annual_rent", "term_years", "escalator"])
+>>> pv_buyout_batch(**cols, discount_rate=0.10, buyout_pct=0.85)
+>>> book = read_leases("output/leases.parquet")        # full LeaseBook round trip
+
+Parquet and Arrow files are written as a stream of record batches straight
+from a ``LeaseBook``'s columns. Repetitive string columns (renewal options,
+risk tier, location, developer) are dictionary-encoded from the book's
+interned pools, and ``credit_data`` is a nested struct. Arrow IPC files are
+memory-mapped on read, so numeric columns of a single-batch file reach
+NumPy without a copy; ``iter_batches`` gives zero-copy views batch by batch
+for larger files.
+
+CSV is written with the standard library (credit data as a JSON column)
+and needs no extra packages; Parquet and Arrow need ``pyarrow``.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from lease_book import NULLABLE_FIELDS, NUMERIC_FIELDS, RECORD_FIELDS, LeaseBook
+
+__all__ = [
+    "FORMATS",
+    "iter_batches",
+    "read_columns",
+    "read_leases",
+    "write_leases",
+]
+
+FORMATS = ("parquet", "arrow", "csv")
+SUFFIXES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+DEFAULT_BATCH_ROWS = 65536
+
+_NUMERIC = [name for name, _ in NUMERIC_FIELDS]
+_DICTIONARY_FIELDS = ["renewal_options", "risk_tier", "location", "developer"]
+# Credit assessment fields with a fixed type; anything else goes to ``extra`` as JSON
+_CREDIT_FIELDS = [
+    ("company_name", "string"),
+    ("clean_name", "string"),
+    ("public_company", "bool"),
+    ("years_since_incorp", "int32"),
+    ("state_of_incorp", "string"),
+    ("risk_tier", "string"),
+    ("data_sources", "list<string>"),
+    ("lookup_timestamp", "string"),
+    ("recommended_discount", "float64"),
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("pyarrow not installed. Install with: pip install pyarrow") from None
+    return pa
+
+
+def format_for(path: Path, fmt: Optional[str] = None) -> str:
+    """Explicit ``fmt``, or the format implied by the file suffix."""
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}; choose from {', '.join(FORMATS)}")
+        return fmt
+    suffix = Path(path).suffix.lower()
+    for name, ext in SUFFIXES.items():
+        if suffix == ext or (name == "arrow" and suffix in (".feather", ".ipc")):
+            return name
+    raise ValueError(f"Cannot infer format from {path}; pass one of {', '.join(FORMATS)}")
+
+
+# -- Arrow schema ---------------------------------------------------------
+def _credit_type(pa):
+    types = {"string": pa.string(), "bool": pa.bool_(), "int32": pa.int32(),
+             "float64": pa.float64(), "list<string>": pa.list_(pa.string())}
+    fields = [pa.field(name, types[kind]) for name, kind in _CREDIT_FIELDS]
+    return pa.struct(fields + [pa.field("extra", pa.string())])
+
+
+def lease_schema():
+    """Arrow schema of an exported lease file."""
+    pa = _pyarrow()
+    fields = [pa.field("name", pa.string())]
+    for name, dtype in NUMERIC_FIELDS:
+        fields.append(pa.field(name, pa.from_numpy_dtype(dtype),
+                               nullable=name in NULLABLE_FIELDS or name == "total_potential_term"))
+    for name in _DICTIONARY_FIELDS:
+        fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+    fields.append(pa.field("credit_data", _credit_type(pa)))
+    return pa.schema(fields)
+
+
+def _credit_struct(credit: Optional[dict]) -> Optional[dict]:
+    if not credit:
+        return None
+    known = {name for name, _ in _CREDIT_FIELDS}
+    row = {name: credit.get(name) for name, _ in _CREDIT_FIELDS}
+    # A null struct field reads back as absent; keys that were present but None go to extra
+    extra = {k: v for k, v in credit.items() if k not in known or v is None}
+    row["extra"] = json.dumps(extra, default=str) if extra else None
+    return row
+
+
+def _record_batches(book: LeaseBook, schema, batch_rows: int):
+    """Record batches built from column slices and the book's interned pools."""
+    pa = _pyarrow()
+    names = book.column("name")
+    dictionaries = {}
+    for field in _DICTIONARY_FIELDS:
+        codes, values = book.encoded(field)
+        dictionaries[field] = (codes, pa.array(values, type=pa.string()))
+    credit_codes, credits = book.encoded("credit_data")
+    credit_pool = pa.array([_credit_struct(c) for c in credits], type=schema.field("credit_data").type)
+
+    for start in range(0, len(book), batch_rows):
+        stop = min(start + batch_rows, len(book))
+        arrays = [pa.array(names[start:stop], type=pa.string())]
+        for field in _NUMERIC:
+            values = np.ascontiguousarray(book.column(field)[start:stop])
+            mask = None
+            if field in NULLABLE_FIELDS:
+                mask = np.isnan(values)
+            elif field == "total_potential_term":
+                mask = values == 0
+            arrays.append(pa.array(values, mask=mask, type=schema.field(field).type))
+        for field in _DICTIONARY_FIELDS:
+            codes, dictionary = dictionaries[field]
+            chunk = codes[start:stop]
+            indices = pa.array(chunk, mask=chunk < 0, type=pa.int32())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+        chunk = credit_codes[start:stop]
+        arrays.append(credit_pool.take(pa.array(chunk, mask=chunk < 0, type=pa.int32())))
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# -- writing --------------------------------------------------------------
+def write_leases(results, path: Path, fmt: Optional[str] = None,
+                 batch_rows: int = DEFAULT_BATCH_ROWS) -> Path:
+    """Write leases (a LeaseBook or LeaseResult objects) as Parquet, Arrow or CSV."""
+    path = Path(path)
+    fmt = format_for(path, fmt)
+    if fmt == "csv":
+        _write_csv(results, path)
+        return path
+
+    book = results if isinstance(results, LeaseBook) else LeaseBook.from_results(results)
+    pa = _pyarrow()
+    schema = lease_schema()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+            for batch in _record_batches(book, schema, batch_rows):
+                writer.write_batch(batch)
+    else:
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            for batch in _record_batches(book, schema, batch_rows):
+                writer.write_batch(batch)
+    return path
+
+
+def _write_csv(results, path: Path):
+    rows = results.records() if isinstance(results, LeaseBook) else results
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        writer = csv.writer(f)
+        writer.writerow(RECORD_FIELDS)
+        for r in rows:
+            writer.writerow([
+                "" if value is None else value
+                for value in (getattr(r, field) for field in RECORD_FIELDS[:-1])
+            ] + [json.dumps(r.credit_data or {}, default=str)])
+
+
+# -- reading --------------------------------------------------------------
+def _open_table(path: Path, fmt: str, columns: Optional[Sequence[str]]):
+    pa = _pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=True)
+    source = pa.memory_map(str(path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    return table.select(list(columns)) if columns is not None else table
+
+
+def _to_numpy(array, field: str):
+    """NumPy view of an Arrow column chunk (a copy only where nulls or strings require one)."""
+    if field == "credit_data":
+        return np.array([_credit_dict(v) for v in array.to_pylist()], dtype=object)
+    if field == "total_potential_term":
+        return array.fill_null(0).to_numpy()
+    if field in _NUMERIC:
+        return array.to_numpy(zero_copy_only=array.null_count == 0)
+    if hasattr(array, "dictionary_decode"):
+        array = array.dictionary_decode()
+    return array.to_numpy(zero_copy_only=False)
+
+
+def _credit_dict(row: Optional[dict]) -> dict:
+    if row is None:
+        return {}
+    extra = row.pop("extra", None)
+    credit = {k: v for k, v in row.items() if v is not None}
+    if extra:
+        credit.update(json.loads(extra))
+    return credit
+
+
+def iter_batches(path: Path, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+    """Per-batch NumPy columns of a Parquet or Arrow file (zero-copy where possible)."""
+    fmt = format_for(path)
+    if fmt == "csv":
+        raise ValueError("iter_batches needs a Parquet or Arrow file; use read_columns for CSV")
+    table = _open_table(Path(path), fmt, columns)
+    for batch in table.to_batches():
+        yield {name: _to_numpy(batch.column(i), name) for i, name in enumerate(batch.schema.names)}
+
+
+def _column(table, name: str) -> np.ndarray:
+    chunks = table.column(name).chunks
+    if len(chunks) == 1:
+        return _to_numpy(chunks[0], name)
+    if not chunks:
+        return _to_numpy(table.column(name).combine_chunks(), name)
+    return np.concatenate([_to_numpy(chunk, name) for chunk in chunks])
+
+
+def read_columns(path: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """Whole columns as NumPy arrays, keyed by ``LeaseResult`` field name.
+
+    ``columns=None`` reads every field except ``credit_data`` (ask for it
+    explicitly; it decodes to Python dicts). Numeric columns without nulls
+    from a memory-mapped, single-batch Arrow file are zero-copy views.
+    """
+    path = Path(path)
+    fmt = format_for(path)
+    if columns is None:
+        columns = [f for f in RECORD_FIELDS if f != "credit_data"]
+    if fmt == "csv":
+        return _read_csv_columns(path, columns)
+    table = _open_table(path, fmt, columns)
+    return {name: _column(table, name) for name in columns}
+
+
+def _read_csv_columns(path: Path, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        wanted = [header.index(name) for name in columns]
+        raw: List[List[str]] = [[] for _ in columns]
+        for row in reader:
+            for out, i in zip(raw, wanted):
+                out.append(row[i])
+
+    result = {}
+    for name, values in zip(columns, raw):
+        if name == "credit_data":
+            result[name] = np.array([json.loads(v) for v in values], dtype=object)
+        elif name in _NUMERIC:
+            dtype = dict(NUMERIC_FIELDS)[name]
+            parsed = np.array([float(v) if v else np.nan for v in values], dtype=np.float64)
+            if np.issubdtype(dtype, np.integer):
+                parsed = np.nan_to_num(parsed, nan=0.0).astype(dtype)
+            result[name] = parsed
+        else:
+            result[name] = np.array([v if v else None for v in values], dtype=object)
+    return result
+
+
+def read_leases(path: Path) -> LeaseBook:
+    """Load an exported file back into a LeaseBook."""
+    path = Path(path)
+    fmt = format_for(path)
+    if fmt == "csv":
+        return LeaseBook.from_columns(read_columns(path, RECORD_FIELDS))
+
+    table = _open_table(path, fmt, None)
+    columns: Dict[str, Any] = {}
+    for name in RECORD_FIELDS:
+        if name not in _DICTIONARY_FIELDS:
+            columns[name] = _column(table, name)
+            continue
+        # Keep the dictionary encoding; chunks (row groups) may carry different dictionaries
+        index: Dict[Any, int] = {}
+        parts = []
+        for chunk in table.column(name).chunks:
+            remap = np.array([index.setdefault(v, len(index)) for v in chunk.dictionary.to_pylist()] + [-1],
+                             dtype=np.int32)
+            parts.append(remap[chunk.indices.fill_null(-1).to_numpy()])
+        codes = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)
+        columns[name] = (codes, list(index))
+    return LeaseBook.from_columns(columns)
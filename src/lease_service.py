@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Lease Intake Service
+====================
+
+Long-running alternative to re-running process_leases.py by hand: watches
+the lease folder and refreshes the reports whenever documents are added,
+edited or removed.
+
+- Watching: inotify through ``watchdog`` when it is installed, otherwise
+  polling the folder every ``--poll-interval`` seconds.
+- Debounce: change events are collected until the folder has been quiet for
+  ``--debounce`` seconds, so a burst of copied files is one refresh.
+- Warm state: modules, the extraction and credit caches and the run manifest
+  stay in memory between refreshes; only new or changed documents are
+  extracted (see run_manifest.py).
+- Backpressure: events pass through a bounded queue; a watcher that gets
+  ahead of the worker blocks instead of growing memory.
+- Each refresh is recorded in the deal store (deal_store.py) and the
+  reports are rendered from it, written to temporary files and renamed
+  into place.
+- ``GET /healthz`` and ``GET /metrics`` (Prometheus text) on 127.0.0.1.
+
+Usage:
+    python lease_service.py --input data/leases/ --output-dir output
+    python lease_service.py --input data/leases/ --output-dir output --port 8750 --poll-interval 5
+    curl http://127.0.0.1:8750/metrics
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from credit_cache import CreditCache
+from credit_lookup import configure_default_client, load_entity_registry
+from deal_store import DEFAULT_STORE_NAME, DealStore
+from extraction_cache import DEFAULT_CACHE_DIR, ExtractionCache
+from process_leases import (
+    document_rules,
+    find_documents,
+    manifest_book,
+    manifest_config,
+    publish,
+    refresh_manifest,
+    refresh_stale_credit,
+)
+from run_manifest import DEFAULT_MANIFEST_NAME, RunManifest
+
+DOCUMENT_SUFFIXES = {'.pdf', '.docx', '.json'}
+DEFAULT_PORT = 8750
+MAX_BATCH_WAIT = 30.0  # refresh at least this often while events keep arriving
+
+
+class PollingWatcher:
+    """Report changed lease documents by comparing folder snapshots."""
+
+    def __init__(self, folder: Path, callback: Callable[[Path], None], interval: float = 2.0):
+        self.folder = Path(folder)
+        self.callback = callback
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot = self.snapshot()
+
+    def snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """name -> (size, mtime_ns) for every lease document in the folder."""
+        state = {}
+        try:
+            entries = list(os.scandir(self.folder))
+        except FileNotFoundError:
+            return state
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() in DOCUMENT_SUFFIXES:
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue  # deleted between listing and stat
+                state[entry.name] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def poll(self):
+        """Compare against the previous snapshot and report every difference."""
+        current = self.snapshot()
+        for name in sorted(current.keys() | self._snapshot.keys()):
+            if current.get(name) != self._snapshot.get(name):
+                self.callback(self.folder / name)
+        self._snapshot = current
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='lease-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+class InotifyWatcher:
+    """Report changed lease documents from watchdog's native observer."""
+
+    def __init__(self, folder: Path, callback: Callable[[Path], None]):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, 'dest_path', '')):
+                    if path and os.path.splitext(path)[1].lower() in DOCUMENT_SUFFIXES:
+                        callback(Path(path))
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), str(folder), recursive=False)
+
+    def start(self):
+        self._observer.start()
+
+    def stop(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+def make_watcher(folder: Path, callback: Callable[[Path], None], poll_interval: float = 2.0,
+                 use_inotify: bool = True):
+    """inotify watcher when watchdog is installed, else a polling one."""
+    if use_inotify:
+        try:
+            return InotifyWatcher(folder, callback)
+        except ImportError:
+            print("⚠️  watchdog not installed, polling for changes. Install with: pip install watchdog")
+    return PollingWatcher(folder, callback, poll_interval)
+
+
+class LeaseService:
+    """Keeps the reports for one lease folder up to date."""
+
+    def __init__(self, input_dir: Path, output_dir: Path, discount_rate: float = 0.10,
+                 manifest_path: Optional[Path] = None,
+                 cache: Optional[ExtractionCache] = None,
+                 store: Optional[DealStore] = None,
+                 workers: int = 1, credit_workers: int = 4,
+                 debounce: float = 1.0, queue_size: int = 1024,
+                 credit_cache: Optional[CreditCache] = None,
+                 entity_registry: Optional[Path] = None):
+        self.input_dir = Path(input_dir)
+        self.output_dir = Path(output_dir)
+        self.discount_rate = discount_rate
+        self.cache = cache
+        self.store = store
+        self.credit_cache = credit_cache
+        self.workers = workers
+        self.credit_workers = credit_workers
+        self.debounce = debounce
+        self.manifest = RunManifest.load(
+            Path(manifest_path) if manifest_path else self.output_dir / DEFAULT_MANIFEST_NAME,
+            manifest_config(discount_rate, entity_registry),
+        )
+        self.events: "queue.Queue[Path]" = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()  # guards the metrics below
+        self.metrics = {
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'documents_processed': 0,
+            'document_errors': 0,
+            'events': 0,
+            'leases': 0,
+            'total_buyout': 0.0,
+            'last_refresh_seconds': 0.0,
+            'last_refresh_timestamp': 0.0,
+        }
+        self.last_error: Optional[str] = None
+        self.started = time.time()
+
+    # -- intake ---------------------------------------------------------
+    def notify(self, path: Path):
+        """Queue a change event; blocks while the queue is full."""
+        while not self._stop.is_set():
+            try:
+                self.events.put(path, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        with self._lock:
+            self.metrics['events'] += 1
+
+    def next_batch(self, timeout: float = 0.5) -> set:
+        """Wait for an event, then collect more until ``debounce`` seconds of quiet."""
+        try:
+            batch = {self.events.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+        cutoff = time.monotonic() + MAX_BATCH_WAIT
+        while True:
+            wait = min(self.debounce, cutoff - time.monotonic())
+            if wait <= 0:
+                return batch
+            try:
+                batch.add(self.events.get(timeout=wait))
+            except queue.Empty:
+                return batch
+
+    # -- processing -----------------------------------------------------
+    def refresh(self) -> bool:
+        """Process new/changed documents and rewrite the outputs if anything changed.
+
+        Returns True when the outputs were rewritten.
+        """
+        start = time.perf_counter()
+        documents = find_documents(self.input_dir)
+        pending = self.manifest.changed(documents, document_rules)
+        removed = self.manifest.prune(documents)
+        pending_set = set(pending)
+        stale = refresh_stale_credit(self.manifest, [d for d in documents if d not in pending_set],
+                                     self.credit_cache)
+        outputs_exist = (self.output_dir / 'leases.json').exists()
+        if not pending and not removed and not stale and outputs_exist:
+            self.manifest.save()  # remember touched-but-identical files
+            return False
+
+        print(f"📋 Refresh: {len(pending)} new or changed, {removed} removed, {stale} credit refreshed")
+        outcomes = refresh_manifest(self.manifest, pending, self.discount_rate,
+                                    self.workers, self.credit_workers, self.cache)
+        book = manifest_book(self.manifest, documents)
+        publish(book, self.discount_rate, self.output_dir, self.store)
+        totals = book.totals()
+
+        with self._lock:
+            m = self.metrics
+            m['refreshes'] += 1
+            m['documents_processed'] += len(outcomes)
+            m['document_errors'] += sum(o.error is not None for o in outcomes)
+            m['leases'] = len(book)
+            m['total_buyout'] = totals.total_buyout
+            m['last_refresh_seconds'] = time.perf_counter() - start
+            m['last_refresh_timestamp'] = time.time()
+        print(f"✅ {len(book)} leases, total recommended investment ${totals.total_buyout:,.0f} "
+              f"({time.perf_counter() - start:.2f}s)")
+        return True
+
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+            self.last_error = None
+        except Exception as e:  # keep serving; surfaced through /healthz and /metrics
+            with self._lock:
+                self.metrics['refresh_errors'] += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print(f"❌ Refresh failed: {self.last_error}")
+
+    def run(self):
+        """Refresh once, then on every debounced batch of events until stopped."""
+        self._safe_refresh()
+        while not self._stop.is_set():
+            if self.next_batch():
+                self._safe_refresh()
+
+    def stop(self):
+        self._stop.set()
+
+    # -- monitoring -----------------------------------------------------
+    def health(self) -> Tuple[int, dict]:
+        """HTTP status and body for /healthz."""
+        with self._lock:
+            body = {
+                'status': 'ok' if self.last_error is None else 'degraded',
+                'uptime_seconds': round(time.time() - self.started, 1),
+                'queue_depth': self.events.qsize(),
+                'leases': self.metrics['leases'],
+                'last_refresh_timestamp': self.metrics['last_refresh_timestamp'],
+                'last_error': self.last_error,
+            }
+        return (200 if self.last_error is None else 503), body
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        with self._lock:
+            m = dict(self.metrics)
+        series = [
+            ('refreshes_total', 'counter', 'Report refreshes completed', m['refreshes']),
+            ('refresh_errors_total', 'counter', 'Refreshes that raised', m['refresh_errors']),
+            ('documents_processed_total', 'counter', 'Documents extracted and valued', m['documents_processed']),
+            ('document_errors_total', 'counter', 'Documents that failed to process', m['document_errors']),
+            ('events_total', 'counter', 'Folder change events received', m['events']),
+            ('queue_depth', 'gauge', 'Change events waiting to be processed', self.events.qsize()),
+            ('leases', 'gauge', 'Leases in the current reports', m['leases']),
+            ('total_buyout_dollars', 'gauge', 'Total recommended investment', m['total_buyout']),
+            ('last_refresh_seconds', 'gauge', 'Duration of the last refresh', m['last_refresh_seconds']),
+            ('last_refresh_timestamp_seconds', 'gauge', 'Unix time of the last refresh',
+             m['last_refresh_timestamp']),
+        ]
+        lines = []
+        for name, kind, help_text, value in series:
+            lines += [f"# HELP spiceflow_{name} {help_text}",
+                      f"# TYPE spiceflow_{name} {kind}",
+                      f"spiceflow_{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+def make_http_server(service: LeaseService, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Health and metrics server bound to 127.0.0.1 (``port=0`` picks a free port)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/healthz':
+                status, body = service.health()
+                self._send(status, json.dumps(body), 'application/json')
+            elif self.path == '/metrics':
+                self._send(200, service.prometheus(), 'text/plain; version=0.0.4')
+            else:
+                self._send(404, 'not found\n', 'text/plain')
+
+        def _send(self, status: int, text: str, content_type: str):
+            payload = text.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would flood the service log
+
+    return ThreadingHTTPServer(('127.0.0.1', port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch a lease folder and keep the reports up to date')
+    parser.add_argument('--input', default='data/leases/', help='Folder to watch for lease documents')
+    parser.add_argument('--output-dir', default='output', help='Output directory for reports')
+    parser.add_argument('--discount-rate', type=float, default=0.10, help='Discount rate (default: 0.10 = 10%%)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for document extraction per refresh (default: 1)')
+    parser.add_argument('--credit-workers', type=int, default=4,
+                        help='Threads for concurrent credit lookups when --workers > 1 (default: 4)')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help=f'Extraction and credit cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not cache extractions or credit lookups')
+    parser.add_argument('--manifest',
+                        help=f'Run manifest (default: <output-dir>/{DEFAULT_MANIFEST_NAME})')
+    parser.add_argument('--store',
+                        help=f'SQLite deal store the reports are rendered from (default: <output-dir>/{DEFAULT_STORE_NAME})')
+    parser.add_argument('--no-store', action='store_true', help='Do not record refreshes in the deal store')
+    parser.add_argument('--entity-registry',
+                        help='Known-counterparty registry (.json or .csv) merged into the built-in list')
+    parser.add_argument('--debounce', type=float, default=1.0,
+                        help='Seconds of quiet before a burst of changes is processed (default: 1.0)')
+    parser.add_argument('--poll-interval', type=float, default=2.0,
+                        help='Folder scan interval when watchdog is unavailable (default: 2.0)')
+    parser.add_argument('--no-inotify', action='store_true', help='Always poll, even if watchdog is installed')
+    parser.add_argument('--queue-size', type=int, default=1024,
+                        help='Pending change events before the watcher blocks (default: 1024)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port for /healthz and /metrics on 127.0.0.1 (default: {DEFAULT_PORT})')
+    args = parser.parse_args()
+
+    if args.entity_registry:
+        count = load_entity_registry(args.entity_registry)
+        print(f"📋 Loaded {count} counterparties from {args.entity_registry}")
+    cache = credit_cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(Path(args.cache_dir))
+        credit_cache = CreditCache(Path(args.cache_dir) / 'credit.sqlite3')
+        configure_default_client(cache=credit_cache)
+
+    store = None
+    if not args.no_store:
+        store = DealStore(Path(args.store) if args.store else Path(args.output_dir) / DEFAULT_STORE_NAME)
+
+    service = LeaseService(
+        Path(args.input), Path(args.output_dir), args.discount_rate,
+        manifest_path=Path(args.manifest) if args.manifest else None, cache=cache, store=store,
+        workers=args.workers, credit_workers=args.credit_workers,
+        debounce=args.debounce, queue_size=args.queue_size,
+        credit_cache=credit_cache, entity_registry=args.entity_registry,
+    )
+    watcher = make_watcher(Path(args.input), service.notify, args.poll_interval,
+                           use_inotify=not args.no_inotify)
+    server = make_http_server(service, args.port)
+    threading.Thread(target=server.serve_forever, name='lease-http', daemon=True).start()
+
+    def shutdown(signum, frame):
+        print("\n🛑 Stopping lease service")
+        service.stop()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    print(f"👀 Watching {args.input} ({type(watcher).__name__}); "
+          f"health and metrics on http://127.0.0.1:{server.server_address[1]}/")
+    watcher.start()
+    try:
+        service.run()
+    finally:
+        watcher.stop()
+        server.shutdown()
+        if store is not None:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
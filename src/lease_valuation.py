@@ -10,22 +10,39 @@ Usage
 ...     discount_rate=0.10,
 ...     buyout_pct=0.80,
 ... )
-870677.54
+819461.21
 
-The module is intentionally <100 lines so it can be audited quickly.
+``pv_buyout_batch`` prices a whole portfolio from columnar arrays in one
+NumPy pass and returns the same offers as calling ``pv_buyout`` per lease.
+Terms up to ``factor_tables.MAX_TERM`` read their discount, growth and
+annuity factors from the shared ``factor_tables`` cache; longer terms use
+the closed form.  A part final year is paid as a full year's rent on every
+path, as in ``LeaseParams.cash_flows``.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
+import math
+from dataclasses import dataclass, field
 from typing import List, Sequence
 
 import numpy as np
 
+from factor_tables import (
+    MAX_TERM,
+    TABLE_CACHE_SIZE,
+    factor_table,
+    growing_annuity_factors,
+)
+
 __all__ = [
     "LeaseParams",
+    "PortfolioValuer",
     "generate_cash_flows",
+    "growing_annuity_pv",
     "present_value",
     "pv_buyout",
+    "pv_buyout_batch",
+    "round_cents",
 ]
 
 
@@ -34,24 +51,51 @@ class LeaseParams:
     """Basic parameters that define a ground-lease cash-flow stream."""
 
     annual_rent: float  # current rent in dollars
-    term_years: int  # whole years remaining
+    term_years: int  # years remaining; a part final year is paid in full
     escalator: float = 0.0  # e.g. 0.025 for 2.5 % p.a.
     custom_escalators: Sequence[float] | None = None  # per-year overrides
     balloon_cost: float = 0.0  # one-off cost in final year (e.g., decommissioning)
 
     def cash_flows(self) -> np.ndarray:
         """Return an array of yearly cash flows (positive = inflow)."""
-        years = np.arange(self.term_years)
+        term = math.ceil(self.term_years)
         if self.custom_escalators is not None:
             if len(self.custom_escalators) != self.term_years:
                 raise ValueError("Length of custom escalators must equal term_years")
             escalators = np.array(self.custom_escalators)
             rents = self.annual_rent * np.cumprod(1 + escalators)
+        elif 1 <= term <= MAX_TERM:
+            rents = self.annual_rent * factor_table(self.escalator).growth[:term]
         else:
-            rents = self.annual_rent * (1 + self.escalator) ** years
+            rents = self.annual_rent * (1 + self.escalator) ** np.arange(term)
         rents[-1] += -self.balloon_cost  # subtract cost in final year if any
         return rents
 
+    def present_value(self, discount_rate: float) -> float:
+        """NPV of the lease at ``discount_rate``.
+
+        A constant escalator makes the rent stream a growing annuity, so the
+        PV is a table read for terms up to ``MAX_TERM`` and a closed form
+        otherwise, without building per-year arrays.  Custom escalator paths
+        fall back to ``present_value(cash_flows())``.
+        """
+        term = math.ceil(self.term_years)
+        if self.custom_escalators is not None or term < 1:
+            return present_value(self.cash_flows(), discount_rate)
+        if term <= MAX_TERM:
+            annuity = growing_annuity_factors(discount_rate, self.escalator)[term]
+            balloon_df = factor_table(discount_rate).discount[term]
+            return float(self.annual_rent * annuity - self.balloon_cost * balloon_df)
+        # Scalar mirror of growing_annuity_pv; math avoids ufunc overhead.
+        q_minus_1 = (self.escalator - discount_rate) / (1.0 + discount_rate)
+        if q_minus_1 == 0:
+            annuity = term / (1.0 + discount_rate)
+        else:
+            ratio = math.expm1(term * math.log1p(q_minus_1)) / q_minus_1
+            annuity = ratio / (1.0 + discount_rate)
+        balloon_df = 1 / (1.0 + discount_rate) ** term
+        return self.annual_rent * annuity - self.balloon_cost * balloon_df
+
 
 def generate_cash_flows(params: LeaseParams) -> np.ndarray:
     """Wrapper to produce cash-flows given LeaseParams instance."""
@@ -69,11 +113,31 @@ def present_value(cash_flows: np.ndarray, discount_rate: float) -> float:
     discount_rate
         Decimal discount rate (e.g. 0.10 for 10 %).
     """
-    years = np.arange(1, len(cash_flows) + 1)
-    discount_factors = 1 / (1 + discount_rate) ** years
+    if len(cash_flows) <= MAX_TERM:
+        discount_factors = factor_table(discount_rate).discount[1 : len(cash_flows) + 1]
+    else:
+        years = np.arange(1, len(cash_flows) + 1)
+        discount_factors = 1 / (1 + discount_rate) ** years
     return float((cash_flows * discount_factors).sum())
 
 
+def growing_annuity_pv(rent, term, escalator, discount_rate, balloon_cost):
+    """Closed-form PV of ``term`` escalating rents less a final-year balloon.
+
+    With ``q = (1 + g) / (1 + r)`` the rent PV is
+    ``rent / (1 + r) * (1 - q**term) / (1 - q)``, or ``rent * term / (1 + r)``
+    when ``g == r``.  ``expm1``/``log1p`` keep the ratio accurate when ``q``
+    is close to 1.  Works element-wise on scalars or NumPy arrays.
+    """
+
+    q_minus_1 = np.subtract(escalator, discount_rate) / np.add(1.0, discount_rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.expm1(np.multiply(term, np.log1p(q_minus_1))) / q_minus_1
+    annuity = np.where(q_minus_1 == 0, term, ratio) / np.add(1.0, discount_rate)
+    balloon_df = 1 / np.power(np.add(1.0, discount_rate), term)
+    return np.multiply(rent, annuity) - np.multiply(balloon_cost, balloon_df)
+
+
 def pv_buyout(
     *,
     annual_rent: float,
@@ -93,6 +157,155 @@ def pv_buyout(
         custom_escalators=custom_escalators,
         balloon_cost=balloon_cost,
     )
-    cf = generate_cash_flows(params)
-    pv = present_value(cf, discount_rate)
-    return round(pv * buyout_pct, 2) 
\ No newline at end of file
+    pv = params.present_value(discount_rate)
+    return round(pv * buyout_pct, 2)
+
+
+def pv_buyout_batch(
+    *,
+    annual_rent: Sequence[float] | np.ndarray,
+    term_years: Sequence[int] | np.ndarray,
+    escalator: Sequence[float] | np.ndarray | float = 0.0,
+    discount_rate: Sequence[float] | np.ndarray | float = 0.10,
+    buyout_pct: Sequence[float] | np.ndarray | float = 0.80,
+    balloon_cost: Sequence[float] | np.ndarray | float = 0.0,
+) -> np.ndarray:
+    """Vectorised ``pv_buyout`` over columnar lease arrays.
+
+    Scalars broadcast against the per-lease columns.  Every lease is priced
+    from the same factor tables (or closed form) as the scalar path, so the
+    offers match ``pv_buyout`` to the cent.
+    """
+
+    return _batch_offers(annual_rent, term_years, escalator, discount_rate, buyout_pct, balloon_cost)
+
+
+def _batch_offers(annual_rent, term_years, escalator, discount_rate, buyout_pct, balloon_cost,
+                  esc_codes=None):
+    rent = np.asarray(annual_rent, dtype=float)
+    terms = np.asarray(term_years)
+    if not np.issubdtype(terms.dtype, np.integer):
+        terms = np.ceil(terms).astype(np.int64)  # a part final year is paid in full
+    rent, terms, esc, rate, pct, balloon = np.broadcast_arrays(
+        rent,
+        terms,
+        np.asarray(escalator, dtype=float),
+        np.asarray(discount_rate, dtype=float),
+        np.asarray(buyout_pct, dtype=float),
+        np.asarray(balloon_cost, dtype=float),
+    )
+    if rent.ndim != 1:
+        raise ValueError("Lease columns must be one-dimensional")
+    if np.any(terms < 1):
+        raise ValueError("term_years must be at least 1")
+
+    pv = _table_pv(rent, terms, esc, rate, balloon, esc_codes)
+    if pv is None:
+        pv = growing_annuity_pv(rent, terms, esc, rate, balloon)
+    return round_cents(pv * pct)
+
+
+def _codes(values: np.ndarray):
+    """Distinct values and per-lease indices, skipping the sort for scalars."""
+    if values.strides == (0,):  # broadcast scalar
+        return values[:1], np.zeros(values.shape, dtype=np.intp)
+    return np.unique(values, return_inverse=True)
+
+
+def _table_pv(rent, terms, esc, rate, balloon, esc_codes=None):
+    """Batch PV read from the factor tables, or None if they do not apply.
+
+    Each distinct (rate, escalator) pair contributes one annuity row; the
+    lookup is skipped when terms run past ``MAX_TERM`` or there are more
+    pairs than the cache holds, so a large sweep cannot thrash it.
+    """
+
+    if len(terms) == 0 or terms.max() > MAX_TERM:
+        return None
+    rates, rate_index = _codes(rate)
+    escalators, esc_index = esc_codes if esc_codes is not None else _codes(esc)
+    if len(rates) * len(escalators) > TABLE_CACHE_SIZE // 2:
+        return None
+    width = MAX_TERM + 1
+    annuity = np.stack([growing_annuity_factors(r, g) for r in rates for g in escalators])
+    flat = (rate_index.ravel() * len(escalators) + esc_index.ravel()) * width + terms
+    pv = rent * annuity.ravel()[flat]
+    if np.any(balloon):
+        discount = np.stack([factor_table(r).discount for r in rates])
+        pv -= balloon * discount.ravel()[rate_index.ravel() * width + terms]
+    return pv
+
+
+def round_cents(values: np.ndarray) -> np.ndarray:
+    """Round to cents exactly like the builtin ``round(x, 2)``.
+
+    ``np.round`` scales by 100 before rounding, which can disagree with the
+    builtin on values sitting next to a half cent; those few are re-rounded
+    in Python so batch and scalar offers stay identical.
+    """
+
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+@dataclass
+class PortfolioValuer:
+    """Columnar lease book priced with ``pv_buyout_batch``.
+
+    Build once from per-lease columns (or ``LeaseParams`` via
+    ``from_params``) and re-price under different discount rates or buyout
+    percentages without rebuilding Python objects per lease.
+    """
+
+    annual_rent: np.ndarray
+    term_years: np.ndarray
+    escalator: np.ndarray
+    balloon_cost: np.ndarray
+    _escalator_codes: tuple = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.annual_rent = np.asarray(self.annual_rent, dtype=float)
+        self.term_years = np.asarray(self.term_years, dtype=np.int64)
+        self.escalator = np.broadcast_to(
+            np.asarray(self.escalator, dtype=float), self.annual_rent.shape
+        )
+        self.balloon_cost = np.broadcast_to(
+            np.asarray(self.balloon_cost, dtype=float), self.annual_rent.shape
+        )
+        # Escalators are fixed for the book; index them once for the factor tables.
+        self._escalator_codes = _codes(self.escalator)
+
+    @classmethod
+    def from_params(cls, leases: Sequence[LeaseParams]) -> "PortfolioValuer":
+        """Build a valuer from ``LeaseParams`` with constant escalators."""
+        if any(p.custom_escalators is not None for p in leases):
+            raise ValueError("PortfolioValuer only supports constant escalators")
+        return cls(
+            annual_rent=np.array([p.annual_rent for p in leases], dtype=float),
+            term_years=np.array([p.term_years for p in leases], dtype=np.int64),
+            escalator=np.array([p.escalator for p in leases], dtype=float),
+            balloon_cost=np.array([p.balloon_cost for p in leases], dtype=float),
+        )
+
+    def __len__(self) -> int:
+        return len(self.annual_rent)
+
+    def buyout_offers(
+        self,
+        discount_rate: Sequence[float] | np.ndarray | float = 0.10,
+        buyout_pct: Sequence[float] | np.ndarray | float = 0.80,
+    ) -> np.ndarray:
+        """Return the rounded cash offer for every lease in the book."""
+        return _batch_offers(
+            self.annual_rent,
+            self.term_years,
+            self.escalator,
+            discount_rate,
+            buyout_pct,
+            self.balloon_cost,
+            esc_codes=self._escalator_codes,
+        )
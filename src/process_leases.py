@@ -7,73 +7,93 @@ Simple workflow: folder of lease JSONs → summary table + executive report
 
 Usage:
     python process_leases.py --input data/leases/ --discount-rate 0.10
+    python process_leases.py --input data/leases/ --workers 8
+    python process_leases.py --input data/leases/ --sweep
+    python process_leases.py --input data/leases/ --incremental
+    python process_leases.py --input data/leases/ --store output/deals.sqlite3
+    python process_leases.py --input data/leases/ --format parquet
+    python process_leases.py --input data/leases/ --cashflow-cube
+    python process_leases.py --input data/leases/ --metrics --profile
+    spiceflow --input data/leases/            (after ``pip install .``)
     
 Output:
     - lease_summary.csv (summary table)
     - executive_report.md (500-word formatted report)
+    - leases.json (structured lease data)
+    - leases.parquet / leases.arrow / leases.csv (with --format; see lease_io.py)
+    - deals.sqlite3 (deal store the reports are rendered from; see deal_store.py)
+    - cashflow_cube/ (with --cashflow-cube; lease x year cash flows, see cashflow_cube.py)
+    - scenario_grid.csv / scenario_heatmap.csv (with --sweep)
+    - run_report.json (per-stage timings and counters, with --metrics; see instrumentation.py)
+    - profile.prof / profile.folded (with --profile)
+
+Start-up only imports the standard library and the small cache / manifest
+modules. NumPy, the document extractor (and through it pdfplumber /
+python-docx) and the credit client (requests) are imported where they are
+first used, so ``--help`` or a JSON-only run does not pay for what it never
+touches; tests/test_process_leases.py holds import-time budgets to that.
 """
 
+from __future__ import annotations
+
 import json
 import argparse
 import os
+import tempfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Dict, Any, Iterable, Optional, Tuple
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime
-import numpy as np
 
-import sys
-sys.path.append('src')
+from extraction_cache import DEFAULT_CACHE_DIR, ExtractionCache, file_digest, replace_file
+from credit_cache import CreditCache
+from run_manifest import DEFAULT_MANIFEST_NAME, RunManifest, fingerprint
+import instrumentation
+
+if TYPE_CHECKING:
+    from deal_store import DealStore
+    from lease_book import LeaseBook
+    from scenarios import ScenarioGrid
 
-from lease_valuation import pv_buyout
-from document_extractor import process_document
-from credit_lookup import quick_lookup
-from manual_overrides import get_manual_override, should_skip_document, get_skip_reason
+BUYOUT_PCT = 0.85  # Updated from 80% to be more competitive
+EXECUTIVE_TOP_N = 25  # leases listed individually in the executive report
+WRITE_BUFFER_BYTES = 1 << 20
+RUN_REPORT_NAME = 'run_report.json'
+EXPORT_FORMATS = ('parquet', 'arrow', 'csv')  # lease_io.FORMATS, without importing NumPy at start-up
 
 
-def calculate_irr(cash_flows: List[float], max_iterations: int = 1000, tolerance: float = 1e-6) -> float:
+def calculate_irr(cash_flows: List[float], max_iterations: int = 100, tolerance: float = 1e-10) -> Optional[float]:
     """
-    Calculate Internal Rate of Return (IRR) for a series of cash flows using Newton-Raphson method.
+    Calculate Internal Rate of Return (IRR) for a series of cash flows.
     
     Args:
         cash_flows: List of cash flows where first value is typically negative (investment)
                    and subsequent values are positive (returns)
     
     Returns:
-        IRR as a decimal (e.g., 0.08 for 8%)
+        IRR as a decimal (e.g., 0.08 for 8%), or None when no IRR exists or
+        the solver did not converge within ``max_iterations``.
+        Use irr.solve_irr directly to value many leases at once and get a
+        per-lease convergence status.
     """
-    # Newton-Raphson method for IRR calculation
-    rate = 0.1  # Initial guess (10%)
-    
-    for _ in range(max_iterations):
-        # Calculate NPV and its derivative at current rate
-        npv = sum([cf / (1 + rate) ** i for i, cf in enumerate(cash_flows)])
-        npv_derivative = sum([-i * cf / (1 + rate) ** (i + 1) for i, cf in enumerate(cash_flows)])
-        
-        # Check for convergence
-        if abs(npv) < tolerance:
-            return rate
-            
-        # Avoid division by zero
-        if abs(npv_derivative) < tolerance:
-            break
-            
-        # Newton-Raphson update
-        new_rate = rate - npv / npv_derivative
-        
-        # Check for convergence in rate
-        if abs(new_rate - rate) < tolerance:
-            return new_rate
-            
-        rate = new_rate
-        
-        # Keep rate reasonable
-        if rate < -0.99:  # Avoid rates below -99%
-            rate = -0.99
-        elif rate > 10:  # Avoid rates above 1000%
-            rate = 10
-    
-    return rate
+    from irr import CONVERGED, POLYNOMIAL_ROOT, solve_irr
+    result = solve_irr([cash_flows], max_iterations=max_iterations, tolerance=tolerance)
+    if result.status[0] not in (CONVERGED, POLYNOMIAL_ROOT):
+        return None
+    return float(result.rate[0])
+
+
+def format_irr(multiple: Optional[float]) -> str:
+    """IRR as a percentage for the reports, or "n/a" when a lease has none."""
+    if multiple is None or multiple != multiple:
+        return "n/a"
+    return f"{multiple*100:.1f}%"
+
+
+def irr_competitive(multiple: Optional[float]) -> bool:
+    """Annualized return beats the 6% target (reasonable vs the 10% discount rate)."""
+    return multiple is not None and multiple >= 0.06
 
 
 @dataclass
@@ -92,97 +112,144 @@ class LeaseResult:
     pv_value: float
     undiscounted_value: float
     buyout_offer: float
-    multiple: float
+    multiple: Optional[float]  # IRR; None when there is none
     discount_rate: float
     credit_data: dict
 
 
-def process_lease_document(file_path: Path, discount_rate: float = 0.10) -> Optional[LeaseResult]:
-    """Process a single lease document (PDF, DOCX, or JSON) and calculate buyout offer."""
-    
-    # Check if document should be skipped
-    if should_skip_document(file_path.name):
+def load_lease_data(file_path: Path, cache: Optional[ExtractionCache] = None) -> Optional[Dict[str, Any]]:
+    """Extract lease terms from a document and validate data quality.
+
+    Applies skip rules and manual overrides first. Returns None when the
+    document is skipped or fails validation.
+    """
+    from document_extractor import process_document
+    from manual_overrides import get_manual_override, get_skip_reason, should_skip_document
+    
+    # Check if document should be skipped, then for a manual override
+    with instrumentation.stage('manual_override_check'):
+        skip = should_skip_document(file_path.name)
+        manual_data = None if skip else get_manual_override(file_path.name)
+    if skip:
+        instrumentation.count('documents_skipped')
         print(f"⚠️  Skipping {file_path.name}: {get_skip_reason(file_path.name)}")
         return None
     
-    # Check for manual override first
-    manual_data = get_manual_override(file_path.name)
     if manual_data:
+        instrumentation.count('manual_overrides')
         print(f"📋 Using manual data for {file_path.name}")
         data = manual_data.copy()
     else:
         # Extract data using document extractor
-        data = process_document(file_path)
+        with instrumentation.stage('extraction'):
+            data = process_document(file_path, cache)
         print(f"🤖 Using automated extraction for {file_path.name}")
     
     if not data:
+        instrumentation.count('documents_without_data')
         return None
     
     # Validate required fields and data quality
     if data.get('annual_rent') is None or data.get('term_years') is None:
+        instrumentation.count('documents_rejected')
         print(f"⚠️  Skipping {file_path.name}: missing annual_rent or term_years")
         return None
     
     # Additional validation for data quality
     if data.get('term_years', 0) > 50:
+        instrumentation.count('documents_rejected')
         print(f"⚠️  Skipping {file_path.name}: unreasonable term ({data.get('term_years')} years)")
         return None
     
     if data.get('annual_rent', 0) > 10000000:
+        instrumentation.count('documents_rejected')
         print(f"⚠️  Skipping {file_path.name}: unreasonable rent (${data.get('annual_rent'):,})")
         return None
     
     if data.get('escalator', 0) > 0.1:  # 10%
+        instrumentation.count('documents_rejected')
         print(f"⚠️  Skipping {file_path.name}: unreasonable escalator ({data.get('escalator')*100:.1f}%)")
         return None
     
-    # Use total potential term if available for valuation, otherwise base term
-    valuation_term = data.get('total_potential_term') or data['term_years']
-    
-    # Calculate buyout using existing valuation engine
-    buyout_offer = pv_buyout(
-        annual_rent=data['annual_rent'],
-        term_years=valuation_term,
-        escalator=data['escalator'],
-        discount_rate=discount_rate,
-        buyout_pct=0.85  # Updated from 80% to be more competitive
-    )
-    
-    # Calculate PV without buyout discount for analysis and undiscounted total rent
-    pv_value = buyout_offer / 0.85
-    from lease_valuation import LeaseParams, generate_cash_flows
-    params_tmp = LeaseParams(
-        annual_rent=data['annual_rent'],
-        term_years=data['term_years'],
-        escalator=data['escalator']
-    )
-    undiscounted_value = float(generate_cash_flows(params_tmp).sum())
-    # Simple multiple for reference (not used in main comparison)
-    simple_multiple = buyout_offer / data['annual_rent']
-    
-    # Perform credit lookup if developer is available (for risk tier only)
+    return data
+
+
+_credit_client_lock = threading.Lock()
+_credit_client_cache: Optional[CreditCache] = None
+
+
+def use_credit_cache(cache: CreditCache):
+    """Give the shared credit client ``cache`` once the first lookup needs the client."""
+    global _credit_client_cache
+    with _credit_client_lock:
+        _credit_client_cache = cache
+
+
+def quick_lookup(company_name: str) -> Dict[str, Any]:
+    """credit_lookup.quick_lookup; credit_lookup and requests load on the first call."""
+    global _credit_client_cache
+    from credit_lookup import configure_default_client, quick_lookup as lookup
+    with _credit_client_lock:
+        if _credit_client_cache is not None:
+            configure_default_client(cache=_credit_client_cache)
+            _credit_client_cache = None
+    return lookup(company_name)
+
+
+def lookup_credit(data: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Credit lookup for the lease developer; returns (credit_data, risk_tier)."""
     credit_data = {}
     risk_tier = data.get('risk_tier', 'medium')
-    # Use fixed 10% discount rate for all calculations
-    actual_discount_rate = 0.10
     
     if data.get('developer') and data.get('developer') != 'Unknown':
         try:
-            credit_data = quick_lookup(data['developer'])
+            with instrumentation.stage('credit_lookup'):
+                credit_data = quick_lookup(data['developer'])
             risk_tier = credit_data.get('risk_tier', 'medium')
             print(f"📊 Credit assessment: {data['developer']} → {risk_tier.title()} risk (10% fixed rate)")
         except Exception as e:
+            instrumentation.count('credit_lookup_failures')
             print(f"⚠️  Credit lookup failed for {data.get('developer')}: {e}")
     
-    # Recalculate with fixed 10% discount rate using valuation term
-    buyout_offer = pv_buyout(
+    return credit_data, risk_tier
+
+
+def valuation_term_years(data: Dict[str, Any]) -> int:
+    """Term used for pricing: total potential term when known, else base term."""
+    return data.get('total_potential_term') or data['term_years']
+
+
+def value_lease(file_path: Path, data: Dict[str, Any], discount_rate: float = 0.10,
+                credit_data: Optional[Dict[str, Any]] = None,
+                risk_tier: Optional[str] = None) -> LeaseResult:
+    """Calculate buyout offer, present value and IRR for validated lease data."""
+    
+    # Use total potential term if available for valuation, otherwise base term
+    valuation_term = valuation_term_years(data)
+    
+    # Undiscounted total rent over the base term
+    from lease_valuation import LeaseParams, generate_cash_flows, pv_buyout
+    params_tmp = LeaseParams(
         annual_rent=data['annual_rent'],
-        term_years=valuation_term,
-        escalator=data['escalator'],
-        discount_rate=actual_discount_rate,
-        buyout_pct=0.85
+        term_years=data['term_years'],
+        escalator=data['escalator']
     )
-    pv_value = buyout_offer / 0.85
+    with instrumentation.stage('undiscounted_value'):
+        undiscounted_value = float(generate_cash_flows(params_tmp).sum())
+    
+    # Use fixed 10% discount rate for all calculations
+    actual_discount_rate = 0.10
+    
+    # Calculate buyout with fixed 10% discount rate using valuation term
+    with instrumentation.stage('pv_buyout'):
+        buyout_offer = pv_buyout(
+            annual_rent=data['annual_rent'],
+            term_years=valuation_term,
+            escalator=data['escalator'],
+            discount_rate=actual_discount_rate,
+            buyout_pct=BUYOUT_PCT
+        )
+    pv_value = buyout_offer / BUYOUT_PCT
     
     # Calculate actual IRR based on cash flows
     # Generate escalating annual rent payments over the valuation term
@@ -196,7 +263,8 @@ def process_lease_document(file_path: Path, discount_rate: float = 0.10) -> Opti
     
     # IRR cash flows: negative investment followed by positive rent payments
     cash_flows = [-buyout_offer] + annual_rents
-    irr = calculate_irr(cash_flows)
+    with instrumentation.stage('irr'):
+        irr = calculate_irr(cash_flows)
     
     return LeaseResult(
         name=data.get('name', file_path.stem),
@@ -206,7 +274,7 @@ def process_lease_document(file_path: Path, discount_rate: float = 0.10) -> Opti
         renewal_options=data.get('renewal_options'),
         total_potential_term=data.get('total_potential_term'),
         escalator=data.get('escalator', 0.0),
-        risk_tier=risk_tier,
+        risk_tier=risk_tier or data.get('risk_tier', 'medium'),
         location=data.get('location', 'Unknown'),
         acres=data.get('acres', 0.0),
         developer=data.get('developer', 'Unknown'),
@@ -215,111 +283,388 @@ def process_lease_document(file_path: Path, discount_rate: float = 0.10) -> Opti
         buyout_offer=buyout_offer,
         multiple=irr,
         discount_rate=actual_discount_rate,
-        credit_data=credit_data
+        credit_data=credit_data or {}
+    )
+
+
+def process_lease_document(file_path: Path, discount_rate: float = 0.10,
+                           cache: Optional[ExtractionCache] = None) -> Optional[LeaseResult]:
+    """Process a single lease document (PDF, DOCX, or JSON) and calculate buyout offer."""
+    data = load_lease_data(file_path, cache)
+    if data is None:
+        return None
+    
+    credit_data, risk_tier = lookup_credit(data)
+    return value_lease(file_path, data, discount_rate, credit_data, risk_tier)
+
+
+def _extract_and_value(file_path: Path, discount_rate: float,
+                       cache: Optional[ExtractionCache]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """Process-pool task: the CPU-bound stages of process_lease_document.
+    
+    Returns ``(data, result)`` (None when the document yields no lease, or
+    the exception it raised) and this task's instrumentation for the parent
+    to merge, so a failing document never leaks metrics into the next task.
+    """
+    try:
+        with instrumentation.stage('document'):
+            data = load_lease_data(file_path, cache)
+            extracted = None if data is None else (data, value_lease(file_path, data, discount_rate))
+    except Exception as e:
+        return e, instrumentation.take()
+    return extracted, instrumentation.take()
+
+
+@dataclass
+class DocumentOutcome:
+    """Result of processing one document; at most one of result/error is set."""
+    path: Path
+    result: Optional[LeaseResult] = None
+    error: Optional[BaseException] = None
+
+
+def process_documents(document_files: List[Path], discount_rate: float = 0.10,
+                      workers: int = 1, credit_workers: int = 4,
+                      cache: Optional[ExtractionCache] = None) -> List[DocumentOutcome]:
+    """Process documents, optionally in parallel, preserving input order.
+
+    With ``workers > 1`` extraction and valuation fan out over a process
+    pool while credit lookups run on a separate bounded thread pool, so
+    network calls never hold a CPU worker. A failure in one document is
+    recorded on its outcome and does not affect the others.
+    """
+    total = len(document_files)
+    outcomes = [DocumentOutcome(path=f) for f in document_files]
+    
+    if workers <= 1:
+        for i, outcome in enumerate(outcomes, 1):
+            try:
+                with instrumentation.stage('document'):
+                    outcome.result = process_lease_document(outcome.path, discount_rate, cache)
+            except Exception as e:
+                outcome.error = e
+            _count_outcome(outcome)
+            _report_progress(i, total, outcome)
+        return outcomes
+    
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers, initializer=instrumentation.configure,
+                             initargs=(instrumentation.is_enabled(),)) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=credit_workers) as credit_pool:
+        index_of = {
+            cpu_pool.submit(_extract_and_value, outcome.path, discount_rate, cache): i
+            for i, outcome in enumerate(outcomes)
+        }
+        credit_futures = {}
+        for done, future in enumerate(as_completed(index_of), 1):
+            i = index_of[future]
+            try:
+                extracted, metrics = future.result()
+                instrumentation.merge(metrics)
+                if isinstance(extracted, Exception):
+                    raise extracted
+            except Exception as e:
+                outcomes[i].error = e
+                extracted = None
+            if extracted is not None:
+                data, result = extracted
+                outcomes[i].result = result
+                credit_futures[i] = credit_pool.submit(lookup_credit, data)
+            print(f"[{done}/{total}] extracted {outcomes[i].path.name}")
+        
+        for i, outcome in enumerate(outcomes):
+            if i in credit_futures:
+                credit_data, risk_tier = credit_futures[i].result()
+                outcome.result = replace(outcome.result, credit_data=credit_data, risk_tier=risk_tier)
+    
+    for i, outcome in enumerate(outcomes, 1):
+        _count_outcome(outcome)
+        _report_progress(i, total, outcome)
+    return outcomes
+
+
+def find_documents(input_path: Path) -> List[Path]:
+    """Lease documents in a folder: PDFs, then DOCX, then JSON, each sorted."""
+    document_files = []
+    for pattern in ['*.pdf', '*.docx', '*.json']:
+        document_files.extend(sorted(input_path.glob(pattern)))
+    return document_files
+
+
+def manifest_config(discount_rate: float, entity_registry: Optional[Path] = None) -> str:
+    """Settings that invalidate every manifest entry when they change.
+
+    The ``--entity-registry`` file is fingerprinted by content, since it
+    changes the credit assessment of every lease whose developer it names.
+    """
+    from document_extractor import EXTRACTOR_VERSION, TEXT_EXTRACTION_VERSION
+    registry = file_digest(entity_registry) if entity_registry else None
+    return fingerprint(EXTRACTOR_VERSION, TEXT_EXTRACTION_VERSION, discount_rate, BUYOUT_PCT, registry)
+
+
+def credit_expired(credit_data: Dict[str, Any], credit_cache: CreditCache) -> bool:
+    """Whether a stored assessment is older than its source's credit-cache TTL."""
+    stamp = credit_data.get('lookup_timestamp')
+    sources = credit_data.get('data_sources') or ['']
+    if not stamp:
+        return False
+    return credit_cache.expired(sources[0], datetime.fromisoformat(stamp).timestamp())
+
+
+def refresh_stale_credit(manifest: RunManifest, document_files: List[Path],
+                         credit_cache: Optional[CreditCache] = None) -> int:
+    """Re-assess developers of stored rows whose credit data has expired.
+
+    Only the credit fields (``credit_data`` and ``risk_tier``) are replaced:
+    pricing uses the fixed 10% rate, so the valuation stands. Returns the
+    number of rows refreshed.
+    """
+    credit_cache = credit_cache or CreditCache()
+    refreshed = 0
+    for path, row in zip(document_files, manifest.rows(document_files, with_missing=True)):
+        if row is None or not credit_expired(row['credit_data'] or {}, credit_cache):
+            continue
+        credit_data, risk_tier = lookup_credit(row)
+        manifest.replace_row(path, {**row, 'credit_data': credit_data, 'risk_tier': risk_tier})
+        refreshed += 1
+    return refreshed
+
+
+def document_rules(file_path: Path) -> str:
+    """Fingerprint of the manual override / skip rule that applies to one file."""
+    from manual_overrides import get_manual_override, get_skip_reason, should_skip_document
+    skip_reason = get_skip_reason(file_path.name) if should_skip_document(file_path.name) else None
+    return fingerprint(get_manual_override(file_path.name), skip_reason)
+
+
+def run_pipeline(document_files: List[Path], discount_rate: float = 0.10,
+                 workers: int = 1, credit_workers: int = 4,
+                 cache: Optional[ExtractionCache] = None,
+                 manifest: Optional[RunManifest] = None,
+                 credit_cache: Optional[CreditCache] = None) -> LeaseBook:
+    """Process documents into a LeaseBook.
+    
+    With a manifest only new or changed documents are processed; their rows
+    are merged with the stored rows of unchanged ones and the manifest is
+    saved. Documents that raise are not recorded, so they are retried.
+    Unchanged rows whose credit data is past the TTL ``credit_cache`` gives
+    its source are re-assessed (see ``refresh_stale_credit``).
+    """
+    from lease_book import LeaseBook
+    if manifest is None:
+        outcomes = process_documents(document_files, discount_rate, workers, credit_workers, cache)
+        return LeaseBook.from_results(o.result for o in outcomes if o.result)
+    
+    pending = manifest.changed(document_files, document_rules)
+    removed = manifest.prune(document_files)
+    print(f"📋 Incremental run: {len(pending)} new or changed, "
+          f"{len(document_files) - len(pending)} unchanged, {removed} removed")
+    pending_set = set(pending)
+    unchanged = [path for path in document_files if path not in pending_set]
+    stale = refresh_stale_credit(manifest, unchanged, credit_cache)
+    if stale:
+        print(f"📋 Refreshed expired credit data for {stale} unchanged leases")
+    refresh_manifest(manifest, pending, discount_rate, workers, credit_workers, cache)
+    return manifest_book(manifest, document_files)
+
+
+def refresh_manifest(manifest: RunManifest, pending: List[Path], discount_rate: float = 0.10,
+                     workers: int = 1, credit_workers: int = 4,
+                     cache: Optional[ExtractionCache] = None) -> List[DocumentOutcome]:
+    """Process ``pending`` documents, record the successful ones and save the manifest."""
+    outcomes = process_documents(pending, discount_rate, workers, credit_workers, cache)
+    for outcome in outcomes:
+        if outcome.error is None:
+            row = asdict(outcome.result) if outcome.result else None
+            manifest.record(outcome.path, document_rules(outcome.path), row)
+    manifest.save()
+    return outcomes
+
+
+def manifest_book(manifest: RunManifest, document_files: List[Path]) -> LeaseBook:
+    """LeaseBook of the stored rows for ``document_files``."""
+    from lease_book import LeaseBook
+    return LeaseBook.from_results(LeaseResult(**row) for row in manifest.rows(document_files))
+
+
+def _count_outcome(outcome: DocumentOutcome):
+    """Instrumentation counters for one processed document."""
+    if outcome.error is not None:
+        instrumentation.count('documents_failed')
+    elif outcome.result:
+        instrumentation.count('documents_valued')
+
+
+def _report_progress(done: int, total: int, outcome: DocumentOutcome):
+    """Print the per-document status line."""
+    if outcome.error is not None:
+        print(f"❌ [{done}/{total}] Error processing {outcome.path}: {outcome.error}")
+    elif outcome.result:
+        print(f"✅ [{done}/{total}] Processed: {outcome.result.name}")
+    else:
+        print(f"⚠️  [{done}/{total}] Skipped: {outcome.path.name}")
+
+
+def as_lease_book(results) -> LeaseBook:
+    """Accept a LeaseBook or any iterable of LeaseResult."""
+    from lease_book import LeaseBook
+    return results if isinstance(results, LeaseBook) else LeaseBook.from_results(results)
+
+
+def lease_rows(results) -> Iterable:
+    """Stream the rows of a LeaseBook (batch-decoded) or any iterable of LeaseResult."""
+    from lease_book import LeaseBook
+    return results.records() if isinstance(results, LeaseBook) else results
+
+
+def sweep_results(results, discount_rates=None, buyout_pcts=None,
+                  escalator_shocks=(0.0,)) -> ScenarioGrid:
+    """Re-price already-valued leases across a scenario grid (no re-extraction).
+
+    ``discount_rates`` and ``buyout_pcts`` default to scenarios.DEFAULT_DISCOUNT_RATES
+    and DEFAULT_BUYOUT_PCTS.
+    """
+    import numpy as np
+    from lease_valuation import PortfolioValuer
+    from scenarios import DEFAULT_BUYOUT_PCTS, DEFAULT_DISCOUNT_RATES, scenario_grid
+    if discount_rates is None:
+        discount_rates = DEFAULT_DISCOUNT_RATES
+    if buyout_pcts is None:
+        buyout_pcts = DEFAULT_BUYOUT_PCTS
+    leases = as_lease_book(results)
+    total_term = leases.column('total_potential_term')
+    book = PortfolioValuer(
+        annual_rent=leases.column('annual_rent'),
+        term_years=np.where(total_term > 0, total_term, leases.column('term_years')),
+        escalator=leases.column('escalator'),
+        balloon_cost=0.0,
     )
+    return scenario_grid(book, discount_rates, buyout_pcts, escalator_shocks,
+                         names=list(leases.column('name')))
 
 
-def generate_summary_table(results: List[LeaseResult], output_path: Path):
-    """Generate Markdown summary table."""
-    with open(output_path, 'w') as f:
+def generate_summary_table(results, output_path: Path):
+    """Generate Markdown summary table.
+    
+    Rows stream to the file as they are read; totals are accumulated on
+    the way and written after the table.
+    """
+    from lease_book import PortfolioAccumulator
+    totals = PortfolioAccumulator(top_n=0)
+    with open(output_path, 'w', buffering=WRITE_BUFFER_BYTES) as f:
         f.write("# Lease Portfolio Summary\n\n")
         f.write("| Name | Annual Rent / Acre | Total Annual Rent | Base Term | Renewals | Total Term | Escalator | Risk Tier | Discount Rate | Location | Acres | Developer | Total Undiscounted Rent Value | Present Value | **Buyout Offer** | IRR |\n")
         f.write("|------|--------------------|------------------|-----------|----------|------------|-----------|-----------|---------------|----------|-------|-----------|------------------------------|--------------|------------------|----------|\n")
-        for r in results:
-            # Competitive if annualized return > 6% (reasonable target vs 10% discount rate)
-            competitive = "🟢" if r.multiple >= 0.06 else "🟡"
+        for r in lease_rows(results):
+            totals.add(r)
+            competitive = "🟢" if irr_competitive(r.multiple) else "🟡"
             rent_per_acre_display = f"${r.annual_rent_per_acre:,.2f}" if r.annual_rent_per_acre else "—"
             renewals_display = r.renewal_options if r.renewal_options else "—"
             total_term_display = f"{r.total_potential_term}y" if r.total_potential_term else f"{r.term_years}y"
             f.write(
-                f"| {r.name} | {rent_per_acre_display} | ${r.annual_rent:,} | {r.term_years}y | {renewals_display} | {total_term_display} | {r.escalator*100:.1f}% | {r.risk_tier.title()} | {r.discount_rate*100:.0f}% | {r.location} | {r.acres:,.0f} | {r.developer} | ${r.undiscounted_value:,.0f} | ${r.pv_value:,.0f} | **${r.buyout_offer:,.0f}** | {competitive} {r.multiple*100:.1f}% |\n")
+                f"| {r.name} | {rent_per_acre_display} | ${r.annual_rent:,} | {r.term_years}y | {renewals_display} | {total_term_display} | {r.escalator*100:.1f}% | {r.risk_tier.title()} | {r.discount_rate*100:.0f}% | {r.location} | {r.acres:,.0f} | {r.developer} | ${r.undiscounted_value:,.0f} | ${r.pv_value:,.0f} | **${r.buyout_offer:,.0f}** | {competitive} {format_irr(r.multiple)} |\n")
         
+        totals = totals.totals()
         f.write(f"\n## Portfolio Totals\n")
-        f.write(f"- **Total Investment**: ${sum(r.buyout_offer for r in results):,.0f}\n")
-        f.write(f"- **Average Annualized Return**: {sum(r.multiple for r in results) / len(results)*100:.1f}%\n")
-        f.write(f"- **Total Annual Rent**: ${sum(r.annual_rent for r in results):,.0f}\n")
-        f.write(f"- **Total Acres**: {sum(r.acres for r in results):,.0f}\n")
-
-
-def generate_leases_json(results: List[LeaseResult], output_path: Path):
-    """Generate structured JSON file with all lease data."""
-    leases_data = []
-    
-    for r in results:
-        lease_entry = {
-            "name": r.name,
-            "annual_rent": r.annual_rent,
-            "annual_rent_per_acre": round(r.annual_rent_per_acre, 2) if r.annual_rent_per_acre else None,
-            "total_annual_rent": r.annual_rent,
-            "term_years": r.term_years,
-            "escalator": r.escalator,
-            "risk_tier": r.risk_tier,
-            "discount_rate": r.discount_rate,
-            "location": r.location,
-            "acres": r.acres,
-            "developer": r.developer,
-            "present_value": round(r.pv_value, 2),
-            "undiscounted_value": round(r.undiscounted_value, 2),
-            "buyout_offer": round(r.buyout_offer, 2),
-            "multiple": round(r.multiple, 1),
-            "credit_assessment": r.credit_data
-        }
-        leases_data.append(lease_entry)
-    
-    with open(output_path, 'w') as f:
-        json.dump(leases_data, f, indent=2)
+        f.write(f"- **Total Investment**: ${totals.total_buyout:,.0f}\n")
+        f.write(f"- **Average Annualized Return**: {format_irr(totals.avg_multiple)}\n")
+        f.write(f"- **Total Annual Rent**: ${totals.total_annual_rent:,.0f}\n")
+        f.write(f"- **Total Acres**: {totals.total_acres:,.0f}\n")
 
 
-def generate_executive_report(results: List[LeaseResult], discount_rate: float, output_path: Path):
-    """Generate 500-word executive summary report."""
-    total_buyouts = sum(r.buyout_offer for r in results)
-    avg_multiple = sum(r.multiple for r in results) / len(results)
-    total_annual_rent = sum(r.annual_rent for r in results)
-    total_acres = sum(r.acres for r in results)
+def generate_leases_json(results, output_path: Path):
+    """Generate structured JSON file with all lease data.
+    
+    Entries are encoded and written one at a time; the file is identical to
+    ``json.dump(entries, f, indent=2)``.
+    """
+    with open(output_path, 'w', buffering=WRITE_BUFFER_BYTES) as f:
+        separator = "[\n  "
+        for r in lease_rows(results):
+            lease_entry = {
+                "name": r.name,
+                "annual_rent": r.annual_rent,
+                "annual_rent_per_acre": round(r.annual_rent_per_acre, 2) if r.annual_rent_per_acre else None,
+                "total_annual_rent": r.annual_rent,
+                "term_years": r.term_years,
+                "escalator": r.escalator,
+                "risk_tier": r.risk_tier,
+                "discount_rate": r.discount_rate,
+                "location": r.location,
+                "acres": r.acres,
+                "developer": r.developer,
+                "present_value": round(r.pv_value, 2),
+                "undiscounted_value": round(r.undiscounted_value, 2),
+                "buyout_offer": round(r.buyout_offer, 2),
+                "multiple": None if r.multiple is None else round(r.multiple, 1),
+                "credit_assessment": r.credit_data
+            }
+            f.write(separator)
+            # Nest the entry one level inside the top-level list
+            f.write(json.dumps(lease_entry, indent=2).replace("\n", "\n  "))
+            separator = ",\n  "
+        f.write("[]" if separator.startswith("[") else "\n]")
+
+
+def generate_executive_report(results, discount_rate: float, output_path: Path,
+                              top_n: Optional[int] = EXECUTIVE_TOP_N):
+    """Generate 500-word executive summary report.
+    
+    One pass over ``results`` gathers the totals and keeps the ``top_n``
+    largest offers in a heap (``None`` lists every lease); the report is
+    then streamed to the file section by section.
+    """
+    from lease_book import PortfolioAccumulator
+    summary = PortfolioAccumulator(top_n=top_n).update(lease_rows(results))
+    totals = summary.totals()
+    total_buyouts = totals.total_buyout
+    avg_multiple = totals.avg_multiple
+    total_annual_rent = totals.total_annual_rent
+    total_acres = totals.total_acres
     
     # Risk tier breakdown
-    risk_breakdown = {}
-    for r in results:
-        risk_breakdown[r.risk_tier] = risk_breakdown.get(r.risk_tier, 0) + 1
+    risk_breakdown = totals.risk_breakdown
     
-    report = f"""# Executive Summary: Solar Lease Acquisition Analysis
+    with open(output_path, 'w', buffering=WRITE_BUFFER_BYTES) as f:
+        f.write(f"""# Executive Summary: Solar Lease Acquisition Analysis
 *Generated on {datetime.now().strftime('%B %d, %Y')}*
 
 ## Portfolio Overview
 
-SpiceFlow Finance has evaluated **{len(results)} solar ground leases** representing ${total_annual_rent:,.0f} in aggregate annual rent payments across {total_acres:,.0f} acres. Using a {discount_rate*100:.0f}% discount rate and 85% of net present value buyout methodology, we recommend total acquisition investments of **${total_buyouts:,.0f}**.
+SpiceFlow Finance has evaluated **{totals.count} solar ground leases** representing ${total_annual_rent:,.0f} in aggregate annual rent payments across {total_acres:,.0f} acres. Using a {discount_rate*100:.0f}% discount rate and 85% of net present value buyout methodology, we recommend total acquisition investments of **${total_buyouts:,.0f}**.
 
 ## Key Financial Metrics
 
-**Average Annualized Return:** {avg_multiple*100:.1f}%  
-**Total Portfolio Value:** ${sum(r.pv_value for r in results):,.0f} (NPV)  
+**Average Annualized Return:** {format_irr(avg_multiple)}  
+**Total Portfolio Value:** ${totals.total_pv:,.0f} (NPV)  
 **Recommended Offers:** ${total_buyouts:,.0f} (85% of NPV)  
-**Weighted Term:** {sum(r.term_years * r.annual_rent for r in results) / total_annual_rent:.1f} years average
+**Weighted Term:** {totals.weighted_term:.1f} years average
 
 ## Individual Lease Recommendations
 
-"""
-    
-    # Sort by buyout offer size for prioritization
-    sorted_results = sorted(results, key=lambda x: x.buyout_offer, reverse=True)
-    
-    for i, r in enumerate(sorted_results, 1):
-        competitive_note = "✅ Competitive" if r.multiple >= 0.06 else "⚠️ Below target"
-        report += f"**{i}. {r.name}** ({r.location})\n"
-        report += f"- **Recommended Offer:** ${r.buyout_offer:,.0f} ({r.multiple*100:.1f}% annualized return) {competitive_note}\n"
-        report += f"- Term: {r.term_years} years, Escalator: {r.escalator*100:.1f}%, Risk: {r.risk_tier.title()}\n\n"
-    
-    report += f"""## Risk Assessment
+""")
+        
+        # Largest offers first for prioritization
+        top = summary.top()
+        for i, r in enumerate(top, 1):
+            competitive_note = "✅ Competitive" if irr_competitive(r.multiple) else "⚠️ Below target"
+            f.write(f"**{i}. {r.name}** ({r.location})\n")
+            f.write(f"- **Recommended Offer:** ${r.buyout_offer:,.0f} ({format_irr(r.multiple)} annualized return) {competitive_note}\n")
+            f.write(f"- Term: {r.term_years} years, Escalator: {r.escalator*100:.1f}%, Risk: {r.risk_tier.title()}\n\n")
+        if totals.count > len(top):
+            f.write(f"*Top {len(top)} of {totals.count} offers shown; see lease_summary.md for every lease.*\n\n")
+        
+        f.write(f"""## Risk Assessment
 
 The portfolio exhibits balanced risk exposure with {risk_breakdown} distribution across risk tiers. All recommendations assume current market discount rates and standard 85% NPV acquisition pricing.
 
 ## Market Positioning
 
-Our average {avg_multiple*100:.1f}% annualized return compares favorably to industry benchmarks, providing solid returns above the {discount_rate*100:.0f}% discount rate. Deals above 6.0% annualized returns are competitive in today's market.
+Our average {format_irr(avg_multiple)} annualized return compares favorably to industry benchmarks, providing solid returns above the {discount_rate*100:.0f}% discount rate. Deals above 6.0% annualized returns are competitive in today's market.
 
 ## Strategic Recommendations
 
-1. **Prioritize larger transactions** (>${max(r.buyout_offer for r in results)/2:,.0f}) for better execution efficiency
+1. **Prioritize larger transactions** (>${totals.max_buyout/2:,.0f}) for better execution efficiency
 2. **Focus on low-medium risk tiers** to optimize risk-adjusted returns  
 3. **Consider premium pricing** for exceptional locations or developers
 4. **Execute quickly** on competitive offers to secure pipeline
@@ -328,27 +673,112 @@ Our average {avg_multiple*100:.1f}% annualized return compares favorably to indu
 
 ---
 *Prepared by SpiceFlow Finance Analytics Engine*
-"""
-    
-    with open(output_path, 'w') as f:
-        f.write(report)
+""")
 
 
-def main():
+def write_reports(results, discount_rate: float, output_dir: Path) -> Tuple[Path, Path, Path]:
+    """Write the summary, executive report and leases.json.
+    
+    Each file is written to a temporary name and renamed into place, so
+    readers never see a half-written report.
+    """
+    results = as_lease_book(results)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    paths = (output_dir / 'lease_summary.md', output_dir / 'executive_report.md', output_dir / 'leases.json')
+    writers = (
+        generate_summary_table,
+        lambda book, path: generate_executive_report(book, discount_rate, path),
+        generate_leases_json,
+    )
+    for path, writer in zip(paths, writers):
+        fd, tmp = tempfile.mkstemp(dir=output_dir, prefix=f'.{path.name}.', suffix='.tmp')
+        os.close(fd)
+        try:
+            with instrumentation.stage(f'report_{path.stem}'):
+                writer(results, Path(tmp))
+            replace_file(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return paths
+
+
+def publish(results, discount_rate: float, output_dir: Path,
+            store: Optional[DealStore] = None) -> Tuple[Path, Path, Path]:
+    """Record a run in the deal store (if any) and render the reports from it."""
+    if store is not None:
+        with instrumentation.stage('deal_store'):
+            store.record_run(results, discount_rate)
+            results = store.book()
+    return write_reports(results, discount_rate, output_dir)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command-line entry point (the ``spiceflow`` console script)."""
     parser = argparse.ArgumentParser(description='Process lease folder and generate summary + report')
     parser.add_argument('--input', default='data/leases/', help='Input folder with lease documents (PDF, DOCX, JSON)')
     parser.add_argument('--discount-rate', type=float, default=0.10, help='Discount rate (default: 0.10 = 10%)')
-    parser.add_argument('--output-dir', default='.', help='Output directory for files')
-    
-    args = parser.parse_args()
-    
+    parser.add_argument('--output-dir', default='output', help='Output directory for files (default: output)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Processes for document extraction and valuation (default: 1 = sequential)')
+    parser.add_argument('--credit-workers', type=int, default=4,
+                        help='Threads for concurrent credit lookups when --workers > 1 (default: 4)')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR),
+                        help=f'Extraction and credit cache directory (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-extract every document and re-run credit lookups without caching')
+    parser.add_argument('--sweep', action='store_true',
+                        help='Also write a discount-rate x buyout-%% scenario grid and heatmap CSV')
+    parser.add_argument('--sweep-rates', type=float, nargs='+',
+                        help='Discount rates for --sweep (default: 0.06 to 0.14 in 1%% steps)')
+    parser.add_argument('--sweep-pcts', type=float, nargs='+',
+                        help='Buyout percentages for --sweep (default: 0.75 0.80 0.85 0.90)')
+    parser.add_argument('--sweep-shocks', type=float, nargs='+', default=[0.0],
+                        help='Additive escalator shocks for --sweep (default: 0.0)')
+    parser.add_argument('--entity-registry',
+                        help='Known-counterparty registry (.json or .csv) merged into the built-in list')
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help='Clear the extraction and credit caches before processing')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only process new or changed documents, reusing stored rows for the rest')
+    parser.add_argument('--manifest',
+                        help=f'Manifest file for --incremental (default: <output-dir>/{DEFAULT_MANIFEST_NAME})')
+    parser.add_argument('--store',
+                        help='SQLite deal store the reports are rendered from (default: <output-dir>/deals.sqlite3)')
+    parser.add_argument('--no-store', action='store_true',
+                        help='Render reports directly from this run without updating the deal store')
+    parser.add_argument('--format', choices=('json',) + EXPORT_FORMATS, default='json',
+                        help='Also export lease data as leases.parquet / .arrow / .csv (default: leases.json only)')
+    parser.add_argument('--cashflow-cube', nargs='?', const='', metavar='DIR',
+                        help='Update the memory-mapped cash-flow cube (default DIR: <output-dir>/cashflow_cube)')
+    parser.add_argument('--metrics', action='store_true',
+                        help=f'Time each pipeline stage and write <output-dir>/{RUN_REPORT_NAME}')
+    parser.add_argument('--prometheus', metavar='PATH',
+                        help='Also write the stage metrics as a Prometheus text file (implies --metrics)')
+    parser.add_argument('--profile', nargs='?', const='', metavar='PREFIX',
+                        help='Profile the run into PREFIX.prof (cProfile) and PREFIX.folded '
+                             '(flamegraph stacks); default PREFIX: <output-dir>/profile')
+    
+    args = parser.parse_args(argv)
+    
+    if args.metrics or args.prometheus:
+        instrumentation.enable()
+    if args.profile is None:
+        run(args)
+        return
+    prefix = Path(args.profile) if args.profile else Path(args.output_dir) / 'profile'
+    with instrumentation.profiled(prefix) as (prof_path, folded_path):
+        run(args)
+    print(f"🔬 Profile: {prof_path} (cProfile), {folded_path} (folded stacks)")
+
+
+def run(args: argparse.Namespace):
+    """Run the pipeline for parsed command-line arguments."""
     input_path = Path(args.input)
     output_dir = Path(args.output_dir)
     
     # Find all lease document files in input directory
-    document_files = []
-    for pattern in ['*.pdf', '*.docx', '*.json']:
-        document_files.extend(input_path.glob(pattern))
+    document_files = find_documents(input_path)
     
     if not document_files:
         print(f"No lease documents found in {input_path}")
@@ -356,39 +786,91 @@ def main():
     
     print(f"Processing {len(document_files)} lease documents...")
     
+    if args.entity_registry:
+        from credit_lookup import load_entity_registry
+        count = load_entity_registry(args.entity_registry)
+        print(f"📋 Loaded {count} counterparties from {args.entity_registry}")
+    
     # Process each lease file
-    results = []
-    for doc_file in document_files:
-        try:
-            result = process_lease_document(doc_file, args.discount_rate)
-            if result:
-                results.append(result)
-                print(f"✅ Processed: {result.name}")
-            else:
-                print(f"⚠️  Skipped: {doc_file.name}")
-        except Exception as e:
-            print(f"❌ Error processing {doc_file}: {e}")
+    cache = None if args.no_cache else ExtractionCache(Path(args.cache_dir))
+    credit_cache = None
+    if cache is not None:
+        credit_cache = CreditCache(Path(args.cache_dir) / 'credit.sqlite3')
+        if args.rebuild_cache:
+            cache.clear()
+            credit_cache.clear()
+        use_credit_cache(credit_cache)
+    
+    manifest = None
+    if args.incremental:
+        manifest_path = Path(args.manifest) if args.manifest else output_dir / DEFAULT_MANIFEST_NAME
+        manifest = RunManifest.load(manifest_path, manifest_config(args.discount_rate, args.entity_registry))
+    
+    with instrumentation.stage('pipeline'):
+        results = run_pipeline(document_files, args.discount_rate, workers=args.workers,
+                               credit_workers=args.credit_workers, cache=cache, manifest=manifest,
+                               credit_cache=credit_cache)
     
     if not results:
         print("No leases successfully processed")
         return
     
-    # Generate outputs
-    summary_path = output_dir / 'lease_summary.md'
-    report_path = output_dir / 'executive_report.md'
-    
-    generate_summary_table(results, summary_path)
-    generate_executive_report(results, args.discount_rate, report_path)
+    store = None
+    if not args.no_store:
+        from deal_store import DEFAULT_STORE_NAME, DealStore
+        store = DealStore(Path(args.store) if args.store else output_dir / DEFAULT_STORE_NAME)
+    summary_path, report_path, leases_json_path = publish(results, args.discount_rate, output_dir, store)
     
-    # Generate leases.json for data storage
-    leases_json_path = output_dir / 'leases.json'
-    generate_leases_json(results, leases_json_path)
+    export_path = None
+    if args.format != 'json':
+        from lease_io import SUFFIXES, write_leases
+        try:
+            with instrumentation.stage('export'):
+                export_path = write_leases(results, output_dir / f"leases{SUFFIXES[args.format]}", args.format)
+        except ImportError as e:
+            print(f"⚠️  Skipping {args.format} export: {e}")
+    
+    cube_path = cube_changes = None
+    if args.cashflow_cube is not None:
+        from cashflow_cube import DEFAULT_CUBE_DIR, CashFlowCube
+        cube_path = Path(args.cashflow_cube) if args.cashflow_cube else output_dir / DEFAULT_CUBE_DIR
+        with instrumentation.stage('cashflow_cube'), CashFlowCube.open(cube_path) as cube:
+            cube_changes = cube.update(results)
+    
+    if args.sweep:
+        with instrumentation.stage('sweep'):
+            grid = sweep_results(results, args.sweep_rates, args.sweep_pcts, args.sweep_shocks)
+        grid_path = output_dir / 'scenario_grid.csv'
+        heatmap_path = output_dir / 'scenario_heatmap.csv'
+        grid.to_csv(grid_path)
+        grid.to_heatmap_csv(heatmap_path, escalator_shock=args.sweep_shocks[0])
     
     print(f"\n🎉 Complete! Generated:")
     print(f"📊 Summary table: {summary_path}")
     print(f"📋 Executive report: {report_path}")
     print(f"📁 Structured data: {leases_json_path}")
-    print(f"\nTotal recommended investment: ${sum(r.buyout_offer for r in results):,.0f}")
+    if export_path is not None:
+        print(f"📁 {args.format} export: {export_path}")
+    if cube_path is not None:
+        print(f"🧊 Cash-flow cube: {cube_path} ({cube_changes.added} added, "
+              f"{cube_changes.changed} changed, {cube_changes.removed} removed)")
+    if store is not None:
+        print(f"🗄️  Deal store: {store.path}")
+        store.close()
+    if args.sweep:
+        print(f"📈 Scenario grid: {grid_path} ({len(grid.discount_rates)} rates x {len(grid.buyout_pcts)} "
+              f"buyout % x {len(grid.escalator_shocks)} shocks), heatmap: {heatmap_path}")
+    if instrumentation.is_enabled():
+        if cache is not None:
+            instrumentation.count('credit_cache_hits', credit_cache.hits)
+            instrumentation.count('credit_cache_misses', credit_cache.misses)
+        run_report_path = instrumentation.write_report(
+            output_dir / RUN_REPORT_NAME, documents=len(document_files), leases=len(results),
+            workers=args.workers, incremental=args.incremental)
+        print(f"⏱️  Run report: {run_report_path}")
+        if args.prometheus:
+            print(f"⏱️  Prometheus metrics: {instrumentation.write_prometheus(Path(args.prometheus))}")
+    print(f"\nTotal recommended investment: ${results.totals().total_buyout:,.0f}")
 
 
 if __name__ == '__main__':
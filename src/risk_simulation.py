@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Monte Carlo risk engine for solar ground-lease cash flows.
+
+Usage
+-----
+    python src/risk_simulation.py                      # verified deals
+    python src/risk_simulation.py --input leases.json --paths 20000 --seed 7
+
+Each lease is a ``LeaseParams`` plus the contract features that make its
+cash flows uncertain (``LeaseRisk``):
+
+- developer default, an annual hazard chosen by credit risk tier
+- an early-termination option that opens after ``termination_year``
+  (e.g. the Kentucky lease's 15.75-year out)
+- renewal terms, each exercised with ``renewal_prob``
+- CPI-linked escalation, driven by one CPI path per simulation path that is
+  shared across the portfolio, so inflation moves every CPI lease together
+
+Events are drawn as geometric stopping times, so a lease costs O(paths)
+regardless of its term: the PV of each path is read from a table of
+cumulative discounted rent at the year the lease stops paying. Every lease
+has its own ``numpy.random.Generator`` spawned from one ``SeedSequence``;
+results are reproducible for a seed and independent of ``workers``.
+
+>>> result = simulate_portfolio(leases, n_paths=10_000, seed=42)
+>>> result.portfolio_percentiles()          # P5 / P50 / P95 of total PV
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from lease_valuation import LeaseParams
+
+__all__ = [
+    "DEFAULT_PERCENTILES",
+    "LeaseRisk",
+    "SimulationAssumptions",
+    "SimulationResult",
+    "lease_risk_from_record",
+    "simulate_portfolio",
+]
+
+DEFAULT_PERCENTILES = (5.0, 50.0, 95.0)
+DEFAULT_HAZARD = {"low": 0.005, "medium": 0.02, "high": 0.05}
+
+_RENEWALS = re.compile(r'(\d+)\s*[×x]\s*(\d+)', re.IGNORECASE)
+_TERMINATION = re.compile(r'early termination after\s+([0-9]+(?:\.[0-9]+)?)\s*(?:yrs?|years?)', re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class SimulationAssumptions:
+    """Probabilities and CPI dynamics shared by every lease in a run."""
+
+    default_hazard: Mapping[str, float] = field(default_factory=lambda: dict(DEFAULT_HAZARD))
+    termination_hazard: float = 0.05  # annual exercise probability once open
+    renewal_prob: float = 0.75  # probability of exercising each renewal
+    cpi_mean: float = 0.025
+    cpi_vol: float = 0.01
+    cpi_floor: float | None = 0.0  # typical lease floor on CPI escalators
+    cpi_cap: float | None = None
+
+    def hazard_for(self, risk_tier: str) -> float:
+        """Annual developer default probability for a risk tier."""
+        try:
+            return self.default_hazard[risk_tier]
+        except KeyError:
+            raise ValueError(f"No default hazard for risk tier {risk_tier!r}") from None
+
+
+@dataclass
+class LeaseRisk:
+    """A lease and the contract features that make its cash flows uncertain."""
+
+    params: LeaseParams
+    risk_tier: str = "medium"
+    termination_year: float | None = None  # earliest early-termination date
+    renewal_terms: int = 0
+    renewal_years: int = 0
+    cpi_linked: bool = False  # escalate with simulated CPI instead of params.escalator
+    name: str = ""
+
+    @property
+    def horizon(self) -> int:
+        """Longest possible life in whole years, all renewals exercised."""
+        return self.params.term_years + self.renewal_terms * self.renewal_years
+
+    def rents(self) -> np.ndarray:
+        """Deterministic rent for every year up to ``horizon``.
+
+        Custom escalators cover the base term; renewal years continue at
+        ``params.escalator``.
+        """
+        params = self.params
+        if params.custom_escalators is None:
+            return params.annual_rent * (1 + params.escalator) ** np.arange(self.horizon)
+        base = LeaseParams(params.annual_rent, params.term_years,
+                           custom_escalators=params.custom_escalators).cash_flows()
+        extra = base[-1] * (1 + params.escalator) ** np.arange(1, self.horizon - params.term_years + 1)
+        return np.concatenate([base, extra])
+
+
+@dataclass
+class SimulationResult:
+    """Simulated PVs: ``pv[i, p]`` is lease ``i`` on path ``p``."""
+
+    names: List[str]
+    pv: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return self.pv.shape[1]
+
+    @property
+    def portfolio_pv(self) -> np.ndarray:
+        """Total PV per path (leases on a path share its CPI scenario)."""
+        return self.pv.sum(axis=0)
+
+    def mean(self) -> np.ndarray:
+        """Expected PV per lease."""
+        return self.pv.mean(axis=1)
+
+    def lease_percentiles(self, q: Sequence[float] = DEFAULT_PERCENTILES) -> np.ndarray:
+        """``(n_leases, len(q))`` PV percentiles per lease."""
+        return np.percentile(self.pv, q, axis=1).T
+
+    def portfolio_percentiles(self, q: Sequence[float] = DEFAULT_PERCENTILES) -> np.ndarray:
+        """PV percentiles of the whole portfolio."""
+        return np.percentile(self.portfolio_pv, q)
+
+
+def lease_risk_from_record(record: Mapping, *, cpi_linked: bool | None = None) -> LeaseRisk:
+    """Build a ``LeaseRisk`` from a pipeline / manual-override lease dict.
+
+    Reads ``renewal_options`` such as ``"2 × 5-yr"`` and an early-termination
+    note such as ``"early termination after 15.75 yrs"``. CPI linkage comes
+    from ``cpi_linked`` (argument or record key) or a "CPI" mention in notes.
+    """
+    notes = record.get("notes") or ""
+    renewal = _RENEWALS.search(record.get("renewal_options") or "")
+    termination = _TERMINATION.search(notes)
+    if cpi_linked is None:
+        cpi_linked = bool(record.get("cpi_linked", "cpi" in notes.lower()))
+    return LeaseRisk(
+        params=LeaseParams(
+            annual_rent=float(record["annual_rent"]),
+            term_years=int(record["term_years"]),
+            escalator=float(record.get("escalator") or 0.0),
+        ),
+        risk_tier=record.get("risk_tier") or "medium",
+        termination_year=float(termination.group(1)) if termination else None,
+        renewal_terms=int(renewal.group(1)) if renewal else 0,
+        renewal_years=int(renewal.group(2)) if renewal else 0,
+        cpi_linked=cpi_linked,
+        name=record.get("name", ""),
+    )
+
+
+def _cpi_tables(rng: np.random.Generator, n_paths: int, horizon: int,
+                rates: Sequence[float], assumptions: SimulationAssumptions) -> Dict[float, np.ndarray]:
+    """Cumulative discounted CPI-indexed rent per unit of starting rent.
+
+    ``table[rate][p, t]`` is the PV of the first ``t`` years' rent on path
+    ``p`` for a lease paying 1.0 in year one, so any CPI lease's PV on a
+    path is ``rent * table[p, years_paid]``.
+    """
+    cpi = rng.normal(assumptions.cpi_mean, assumptions.cpi_vol, size=(n_paths, max(horizon - 1, 0)))
+    if assumptions.cpi_floor is not None or assumptions.cpi_cap is not None:
+        np.clip(cpi, assumptions.cpi_floor, assumptions.cpi_cap, out=cpi)
+    index = np.ones((n_paths, horizon))
+    np.cumprod(1 + cpi, axis=1, out=index[:, 1:])
+    tables = {}
+    for rate in rates:
+        discount = (1 + rate) ** -np.arange(1, horizon + 1)
+        table = np.zeros((n_paths, horizon + 1))
+        np.cumsum(index * discount, axis=1, out=table[:, 1:])
+        tables[rate] = table
+    return tables
+
+
+def _years_paid(lease: LeaseRisk, rng: np.random.Generator, n_paths: int,
+                assumptions: SimulationAssumptions):
+    """Years of rent received on each path, and which paths defaulted."""
+    term = lease.params.term_years
+    contract_end = np.full(n_paths, term, dtype=np.int64)
+    if lease.renewal_terms:
+        p = assumptions.renewal_prob
+        if p >= 1:
+            contract_end += lease.renewal_terms * lease.renewal_years
+        elif p > 0:
+            # Renewals run in sequence until the first one the tenant declines
+            exercised = np.minimum(rng.geometric(1 - p, n_paths) - 1, lease.renewal_terms)
+            contract_end += exercised * lease.renewal_years
+
+    paid = contract_end
+    if lease.termination_year is not None and assumptions.termination_hazard > 0:
+        # Options open part-way through a year take effect at that year's end
+        first_exit = math.ceil(lease.termination_year)
+        paid = np.minimum(paid, first_exit - 1 + rng.geometric(assumptions.termination_hazard, n_paths))
+
+    defaulted = np.zeros(n_paths, dtype=bool)
+    hazard = assumptions.hazard_for(lease.risk_tier)
+    if hazard > 0:
+        # Default during year k means rent stops after year k - 1
+        default_paid = rng.geometric(hazard, n_paths) - 1
+        defaulted = default_paid < paid
+        paid = np.minimum(paid, default_paid)
+    return paid, defaulted
+
+
+def _simulate_chunk(leases: Sequence[LeaseRisk], seeds: Sequence[np.random.SeedSequence],
+                    n_paths: int, rates: Sequence[float], assumptions: SimulationAssumptions,
+                    cpi_tables: Mapping[float, np.ndarray]) -> np.ndarray:
+    """PV paths for a slice of the portfolio (runs in worker processes)."""
+    pv = np.empty((len(leases), n_paths))
+    path_index = np.arange(n_paths)
+    for row, (lease, seed, rate) in enumerate(zip(leases, seeds, rates)):
+        rng = np.random.default_rng(seed)
+        paid, defaulted = _years_paid(lease, rng, n_paths, assumptions)
+        discount = (1 + rate) ** -np.arange(lease.horizon + 1, dtype=float)
+        if lease.cpi_linked:
+            pv[row] = lease.params.annual_rent * cpi_tables[rate][path_index, paid]
+        else:
+            cumulative = np.concatenate([[0.0], np.cumsum(lease.rents() * discount[1:])])
+            pv[row] = cumulative[paid]
+        if lease.params.balloon_cost:
+            # Decommissioning falls due when the lease ends, unless the developer defaulted
+            owes = (paid > 0) & ~defaulted
+            pv[row] -= np.where(owes, lease.params.balloon_cost * discount[paid], 0.0)
+    return pv
+
+
+def simulate_portfolio(
+    leases: Sequence[LeaseRisk],
+    *,
+    n_paths: int = 10_000,
+    discount_rate: float | Sequence[float] = 0.10,
+    assumptions: SimulationAssumptions | None = None,
+    seed: int | None = None,
+    workers: int = 1,
+) -> SimulationResult:
+    """Simulate PV distributions for every lease and the portfolio.
+
+    Parameters
+    ----------
+    leases
+        Leases to simulate.
+    n_paths
+        Number of Monte Carlo paths.
+    discount_rate
+        One rate for the book, or one per lease.
+    assumptions
+        Hazards, renewal and CPI parameters; defaults to
+        ``SimulationAssumptions()``.
+    seed
+        Root seed. The CPI stream and each lease's stream are spawned from
+        it, so a lease's paths do not depend on its neighbours or on
+        ``workers``.
+    workers
+        Processes to split the leases across (1 = in-process).
+    """
+    assumptions = assumptions or SimulationAssumptions()
+    rates = [float(r) for r in np.broadcast_to(np.asarray(discount_rate, dtype=float), (len(leases),))]
+    cpi_seed, *lease_seeds = np.random.SeedSequence(seed).spawn(len(leases) + 1)
+
+    cpi_leases = [lease for lease in leases if lease.cpi_linked]
+    cpi_tables = {}
+    if cpi_leases:
+        horizon = max(lease.horizon for lease in cpi_leases)
+        cpi_rates = sorted({rate for lease, rate in zip(leases, rates) if lease.cpi_linked})
+        cpi_tables = _cpi_tables(np.random.default_rng(cpi_seed), n_paths, horizon, cpi_rates, assumptions)
+
+    if workers <= 1 or len(leases) < 2:
+        pv = _simulate_chunk(leases, lease_seeds, n_paths, rates, assumptions, cpi_tables)
+    else:
+        bounds = np.linspace(0, len(leases), min(workers * 4, len(leases)) + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = [
+                pool.submit(_simulate_chunk, leases[lo:hi], lease_seeds[lo:hi], n_paths,
+                            rates[lo:hi], assumptions, cpi_tables)
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+            pv = np.concatenate([chunk.result() for chunk in chunks]) if chunks else np.empty((0, n_paths))
+    return SimulationResult(names=[lease.name for lease in leases], pv=pv)
+
+
+def main():
+    from manual_overrides import MANUAL_LEASE_DATA
+
+    parser = argparse.ArgumentParser(description='Monte Carlo PV distributions for a lease portfolio')
+    parser.add_argument('--input', help='leases.json from process_leases (default: verified manual leases)')
+    parser.add_argument('--paths', type=int, default=10_000, help='Simulation paths (default: 10000)')
+    parser.add_argument('--seed', type=int, default=None, help='Root random seed for reproducible runs')
+    parser.add_argument('--discount-rate', type=float, default=0.10, help='Discount rate (default: 0.10)')
+    parser.add_argument('--workers', type=int, default=1, help='Processes to split leases across')
+    parser.add_argument('--percentiles', type=float, nargs='+', default=list(DEFAULT_PERCENTILES),
+                        help='Percentiles to report (default: 5 50 95)')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(Path(args.input)) as f:
+            records = json.load(f)
+    else:
+        records = list(MANUAL_LEASE_DATA.values())
+    leases = [lease_risk_from_record(r) for r in records if r.get("term_years")]
+
+    result = simulate_portfolio(leases, n_paths=args.paths, discount_rate=args.discount_rate,
+                                seed=args.seed, workers=args.workers)
+
+    headers = " | ".join(f"P{q:g}" for q in args.percentiles)
+    print(f"📊 {result.n_paths:,} paths across {len(leases)} leases\n")
+    print(f"| Lease | Tier | Mean PV | {headers} |")
+    for lease, mean, row in zip(leases, result.mean(), result.lease_percentiles(args.percentiles)):
+        cells = " | ".join(f"${v:,.0f}" for v in row)
+        print(f"| {lease.name} | {lease.risk_tier.title()} | ${mean:,.0f} | {cells} |")
+    cells = " | ".join(f"${v:,.0f}" for v in result.portfolio_percentiles(args.percentiles))
+    print(f"| **Portfolio** | | ${result.portfolio_pv.mean():,.0f} | {cells} |")
+
+
+if __name__ == '__main__':
+    main()
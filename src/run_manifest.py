@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Incremental Run Manifest
+========================
+
+Remembers which documents a pipeline run has already processed, and the
+per-lease row each one produced, so the next run only re-extracts and
+re-values documents that are new or changed.
+
+A document is unchanged when its size and mtime match the manifest. If only
+the mtime moved (copied, touched) the SHA-256 decides, so identical content
+is never re-processed. Each entry also stores a fingerprint of the
+document's manual override / skip rule: editing one override re-processes
+only that document. The whole manifest is invalidated when the global
+configuration fingerprint (extractor versions, discount rate) changes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from extraction_cache import file_digest, replace_file
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_NAME = 'lease_manifest.json'
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable short hash of JSON-serialisable configuration."""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class RunManifest:
+    """Per-document processing state persisted as a JSON file."""
+
+    def __init__(self, path: Path, config: str):
+        self.path = Path(path)
+        self.config = config
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self._digests: Dict[str, str] = {}  # hashed during changed(), reused by record()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: Path, config: str) -> "RunManifest":
+        """Read a manifest; a missing, old or differently configured one starts empty."""
+        manifest = cls(path, config)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return manifest
+        if data.get('version') == MANIFEST_VERSION and data.get('config') == config:
+            manifest.documents = data.get('documents', {})
+        return manifest
+
+    def changed(self, paths: Iterable[Path], document_key: Callable[[Path], str]) -> List[Path]:
+        """Documents that are new, modified, or whose override/skip rule changed."""
+        self._digests = {}  # a long-lived manifest must not reuse last scan's hashes
+        pending = []
+        for path in paths:
+            key = str(path)
+            entry = self.documents.get(key)
+            st = path.stat()
+            if entry is None or entry['rules'] != document_key(path):
+                pending.append(path)
+                continue
+            if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+                continue
+            digest = self._digest(path)
+            if entry['sha256'] == digest and entry['size'] == st.st_size:
+                entry['mtime_ns'] = st.st_mtime_ns  # touched, not edited
+                self._dirty = True
+                continue
+            pending.append(path)
+        return pending
+
+    def record(self, path: Path, rules: str, row: Optional[Dict[str, Any]]):
+        """Store the outcome of processing ``path`` (``row=None``: no lease in it)."""
+        st = path.stat()
+        self.documents[str(path)] = {
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': self._digest(path),
+            'rules': rules,
+            'row': row,
+        }
+        self._dirty = True
+
+    def replace_row(self, path: Path, row: Dict[str, Any]):
+        """Swap the stored row of an unchanged document (e.g. refreshed credit)."""
+        self.documents[str(path)]['row'] = row
+        self._dirty = True
+
+    def prune(self, paths: Iterable[Path]) -> int:
+        """Drop entries for documents no longer present; returns how many."""
+        keep = {str(p) for p in paths}
+        removed = [key for key in self.documents if key not in keep]
+        for key in removed:
+            del self.documents[key]
+        self._dirty = self._dirty or bool(removed)
+        return len(removed)
+
+    def rows(self, paths: Iterable[Path], with_missing: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """Stored lease rows for ``paths``, in that order.
+
+        Documents without a row are skipped, or give None with ``with_missing``.
+        """
+        rows = []
+        for path in paths:
+            entry = self.documents.get(str(path))
+            row = entry['row'] if entry is not None else None
+            if row is not None or with_missing:
+                rows.append(row)
+        return rows
+
+    def save(self, force: bool = False):
+        """Atomically write the manifest (skipped when nothing changed since load)."""
+        if not (self._dirty or force or not self.path.exists()):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {'version': MANIFEST_VERSION, 'config': self.config, 'documents': self.documents}
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(payload, f)
+        replace_file(tmp, self.path)
+        self._dirty = False
+
+    def _digest(self, path: Path) -> str:
+        key = str(path)
+        if key not in self._digests:
+            self._digests[key] = file_digest(path)
+        return self._digests[key]
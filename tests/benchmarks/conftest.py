@@ -0,0 +1,65 @@
+"""
+Shared setup for the pytest-benchmark performance suite
+
+Run with:
+    pytest tests/benchmarks --benchmark-only
+    pytest tests/benchmarks --benchmark-only -m slow        # scaling curves to 1M leases
+    pytest tests/benchmarks --benchmark-only --benchmark-autosave \
+        --benchmark-compare --benchmark-compare-fail=mean:25%
+
+The committed cross-run baseline and its regression gate live in
+scripts/benchmark.py (``--compare tests/benchmarks/baseline.json``).
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: scaling benchmarks up to 1M leases (select with -m slow)')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip ``slow`` benchmarks unless the run selects them with ``-m``."""
+    if 'slow' in (config.option.markexpr or ''):
+        return
+    skip = pytest.mark.skip(reason='scaling benchmark; run with -m slow')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
+
+
+def synthetic_portfolio(n, seed=42):
+    """Columnar lease book with realistic ranges for rent, term and rates."""
+    rng = np.random.default_rng(seed)
+    return {
+        'annual_rent': rng.uniform(5_000, 500_000, n).round(),
+        'term_years': rng.integers(15, 46, n),
+        'escalator': rng.choice([0.0, 0.01, 0.015, 0.02, 0.025], n),
+        'discount_rate': rng.choice([0.08, 0.10, 0.12], n),
+        'buyout_pct': np.full(n, 0.85),
+    }
+
+
+LEASE_HEADER = (
+    "This lease is for a term of 25 years. The annual rent shall be $95,680. "
+    "Rent shall escalate at 2.5% annually. The premises consist of 36.8 acres "
+    "located in Kendall County, Illinois. Lessee: Lanceleaf Solar LLC. "
+)
+BOILERPLATE = (
+    "The lessee shall maintain the premises in good repair and comply with all applicable laws. "
+    "Notices shall be delivered to the addresses set forth herein. "
+)
+# Keywords with no completing value: worst case for lazy cross-sentence spans
+ADVERSARIAL = "rent term payment lessee $100 acres escalation increase county state located expires lease "
+
+
+def synthetic_text(size, filler, header=""):
+    """Lease text of ``size`` characters: header followed by repeated filler."""
+    body = filler * (size // len(filler) + 1)
+    return (header + body)[:size]
@@ -0,0 +1,49 @@
+"""
+Benchmarks for text extraction and whole-document processing
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from pathlib import Path
+from unittest.mock import patch
+
+from conftest import ADVERSARIAL, BOILERPLATE, LEASE_HEADER, synthetic_text
+from document_extractor import extract_lease_data_from_text
+from process_leases import find_documents, process_lease_document
+
+TEXT_KB = [4, 64, 256]
+SAMPLE_LEASES = Path(__file__).parent.parent.parent / 'data' / 'leases'
+
+
+@pytest.mark.benchmark(group='extraction')
+class TestExtraction:
+    """Benchmark regex extraction on synthetic texts of growing size."""
+
+    @pytest.mark.parametrize('kb', TEXT_KB)
+    def test_lease_text(self, benchmark, kb):
+        """Benchmark a lease header followed by boilerplate."""
+        text = synthetic_text(kb * 1024, BOILERPLATE, LEASE_HEADER)
+        data = benchmark(extract_lease_data_from_text, text, 'synthetic')
+        assert data['annual_rent'] == 95680
+
+    @pytest.mark.parametrize('kb', TEXT_KB)
+    def test_adversarial_text(self, benchmark, kb):
+        """Benchmark keywords that never complete a match (backtracking worst case)."""
+        text = synthetic_text(kb * 1024, ADVERSARIAL)
+        benchmark(extract_lease_data_from_text, text, 'adversarial')
+
+
+@pytest.mark.benchmark(group='document')
+@patch('process_leases.quick_lookup',
+       side_effect=lambda name: {'company_name': name, 'risk_tier': 'medium', 'data_sources': ['Benchmark']})
+def test_process_sample_leases(mock_lookup, benchmark, capsys):
+    """Benchmark process_lease_document over the sample leases, offline."""
+    documents = find_documents(SAMPLE_LEASES)
+
+    def run():
+        return [process_lease_document(path) for path in documents]
+
+    results = benchmark(run)
+    capsys.readouterr()
+    assert any(results)
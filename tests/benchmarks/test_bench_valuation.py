@@ -0,0 +1,77 @@
+"""
+Benchmarks for lease valuation and IRR
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import numpy as np
+
+from conftest import synthetic_portfolio
+from irr import lease_cash_flow_matrix, solve_irr
+from lease_valuation import LeaseParams, present_value, pv_buyout, pv_buyout_batch
+from process_leases import calculate_irr
+
+SCALING_SIZES = [10_000, 100_000, 1_000_000]
+
+
+@pytest.mark.benchmark(group='valuation')
+class TestScalarValuation:
+    """Benchmark the per-lease valuation calls."""
+
+    def test_pv_buyout(self, benchmark):
+        """Benchmark one closed-form buyout."""
+        offer = benchmark(pv_buyout, annual_rent=95680, term_years=35, escalator=0.025,
+                          discount_rate=0.10, buyout_pct=0.85)
+        assert offer > 0
+
+    def test_present_value(self, benchmark):
+        """Benchmark discounting a 35-year cash-flow array."""
+        flows = LeaseParams(annual_rent=95680, term_years=35, escalator=0.025).cash_flows()
+        assert benchmark(present_value, flows, 0.10) > 0
+
+    def test_calculate_irr(self, benchmark):
+        """Benchmark one IRR solve for a 25-year lease."""
+        rents = LeaseParams(annual_rent=95680, term_years=25, escalator=0.025).cash_flows()
+        cash_flows = [-1_039_179.21] + rents.tolist()
+        assert benchmark(calculate_irr, cash_flows) > 0
+
+
+@pytest.mark.benchmark(group='valuation-batch')
+class TestBatchValuation:
+    """Benchmark the vectorised portfolio paths."""
+
+    def test_pv_buyout_batch_10k(self, benchmark):
+        """Benchmark 10k buyouts in one call."""
+        book = synthetic_portfolio(10_000)
+        assert len(benchmark(pv_buyout_batch, **book)) == 10_000
+
+    def test_solve_irr_10k(self, benchmark):
+        """Benchmark 10k IRRs in one call."""
+        book = synthetic_portfolio(10_000)
+        offers = pv_buyout_batch(**book)
+        flows = lease_cash_flow_matrix(offers, book['annual_rent'], book['term_years'], book['escalator'])
+        result = benchmark(solve_irr, flows)
+        assert np.isfinite(result.rate).all()
+
+
+@pytest.mark.slow
+@pytest.mark.benchmark(group='scaling')
+class TestScaling:
+    """Scaling curves for the batch paths up to 1M synthetic leases."""
+
+    @pytest.mark.parametrize('n', SCALING_SIZES)
+    def test_pv_buyout_batch(self, benchmark, n):
+        """Benchmark pv_buyout_batch at growing portfolio sizes."""
+        book = synthetic_portfolio(n)
+        benchmark.extra_info['leases'] = n
+        benchmark.pedantic(pv_buyout_batch, kwargs=book, rounds=3, iterations=1)
+
+    @pytest.mark.parametrize('n', SCALING_SIZES)
+    def test_solve_irr(self, benchmark, n):
+        """Benchmark solve_irr at growing portfolio sizes."""
+        book = synthetic_portfolio(n)
+        offers = pv_buyout_batch(**book)
+        flows = lease_cash_flow_matrix(offers, book['annual_rent'], book['term_years'], book['escalator'])
+        benchmark.extra_info['leases'] = n
+        benchmark.pedantic(solve_irr, args=(flows,), rounds=3, iterations=1)
@@ -0,0 +1,161 @@
+"""
+Unit tests for the memory-mapped cash-flow cube
+"""
+import pytest
+import json
+import numpy as np
+import sys
+import os
+from dataclasses import replace
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cashflow_cube import CashFlowCube
+from lease_valuation import LeaseParams, present_value
+from process_leases import LeaseResult
+
+
+def lease(name, rent=95680, term=25, escalator=0.025, **overrides):
+    fields = dict(
+        name=name, annual_rent=rent, annual_rent_per_acre=None, term_years=term,
+        renewal_options=None, total_potential_term=None, escalator=escalator, risk_tier="medium",
+        location="Kendall County, Illinois", acres=0, developer="Lanceleaf Solar",
+        pv_value=0.0, undiscounted_value=0.0, buyout_offer=0.0, multiple=0.0, discount_rate=0.10,
+        credit_data={},
+    )
+    fields.update(overrides)
+    return LeaseResult(**fields)
+
+
+LEASES = [
+    lease("Lanceleaf", total_potential_term=35),
+    lease("Laramie", rent=230000, term=30, escalator=0.02, risk_tier="low", location="Laramie, Wyoming"),
+    lease("Big Illinois", rent=150000, term=20, escalator=0.0, risk_tier="low", location="Illinois"),
+    lease("Unknown Site", rent=52500, term=15, risk_tier="high", location="Unknown"),
+]
+
+
+@pytest.fixture
+def cube(tmp_path):
+    with CashFlowCube.open(tmp_path / "cube") as cube:
+        cube.update(LEASES)
+        yield cube
+
+
+class TestBuild:
+    """Test rows match the valuation model."""
+
+    def test_rows_are_lease_cash_flows(self, cube):
+        """Test each row is LeaseParams.cash_flows over the valuation term."""
+        flows = cube.select().values()
+        expected = LeaseParams(annual_rent=95680, term_years=35, escalator=0.025).cash_flows()
+        np.testing.assert_allclose(flows[0, :35], expected)
+        assert not flows[0, 35:].any()
+        assert cube.select().names == [l.name for l in LEASES]
+
+    def test_present_values_match_model(self, cube):
+        """Test per-lease and total PVs agree with lease_valuation.present_value."""
+        expected = [present_value(LeaseParams(l.annual_rent, l.total_potential_term or l.term_years,
+                                              l.escalator).cash_flows(), 0.10) for l in LEASES]
+        np.testing.assert_allclose(cube.select().present_values(0.10), expected)
+        assert cube.select().present_value(0.10) == pytest.approx(sum(expected))
+
+    def test_part_year_paid_in_full(self, cube):
+        """Test a fractional term rounds up like LeaseParams.cash_flows."""
+        cube.update([lease("Half", rent=1000, term=10.5, escalator=0.0)])
+        expected = LeaseParams(annual_rent=1000, term_years=10.5).cash_flows()
+        np.testing.assert_allclose(cube.select().values()[0, :11], expected)
+        assert cube.select().calendar().sum() == 11000
+
+    def test_long_term_widens_horizon(self, cube):
+        """Test a term beyond the horizon widens the cube and keeps existing rows."""
+        before = cube.select().values().copy()
+        cube.update(LEASES + [lease("Century", rent=1000, term=99, escalator=0.0)])
+        assert cube.horizon == 99
+        np.testing.assert_array_equal(cube.select().values()[:4, :before.shape[1]], before)
+        assert cube.select().calendar()[98] == 1000
+
+
+class TestIncremental:
+    """Test updates touch only what changed and survive reopening."""
+
+    def test_update_diffs_by_name(self, cube):
+        """Test changed, added and removed leases are counted and applied."""
+        run = [replace(LEASES[0], annual_rent=100000), LEASES[1], LEASES[3], lease("New Site", rent=1000)]
+        changes = cube.update(run)
+        assert (changes.added, changes.changed, changes.removed) == (1, 1, 1)
+        assert sorted(cube.select().names) == sorted(l.name for l in run)
+        assert cube.update(run) == (0, 0, 0)
+        by_name = dict(zip(cube.select().names, cube.select().values()[:, 0]))
+        assert by_name == {"Lanceleaf": 100000, "Laramie": 230000, "Unknown Site": 52500, "New Site": 1000}
+
+    def test_duplicate_names_keep_rows(self, cube):
+        """Test leases sharing a name stay separate rows, keyed as in the deal store."""
+        twins = LEASES + [replace(LEASES[0], annual_rent=1000)]
+        assert cube.update(twins).added == 1
+        assert cube.keys[-1] == "Lanceleaf#2"
+        assert cube.select().calendar()[0] == pytest.approx(sum(l.annual_rent for l in twins))
+        assert cube.update(twins) == (0, 0, 0)
+        assert cube.update(LEASES).removed == 1
+
+    def test_growth_and_reopen(self, cube):
+        """Test appends past the initial capacity persist across opens."""
+        many = LEASES + [lease(f"Site {i}", rent=1000 + i) for i in range(2000)]
+        cube.update(many)
+        cube.close()
+        with CashFlowCube.open(cube.path, readonly=True) as reopened:
+            assert len(reopened) == len(many)
+            assert reopened.select().calendar()[0] == pytest.approx(sum(l.annual_rent for l in many))
+            with pytest.raises(PermissionError):
+                reopened.update(LEASES)
+
+    def test_incomplete_cube_is_rebuilt(self, cube):
+        """Test a cube interrupted mid-update starts empty on the next open."""
+        meta = cube.path / "cube.json"
+        meta.write_text(json.dumps(dict(json.loads(meta.read_text()), complete=False)))
+        cube.close()
+        with CashFlowCube.open(cube.path) as reopened:
+            assert len(reopened) == 0
+            assert reopened.update(LEASES).added == 4
+        with pytest.raises(FileNotFoundError):
+            CashFlowCube.open(cube.path / "missing", readonly=True)
+
+
+class TestSlices:
+    """Test slicing and the portfolio analytics."""
+
+    def test_year_range_is_a_view(self, cube):
+        """Test an unfiltered year range shares memory with the mapped file."""
+        window = cube.select(years=(1, 10))
+        assert np.shares_memory(window.values(), cube.select().values())
+        assert list(window.years) == list(range(1, 11))
+        np.testing.assert_allclose(window.calendar(), cube.select().calendar()[:10])
+
+    def test_tier_and_state_filters(self, cube):
+        """Test tier and state select rows case-insensitively."""
+        assert cube.select(risk_tier="LOW").names == ["Laramie", "Big Illinois"]
+        assert cube.select(state="illinois").names == ["Lanceleaf", "Big Illinois"]
+        assert cube.select(risk_tier="low", state="Illinois").names == ["Big Illinois"]
+        assert len(cube.select(state="Texas")) == 0
+        with pytest.raises(ValueError):
+            cube.select(years=(0, 5))
+        with pytest.raises(ValueError):
+            cube.select(years=(cube.horizon + 10, cube.horizon + 20))
+        assert list(cube.select(years=(40, 70)).years) == list(range(40, cube.horizon + 1))
+
+    def test_duration_and_convexity(self, cube):
+        """Test a level annuity's duration and convexity against closed forms."""
+        flat = cube.select(risk_tier="low", state="Illinois")
+        r, t = 0.10, np.arange(1, 21)
+        df = 1 / (1 + r) ** t
+        pv = 150000 * df.sum()
+        assert flat.present_value(r) == pytest.approx(pv)
+        assert flat.duration(r) == pytest.approx((t * df).sum() / df.sum())
+        assert flat.duration(r, modified=True) == pytest.approx(flat.duration(r) / 1.1)
+        assert flat.convexity(r) == pytest.approx((t * (t + 1) * df).sum() / (df.sum() * 1.1 ** 2))
+        assert cube.select(state="Texas").duration(r) == 0.0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,119 @@
+"""
+Unit tests for the persistent credit assessment cache
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch, Mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from credit_cache import DAY, NOT_FOUND, CreditCache
+from credit_lookup import CreditLookup
+
+PUBLIC = {"public_company": True, "years_since_incorp": 10, "state_of_incorp": "DE"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def sec_response(text):
+    response = Mock()
+    response.status_code = 200
+    response.text = text
+    return response
+
+
+class TestCreditCache:
+    """Test the LRU + SQLite layers, TTLs and stats."""
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test a new process (new instance) reads entries from disk."""
+        CreditCache(tmp_path / "credit.sqlite3").put("Boulevard Associates", "SEC EDGAR", PUBLIC)
+        cache = CreditCache(tmp_path / "credit.sqlite3")
+        entry = cache.get("BOULEVARD ASSOCIATES")
+        assert entry.data == PUBLIC
+        assert entry.source == "SEC EDGAR"
+        assert cache.stats() == {"hits": 1, "misses": 0, "stale": 0}
+
+    def test_per_source_ttl(self, tmp_path):
+        """Test negative entries expire sooner than SEC hits."""
+        clock = FakeClock()
+        cache = CreditCache(tmp_path / "credit.sqlite3", clock=clock)
+        cache.put("Public Solar", "SEC EDGAR", PUBLIC)
+        cache.put("Tiny Wind", NOT_FOUND, None)
+
+        clock.now += 2 * DAY
+        assert cache.get("Tiny Wind") is None
+        assert cache.get("Public Solar").data == PUBLIC
+        assert cache.stats() == {"hits": 1, "misses": 1, "stale": 1}
+
+        clock.now += 6 * DAY
+        assert CreditCache(tmp_path / "credit.sqlite3", clock=clock).get("Public Solar") is None
+
+    def test_negative_entry_is_a_hit(self):
+        """Test a cached not-found returns an entry with no data."""
+        cache = CreditCache()
+        cache.put("Tiny Wind", NOT_FOUND, None)
+        entry = cache.get("Tiny Wind")
+        assert entry is not None and entry.data is None
+
+    def test_memory_lru_bound(self):
+        """Test the in-process layer keeps only the most recent entries."""
+        cache = CreditCache(memory_entries=2)
+        for name in ["a", "b", "c"]:
+            cache.put(name, "SEC EDGAR", PUBLIC)
+        assert cache.get("a") is None
+        assert cache.get("c") is not None
+
+    def test_clear(self, tmp_path):
+        """Test clear empties both layers."""
+        cache = CreditCache(tmp_path / "credit.sqlite3")
+        cache.put("Public Solar", "SEC EDGAR", PUBLIC)
+        cache.clear()
+        assert cache.get("Public Solar") is None
+        assert CreditCache(tmp_path / "credit.sqlite3").get("Public Solar") is None
+
+
+class TestCachedCreditLookup:
+    """Test CreditLookup with a cache attached."""
+
+    @patch('credit_lookup.requests.Session.get')
+    def test_repeat_run_skips_network(self, mock_get, tmp_path):
+        """Test the second run answers both hits and negatives from disk."""
+        mock_get.side_effect = lambda url, params, **kw: sec_response(
+            "10-K filing" if "Boulevard" in params["company"] else "nothing here")
+        names = ["Boulevard Associates LLC", "Tiny Wind LLC"]
+
+        with CreditLookup(cache=CreditCache(tmp_path / "credit.sqlite3")) as first_run:
+            first = first_run.lookup_many(names)
+        with CreditLookup(cache=CreditCache(tmp_path / "credit.sqlite3")) as second_run:
+            second = second_run.lookup_many(names)
+            second_stats = second_run.cache.stats()
+
+        assert mock_get.call_count == 2
+        assert second_stats["hits"] == 2
+        for name in names:
+            first[name].pop("lookup_timestamp")
+            second[name].pop("lookup_timestamp")
+        assert second == first
+        assert second["Boulevard Associates LLC"]["risk_tier"] == "low"
+
+    @patch('credit_lookup.requests.Session.get')
+    def test_errors_are_not_cached(self, mock_get):
+        """Test a network failure is retried rather than cached as not-found."""
+        mock_get.side_effect = [Exception("Network error"), sec_response("10-K")]
+        with CreditLookup(cache=CreditCache()) as lookup:
+            assert lookup.lookup_company("Public Solar")["public_company"] is False
+            assert lookup.lookup_company("Public Solar")["public_company"] is True
+        assert mock_get.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
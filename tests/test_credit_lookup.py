@@ -5,12 +5,55 @@ import pytest
 import json
 import sys
 import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 from unittest.mock import patch, Mock
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from credit_lookup import CreditLookup, quick_lookup, KNOWN_ENTITIES
+from credit_lookup import CreditLookup, TokenBucket, quick_lookup, quick_lookup_many, KNOWN_ENTITIES
+
+
+@pytest.fixture
+def sec_stub():
+    """Local EDGAR stand-in: companies containing 'public' have 10-K filings."""
+    requests_seen = Counter()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            company = parse_qs(urlparse(self.path).query)["company"][0]
+            with lock:
+                requests_seen[company] += 1
+            time.sleep(0.05)  # keep requests in flight long enough to overlap
+            body = b"<feed>10-K annual report</feed>" if "public" in company.lower() else b"<feed/>"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.requests_seen = requests_seen
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
 
 
 class TestCreditLookup:
@@ -61,7 +104,7 @@ class TestCreditLookup:
         assert lookup._get_discount_rate("high") == 0.10
         assert lookup._get_discount_rate("unknown") == 0.10  # Default
     
-    @patch('credit_lookup.requests.get')
+    @patch('credit_lookup.requests.Session.get')
     def test_sec_lookup_success(self, mock_get):
         """Test successful SEC lookup."""
         # Mock response with public company indicators
@@ -78,7 +121,7 @@ class TestCreditLookup:
         assert result["years_since_incorp"] == 10
         assert result["state_of_incorp"] == "DE"
     
-    @patch('credit_lookup.requests.get')
+    @patch('credit_lookup.requests.Session.get')
     def test_sec_lookup_failure(self, mock_get):
         """Test SEC lookup failure handling."""
         # Mock failed request
@@ -89,7 +132,7 @@ class TestCreditLookup:
         
         assert result is None
     
-    @patch('credit_lookup.requests.get')
+    @patch('credit_lookup.requests.Session.get')
     def test_sec_lookup_no_public_indicators(self, mock_get):
         """Test SEC lookup with no public company indicators."""
         mock_response = Mock()
@@ -103,6 +146,82 @@ class TestCreditLookup:
         assert result is None
 
 
+class TestTokenBucket:
+    """Test the SEC request throttle."""
+
+    def test_waits_for_refill(self):
+        """Test an empty bucket sleeps exactly long enough for one token."""
+        now = [0.0]
+        sleeps = []
+
+        def fake_sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=10, capacity=2, clock=lambda: now[0], sleep=fake_sleep)
+        for _ in range(3):
+            bucket.acquire()
+        assert sleeps == [pytest.approx(0.1)]
+
+
+class TestLookupMany:
+    """Test batch lookups against a stub SEC server."""
+
+    def test_batch_results_and_dedupe(self, sec_stub):
+        """Test names with the same clean form share one in-flight request."""
+        names = ["Public Solar LLC", "Public Solar Inc", "Public Solar", "Tiny Wind LLC", "", "Tiny Wind LLC"]
+        with CreditLookup(base_url=sec_stub.url) as lookup:
+            results = lookup.lookup_many(names)
+
+        assert list(results) == ["Public Solar LLC", "Public Solar Inc", "Public Solar", "Tiny Wind LLC"]
+        assert sec_stub.requests_seen == Counter({"Public Solar": 1, "Tiny Wind": 1})
+        assert results["Public Solar Inc"]["public_company"] is True
+        assert results["Public Solar Inc"]["company_name"] == "Public Solar Inc"
+        assert results["Public Solar Inc"]["data_sources"] == ["SEC EDGAR"]
+        assert results["Tiny Wind LLC"]["public_company"] is False
+        assert results["Tiny Wind LLC"]["risk_tier"] == "high"
+
+    def test_lookup_finished_before_registration(self):
+        """Test a SEC lookup that completes before its callback is added does not deadlock."""
+        lookup = CreditLookup()
+        with patch.object(lookup, '_sec_lookup', return_value=None), \
+                patch('credit_lookup.ThreadPoolExecutor') as executor_cls:
+            # submit() hands back an already-finished future
+            executor_cls.return_value.submit.side_effect = lambda fn, *args: _done(fn(*args))
+            result = lookup.lookup_company("Tiny Wind LLC")
+        assert result["public_company"] is False
+        assert lookup._inflight == {}
+
+    def test_requests_run_concurrently(self, sec_stub):
+        """Test distinct companies overlap instead of queueing one by one."""
+        names = [f"Developer {i}" for i in range(8)]
+        with CreditLookup(base_url=sec_stub.url, max_workers=8) as lookup:
+            start = time.perf_counter()
+            lookup.lookup_many(names)
+            elapsed = time.perf_counter() - start
+        assert len(sec_stub.requests_seen) == 8
+        assert elapsed < 8 * 0.05
+
+    def test_rate_limit(self, sec_stub):
+        """Test request starts never exceed the configured rate."""
+        names = [f"Developer {i}" for i in range(6)]
+        with CreditLookup(base_url=sec_stub.url, max_requests_per_second=20) as lookup:
+            lookup._rate_limiter = TokenBucket(rate=20, capacity=1)
+            start = time.perf_counter()
+            lookup.lookup_many(names)
+            elapsed = time.perf_counter() - start
+        # One token up front, then one every 50 ms
+        assert elapsed >= 5 * 0.05 * 0.9
+
+    def test_quick_lookup_many_skips_known_entities(self, sec_stub):
+        """Test known entities never reach the SEC client."""
+        with patch('credit_lookup._default_client', CreditLookup(base_url=sec_stub.url)):
+            results = quick_lookup_many(["Lanceleaf Solar LLC", "Public Power Co", None])
+        assert results["Lanceleaf Solar LLC"]["data_sources"] == ["Known Entities DB"]
+        assert results["Public Power Co"]["public_company"] is True
+        assert sec_stub.requests_seen == Counter({"Public Power": 1})
+
+
 class TestQuickLookup:
     """Test the quick lookup functionality."""
     
@@ -0,0 +1,128 @@
+"""
+Unit tests for the dated cash-flow engine
+"""
+import pytest
+import numpy as np
+import sys
+import os
+from datetime import date
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dated_cash_flows import (
+    PaymentSchedule,
+    dated_cash_flows,
+    dated_present_values,
+    discount_factors,
+    xirr,
+    xnpv,
+    year_fraction,
+)
+from irr import CONVERGED, NO_IRR
+from lease_valuation import LeaseParams
+
+# Kentucky lease: 30.75-year term, semi-annual rent on Jan 15 / Jul 15
+KENTUCKY = PaymentSchedule(start=date(2024, 10, 1), term_years=30.75, frequency="semi-annual",
+                           first_payment=date(2025, 1, 15), day_count="30/360")
+
+
+class TestSchedule:
+    """Test date grids, stubs and day counts."""
+
+    def test_stub_periods(self):
+        """Test front and back stubs pay rent for their share of a period."""
+        grid = KENTUCKY.grid()
+        assert [str(d) for d in grid.dates[:2]] == ['2025-01-15', '2025-07-15']
+        assert str(grid.dates[-1]) == '2055-07-01'
+        assert grid.accrual[0] == pytest.approx(104 / 180)  # Oct 1 -> Jan 15
+        assert grid.accrual[-1] == pytest.approx(166 / 180)  # Jan 15 -> Jul 1
+        assert (grid.accrual[1:-1] == 1.0).all()
+        assert dated_cash_flows(170000, 0.0, KENTUCKY).sum() == pytest.approx(170000 * 30.75)
+
+    def test_escalation_on_anniversaries(self):
+        """Test rent steps up once per lease year whatever the payment frequency."""
+        monthly = PaymentSchedule(start=date(2024, 1, 31), term_years=25, frequency="monthly")
+        grid = monthly.grid()
+        assert str(grid.dates[0]) == '2024-02-29'  # month-end clamped
+        assert list(grid.escalation_year[:13]) == [0] * 12 + [1]
+        flows = dated_cash_flows([95680], [0.025], monthly)[0]
+        np.testing.assert_allclose(flows.reshape(25, 12).sum(axis=1),
+                                   LeaseParams(95680, 25, 0.025).cash_flows())
+
+    def test_day_counts(self):
+        """Test the supported conventions and rejected settings."""
+        assert year_fraction('2024-01-01', '2025-01-01') == pytest.approx(366 / 365)
+        assert year_fraction('2024-01-01', '2025-01-01', 'ACT/360') == pytest.approx(366 / 360)
+        assert year_fraction('2024-01-31', '2024-03-31', '30/360') == pytest.approx(60 / 360)
+        with pytest.raises(ValueError):
+            year_fraction('2024-01-01', '2025-01-01', 'ACT/ACT')
+        with pytest.raises(ValueError):
+            PaymentSchedule(start=date(2024, 1, 1), term_years=25, frequency="weekly")
+        with pytest.raises(ValueError):
+            PaymentSchedule(start=date(2024, 1, 1), term_years=1, first_payment=date(2026, 1, 1)).grid()
+
+
+class TestPresentValue:
+    """Test dated PVs against the annual model and direct discounting."""
+
+    def test_annual_30_360_matches_lease_valuation(self):
+        """Test whole-year schedules reproduce LeaseParams.present_value."""
+        rents, escalators, terms = [95680, 230000, 52500], [0.025, 0.015, 0.0], [25, 30, 20]
+        schedules = [PaymentSchedule(start=date(2024, 3, 1), term_years=t, day_count="30/360") for t in terms]
+        expected = [LeaseParams(r, t, g).present_value(0.10) for r, g, t in zip(rents, escalators, terms)]
+        np.testing.assert_allclose(dated_present_values(rents, escalators, schedules, 0.10), expected)
+
+    def test_matches_xnpv_of_flows(self):
+        """Test grouped PVs equal discounting each lease's payments one by one."""
+        schedules = [KENTUCKY, PaymentSchedule(start=date(2024, 1, 1), term_years=20, frequency="monthly")] * 2
+        rents, escalators = np.array([170000, 50000, 90000, 12000.0]), np.array([0.02, 0.0, 0.02, 0.03])
+        pvs = dated_present_values(rents, escalators, schedules, 0.08)
+        for rent, g, schedule, pv in zip(rents, escalators, schedules, pvs):
+            flows = dated_cash_flows(rent, g, schedule)[0]
+            dates = schedule.grid().dates
+            assert pv == pytest.approx(xnpv(0.08, flows, dates, valuation_date=schedule.start,
+                                            day_count=schedule.day_count))
+
+    def test_valuation_date_drops_paid_rent(self):
+        """Test payments before the valuation date are excluded."""
+        valued_on = date(2030, 2, 1)
+        flows = dated_cash_flows(170000, 0.02, KENTUCKY)[0]
+        dates = KENTUCKY.grid().dates
+        remaining = dates >= np.datetime64(valued_on)
+        expected = xnpv(0.10, flows[remaining], dates[remaining], valuation_date=valued_on, day_count="30/360")
+        assert dated_present_values([170000], 0.02, KENTUCKY, 0.10, valued_on)[0] == pytest.approx(expected)
+
+    def test_factors_cached_per_rate_and_grid(self):
+        """Test discount factors are computed once per (schedule, rate) and read-only."""
+        first = discount_factors(KENTUCKY, 0.10)
+        assert discount_factors(KENTUCKY, 0.10) is first
+        assert discount_factors(KENTUCKY, 0.09) is not first
+        assert KENTUCKY.grid() is PaymentSchedule(date(2024, 10, 1), 30.75, 2, date(2025, 1, 15), "30/360").grid()
+        with pytest.raises(ValueError):
+            first[0] = 1.0
+
+
+class TestXirr:
+    """Test the dated IRR solver."""
+
+    def test_recovers_rate(self):
+        """Test XIRR inverts XNPV for every row."""
+        schedule = PaymentSchedule(start=date(2024, 1, 15), term_years=25, frequency="semi-annual")
+        flows = dated_cash_flows([95680, 230000], [0.025, 0.015], schedule)
+        dates = np.concatenate([[np.datetime64(schedule.start)], schedule.grid().dates])
+        rates = np.array([0.07, 0.115])
+        prices = [xnpv(r, row, dates[1:], valuation_date=schedule.start) for r, row in zip(rates, flows)]
+        cash_flows = np.column_stack([-np.array(prices), flows])
+        result = xirr(cash_flows, dates)
+        assert list(result.status) == [CONVERGED, CONVERGED]
+        np.testing.assert_allclose(result.rate, rates)
+
+    def test_no_sign_change(self):
+        """Test an all-positive series has no IRR."""
+        result = xirr([1.0, 1.0, 1.0], ['2024-01-01', '2024-07-01', '2025-01-01'])
+        assert result.status[0] == NO_IRR and np.isnan(result.rate[0])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,208 @@
+"""
+Unit tests for the SQLite deal store
+"""
+import pytest
+import os
+import sqlite3
+import stat
+import sys
+from dataclasses import replace
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from deal_store import SCHEMA, _LEASE_COLUMNS, DealStore, lease_keys, state_of
+from process_leases import LeaseResult, generate_leases_json, generate_summary_table, publish
+
+
+def lease(name, buyout, **overrides):
+    fields = dict(
+        name=name, annual_rent=95680, annual_rent_per_acre=None, term_years=25,
+        renewal_options=None, total_potential_term=None, escalator=0.025, risk_tier="medium",
+        location="Kendall County, Illinois", acres=0, developer="Lanceleaf Solar",
+        pv_value=buyout / 0.85, undiscounted_value=2 * buyout, buyout_offer=buyout,
+        multiple=0.07, discount_rate=0.10,
+        credit_data={"company_name": "Lanceleaf Solar", "risk_tier": "medium", "public_company": False},
+    )
+    fields.update(overrides)
+    return LeaseResult(**fields)
+
+
+RESULTS = [
+    lease("Lanceleaf", 1039179.21, annual_rent_per_acre=312.5, acres=306.2, renewal_options="2 × 5-yr",
+          total_potential_term=35),
+    lease("Laramie", 1991992.17, risk_tier="low", location="Laramie, Wyoming",
+          developer="Boulevard Associates LLC (NextEra)",
+          credit_data={"company_name": "NextEra Energy", "risk_tier": "low", "public_company": True}),
+    lease("Kendall Small", 420000.0, risk_tier="low"),
+    lease("Big Illinois", 750000.0, risk_tier="low", location="Illinois", developer="Acme Wind"),
+    lease("Unknown Site", 213218.44, risk_tier="high", location="Unknown", developer="Unknown", credit_data={}),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with DealStore(tmp_path / "deals.sqlite3") as store:
+        yield store
+
+
+class TestRecordRun:
+    """Test runs round-trip and upsert by lease key."""
+
+    def test_round_trip_renders_identical_reports(self, store, tmp_path):
+        """Test reports rendered from the store match reports from the run."""
+        store.record_run(RESULTS, 0.10)
+        generate_leases_json(RESULTS, tmp_path / "direct.json")
+        generate_leases_json(store.book(), tmp_path / "stored.json")
+        generate_summary_table(RESULTS, tmp_path / "direct.md")
+        generate_summary_table(store.book(), tmp_path / "stored.md")
+        assert (tmp_path / "stored.json").read_text() == (tmp_path / "direct.json").read_text()
+        assert (tmp_path / "stored.md").read_text() == (tmp_path / "direct.md").read_text()
+
+    def test_rerun_upserts_and_prunes(self, store):
+        """Test a later run replaces changed leases and drops missing ones."""
+        store.record_run(RESULTS, 0.10)
+        updated = [replace(RESULTS[0], buyout_offer=1100000.0)] + RESULTS[1:3]
+        run_id = store.record_run(updated, 0.10)
+        leases = store.query()
+        assert [l.name for l in leases] == ["Lanceleaf", "Laramie", "Kendall Small"]
+        assert leases[0].buyout_offer == 1100000.0
+        assert [r["run_id"] for r in store.runs()] == [run_id, run_id - 1]
+        assert [h["buyout_offer"] for h in store.history("Lanceleaf")] == [1039179.21, 1100000.0]
+        # Assessments no lease refers to any more are dropped
+        count = store.db.execute("SELECT COUNT(*) FROM credit_assessments").fetchone()[0]
+        assert count == 2
+
+    def test_duplicate_names_kept_in_order(self, store):
+        """Test two documents extracting to the same name stay two leases."""
+        twins = [RESULTS[0], replace(RESULTS[1], name="Lanceleaf"), RESULTS[2]]
+        assert lease_keys(lease.name for lease in twins) == ["Lanceleaf", "Lanceleaf#2", "Kendall Small"]
+        store.record_run(twins, 0.10)
+        store.record_run(twins, 0.10)
+        assert [(l.name, l.buyout_offer) for l in store.query()] == [(l.name, l.buyout_offer) for l in twins]
+        assert [h["buyout_offer"] for h in store.history("Lanceleaf#2")] == [1991992.17] * 2
+
+    def test_version_1_store_migrated(self, store, tmp_path):
+        """Test a store keyed on name is re-keyed without losing history."""
+        store.record_run(RESULTS, 0.10)
+        v1_schema = (SCHEMA.replace("lease_key TEXT PRIMARY KEY,\n    name TEXT NOT NULL,", "name TEXT PRIMARY KEY,")
+                     .replace("    lease_key TEXT NOT NULL,\n", "")
+                     .replace("(run_id, lease_key)", "(run_id, name)")
+                     .replace("valuations (lease_key)", "valuations (name)"))
+        v1 = sqlite3.connect(tmp_path / "v1.sqlite3")
+        v1.executescript(v1_schema)
+        v1.execute("ATTACH ? AS current", (str(store.path),))
+        with v1:
+            for table in ("runs", "credit_assessments"):
+                v1.execute(f"INSERT INTO {table} SELECT * FROM current.{table}")
+            v1.execute("INSERT INTO leases SELECT " + ", ".join(_LEASE_COLUMNS[1:]) + " FROM current.leases")
+            v1.execute("INSERT INTO valuations SELECT run_id, name, discount_rate, pv_value, buyout_offer "
+                       "FROM current.valuations")
+        v1.close()
+
+        with DealStore(tmp_path / "v1.sqlite3") as migrated:
+            assert [l.name for l in migrated.query()] == [l.name for l in RESULTS]
+            migrated.record_run(RESULTS[:1], 0.10)
+            assert [l.name for l in migrated.query()] == ["Lanceleaf"]
+            assert len(migrated.history("Lanceleaf")) == 2
+
+    def test_version_2_store_accepts_missing_irr(self, store, tmp_path):
+        """Test a store that required an IRR is rebuilt to take leases without one."""
+        store.record_run(RESULTS, 0.10)
+        v2 = sqlite3.connect(tmp_path / "v2.sqlite3")
+        v2.executescript(SCHEMA.replace("multiple REAL,", "multiple REAL NOT NULL,"))
+        v2.execute("ATTACH ? AS current", (str(store.path),))
+        with v2:
+            for table in ("runs", "credit_assessments", "leases", "valuations"):
+                v2.execute(f"INSERT INTO {table} SELECT * FROM current.{table}")
+        v2.execute("PRAGMA user_version = 2")
+        v2.close()
+
+        with DealStore(tmp_path / "v2.sqlite3") as migrated:
+            assert [l.name for l in migrated.query()] == [l.name for l in RESULTS]
+            migrated.record_run([replace(RESULTS[0], multiple=None)] + RESULTS[1:], 0.10)
+            assert [l.multiple for l in migrated.query()] == [None] + [0.07] * 4
+            assert len(migrated.history("Lanceleaf")) == 2
+
+    def test_shared_credit_stored_once(self, store):
+        """Test leases with the same assessment share one credit row."""
+        store.record_run(RESULTS, 0.10)
+        count = store.db.execute("SELECT COUNT(*) FROM credit_assessments").fetchone()[0]
+        assert count == 2
+        assert store.query()[4].credit_data == {}
+
+
+class TestQuery:
+    """Test filters, ordering and index use."""
+
+    def test_low_risk_illinois_over_500k(self, store):
+        """Test the combined state / tier / amount filter."""
+        store.record_run(RESULTS, 0.10)
+        leases = store.query(risk_tier="LOW", state="illinois", min_buyout=500000)
+        assert [l.name for l in leases] == ["Big Illinois"]
+
+    def test_location_substring_and_order(self, store):
+        """Test location substring matching and buyout ordering."""
+        store.record_run(RESULTS, 0.10)
+        leases = store.query(location="kendall", order_by="buyout_offer", descending=True)
+        assert [l.name for l in leases] == ["Lanceleaf", "Kendall Small"]
+        assert [l.name for l in store.query(developer="acme wind", limit=1)] == ["Big Illinois"]
+        with pytest.raises(ValueError):
+            store.query(order_by="name; DROP TABLE leases")
+
+    def test_filters_use_indexes(self, store):
+        """Test the tier + amount filter is an index search, not a scan."""
+        plan = store.db.execute(
+            "EXPLAIN QUERY PLAN SELECT name FROM leases WHERE risk_tier = ? AND buyout_offer >= ?",
+            ("low", 500000),
+        ).fetchall()
+        assert "USING INDEX leases_risk_tier" in plan[0][3]
+
+    def test_state_of(self):
+        """Test the state is the last part of a location."""
+        assert state_of("Kendall County, Illinois") == "Illinois"
+        assert state_of("North Dakota") == "North Dakota"
+        assert state_of("Unknown") is None
+
+
+class TestConcurrency:
+    """Test WAL readers alongside the writer."""
+
+    def test_reader_sees_last_commit_during_write(self, store):
+        """Test an open write transaction does not block a reader."""
+        store.record_run(RESULTS[:2], 0.10)
+        assert store.db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        with DealStore(store.path, readonly=True) as reader:
+            store.db.execute("BEGIN IMMEDIATE")
+            store.db.execute("DELETE FROM leases")
+            assert len(reader.query()) == 2
+            store.db.rollback()
+
+    def test_readonly_store_rejects_writes(self, store):
+        """Test read-only connections cannot modify the store."""
+        store.record_run(RESULTS, 0.10)
+        with DealStore(store.path, readonly=True) as reader:
+            with pytest.raises(sqlite3.OperationalError):
+                reader.record_run(RESULTS, 0.10)
+
+
+class TestPublish:
+    """Test the pipeline renders its reports from the store."""
+
+    def test_publish_records_and_renders(self, store, tmp_path):
+        """Test publish writes a run and reports reflecting the store."""
+        paths = publish(RESULTS, 0.10, tmp_path / "out", store)
+        assert [p.name for p in paths] == ["lease_summary.md", "executive_report.md", "leases.json"]
+        assert all(p.exists() for p in paths)
+        assert store.runs()[0]["leases"] == len(RESULTS)
+
+    def test_reports_are_not_private(self, store, tmp_path):
+        """Test reports get the normal new-file mode, not mkstemp's 0600."""
+        paths = publish(RESULTS, 0.10, tmp_path / "out", store)
+        umask = os.umask(0)
+        os.umask(umask)
+        assert {stat.S_IMODE(p.stat().st_mode) for p in paths} == {0o666 & ~umask}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -10,7 +10,18 @@ from pathlib import Path
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from document_extractor import extract_lease_data_from_text, process_document
+import subprocess
+import time
+from unittest.mock import patch
+
+from document_extractor import (
+    SPAN,
+    LeaseFieldMatcher,
+    extract_lease_data_from_text,
+    extract_text_from_pdf,
+    iter_pdf_pages,
+    process_document,
+)
 
 
 class TestTextExtraction:
@@ -201,5 +212,137 @@ class TestIntegrationPatterns:
         assert "wyoming" in result["location"].lower()
 
 
+class TestPatternPerformance:
+    """Test the compiled patterns stay linear on long documents."""
+
+    def test_adversarial_text_is_linear(self):
+        """Test keyword soup with no values finishes quickly."""
+        unit = "rent term payment lessee $100 acres escalation increase county state located expires lease "
+        text = unit * 2000  # ~180 KB; unbounded lazy spans took hours here
+        start = time.perf_counter()
+        result = extract_lease_data_from_text(text, "adversarial")
+        assert time.perf_counter() - start < 10
+        assert result["annual_rent"] is None
+
+    def test_span_bounds_cross_sentence_matches(self):
+        """Test a dollar amount far past the rent keyword is not attributed to it."""
+        filler = "the parties agree to the covenants herein. " * (SPAN // 20)
+        text = f"annual rent is described in exhibit b. {filler} a fee of $5,000 applies."
+        assert extract_lease_data_from_text(text, "test")["annual_rent"] is None
+
+        near = "annual rent is $5,000."
+        assert extract_lease_data_from_text(near, "test")["annual_rent"] == 5000
+
+    def test_long_lease_still_extracts(self):
+        """Test key terms at the start of a 1 MB lease are found."""
+        header = (
+            "This lease is for a term of 25 years. The annual rent shall be $95,680. "
+            "Rent shall escalate at 2.5% annually. "
+        )
+        text = header + "Notices shall be delivered to the addresses set forth herein. " * 16000
+        result = extract_lease_data_from_text(text, "long")
+        assert result["annual_rent"] == 95680
+        assert result["term_years"] == 25
+        assert abs(result["escalator"] - 0.025) < 0.001
+
+
+class TestStreamingPDFExtraction:
+    """Test page streaming, the incremental matcher and early termination."""
+
+    PAGES = [
+        "SOLAR GROUND LEASE AGREEMENT between the parties.",
+        "The annual rent shall be $95,680 payable semi-annually. This lease is for a term of",
+        "25 years. Rent shall escalate at 2.5% annually.",
+        "EXHIBIT A - legal description",
+        "EXHIBIT B - survey",
+    ]
+
+    def test_matcher_sees_clause_split_across_pages(self):
+        """Test the matcher carries context over a page break."""
+        matcher = LeaseFieldMatcher()
+        for page in self.PAGES[:2]:
+            matcher.feed(page)
+        assert matcher.found == {"annual_rent"}
+        matcher.feed(self.PAGES[2])
+        assert matcher.complete
+
+    def test_early_termination(self):
+        """Test pages after the key terms are never read."""
+        consumed = []
+
+        def fake_pages(file_path, first_page=1, last_page=None):
+            for page in self.PAGES:
+                consumed.append(page)
+                yield page
+
+        with patch('document_extractor.iter_pdf_pages', side_effect=fake_pages):
+            text = extract_text_from_pdf(Path("lease.pdf"), stop_when_complete=True)
+        assert len(consumed) == 3
+        result = extract_lease_data_from_text(text, "lease")
+        assert result["annual_rent"] == 95680
+        assert result["term_years"] == 25
+        assert abs(result["escalator"] - 0.025) < 0.001
+
+    def test_reads_everything_without_early_stop(self):
+        """Test the default still returns every page."""
+        with patch('document_extractor.iter_pdf_pages', return_value=iter(self.PAGES)):
+            text = extract_text_from_pdf(Path("lease.pdf"))
+        assert text == "\n".join(self.PAGES)
+
+    def test_process_document_reads_every_page_by_default(self):
+        """Test fields past the first complete rent/term/escalator set are kept unless early stop is asked for."""
+        pages = self.PAGES[:3] + [
+            "Lessee may extend this lease for 2 renewal terms of 5 years each.",
+            "The premises comprise 306.2 acres in Kendall County, Illinois. Lessee: Lanceleaf Solar LLC",
+        ]
+        consumed = []
+
+        def fake_pages(file_path, first_page=1, last_page=None):
+            for page in pages:
+                consumed.append(page)
+                yield page
+
+        with patch('document_extractor.iter_pdf_pages', side_effect=fake_pages):
+            full = process_document(Path("lease.pdf"))
+        assert len(consumed) == len(pages)
+        assert full == extract_lease_data_from_text("\n".join(pages), "lease")
+        assert full["term_years"] == 35
+        assert full["acres"] == 306.2
+        assert full["location"] == "Kendall County, Illinois"
+
+        consumed.clear()
+        with patch('document_extractor.iter_pdf_pages', side_effect=fake_pages):
+            early = process_document(Path("lease.pdf"), stop_when_complete=True)
+        assert len(consumed) == 3
+        assert early["annual_rent"] == full["annual_rent"]
+        assert early["term_years"] == 25
+        assert early["acres"] is None and early["developer"] is None
+
+    def test_pdftotext_streams_page_ranges(self):
+        """Test the pdftotext fallback walks -f/-l ranges until the end."""
+        total_pages = 11
+        calls = []
+
+        def fake_run(cmd, **kwargs):
+            first, last = int(cmd[cmd.index('-f') + 1]), int(cmd[cmd.index('-l') + 1])
+            calls.append((first, last))
+            if first > total_pages:
+                raise subprocess.CalledProcessError(99, cmd)
+            pages = range(first, min(last, total_pages) + 1)
+            return subprocess.CompletedProcess(cmd, 0, stdout="".join(f"page {p}\f" for p in pages))
+
+        with patch.dict(sys.modules, {'pdfplumber': None}), \
+                patch('document_extractor.subprocess.run', side_effect=fake_run):
+            pages = list(iter_pdf_pages(Path("lease.pdf")))
+        assert pages == [f"page {p}" for p in range(1, 12)]
+        assert calls == [(1, 8), (9, 16)]
+
+    def test_pdftotext_missing(self):
+        """Test a missing pdftotext binary degrades to empty text."""
+        with patch.dict(sys.modules, {'pdfplumber': None}), \
+                patch('document_extractor.subprocess.run', side_effect=FileNotFoundError):
+            assert extract_text_from_pdf(Path("lease.pdf")) == ""
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
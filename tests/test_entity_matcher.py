@@ -0,0 +1,154 @@
+"""
+Unit tests for the counterparty entity matcher
+"""
+import pytest
+import json
+import os
+import sys
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import credit_lookup
+from credit_lookup import KNOWN_ENTITIES, quick_lookup
+from entity_matcher import EntityMatcher, load_registry, normalize_name
+
+ENTITIES = {
+    "nextera": {"risk_tier": "low"},
+    "nextera energy resources": {"risk_tier": "low"},
+    "carolina solar": {"risk_tier": "medium"},
+    "solar": {"risk_tier": "high"},
+    "lanceleaf": {"risk_tier": "medium"},
+}
+ALIASES = {"nextera": ["Boulevard Associates", "Florida Power & Light"]}
+
+
+@pytest.fixture
+def matcher():
+    return EntityMatcher(ENTITIES, ALIASES)
+
+
+class TestExactMatching:
+    """Test Aho-Corasick matching semantics."""
+
+    def test_longest_match_wins(self, matcher):
+        """Test the longest name beats shorter names it contains."""
+        assert matcher.match("NextEra Energy Resources LLC").name == "nextera energy resources"
+        assert matcher.match("North Carolina Solar Energy III, LLC").name == "carolina solar"
+
+    def test_ties_break_by_position(self):
+        """Test equal-length matches resolve to the earliest one."""
+        matcher = EntityMatcher({"alpha": {}, "bravo": {}})
+        assert matcher.match("Alpha / Bravo JV").name == "alpha"
+        assert matcher.match("Bravo / Alpha JV").name == "bravo"
+
+    def test_load_order_does_not_matter(self):
+        """Test reversing the registry gives identical answers."""
+        forward = EntityMatcher(ENTITIES, ALIASES)
+        backward = EntityMatcher(dict(reversed(list(ENTITIES.items()))), ALIASES)
+        for text in ["Carolina Solar / Solar Co", "Solar Lanceleaf", "NextEra Energy Resources"]:
+            assert forward.match(text) == backward.match(text)
+
+    def test_aliases_map_to_parent(self, matcher):
+        """Test subsidiaries resolve to their canonical entity."""
+        result = matcher.match("Boulevard Associates LLC (formerly FPL)")
+        assert result.name == "nextera"
+        assert result.matched == "boulevard associates"
+        assert matcher.match("FLORIDA POWER & LIGHT CO").name == "nextera"
+
+    def test_normalize_name(self):
+        """Test punctuation and case are folded away."""
+        assert normalize_name("  Boulevard  Associates, LLC (NextEra) ") == "boulevard associates llc nextera"
+
+    def test_word_boundaries(self, matcher):
+        """Test names only match whole words."""
+        assert matcher.match("Solarize Partners") is None
+        assert matcher.match("Sunrun") is None
+
+    def test_matches_automaton_against_naive_scan(self):
+        """Test find_all agrees with a brute-force scan on overlapping names."""
+        names = {n: {} for n in ["a b", "b", "a b c", "b c d", "c", "abc"]}
+        matcher = EntityMatcher(names)
+        text = "a b c d abc b"
+        expected = set()
+        padded = f" {text} "
+        for name in names:
+            start = padded.find(f" {name} ")
+            while start != -1:
+                expected.add((start, start + len(name), name))
+                start = padded.find(f" {name} ", start + 1)
+        assert set(matcher.find_all(text)) == expected
+
+
+class TestFuzzyMatching:
+    """Test the trigram stage."""
+
+    def test_misspelling(self, matcher):
+        """Test an OCR-style typo still finds the entity."""
+        assert matcher.match("Lanceleef Development") is None
+        result = matcher.fuzzy_match("Lanceleef Development")
+        assert result.name == "lanceleaf"
+        assert result.fuzzy
+
+    def test_threshold(self, matcher):
+        """Test unrelated names stay unmatched."""
+        assert matcher.fuzzy_match("Acme Wind Holdings") is None
+        assert matcher.lookup("Lanceleef Development", fuzzy=False) is None
+
+
+class TestRegistry:
+    """Test loading JSON and CSV registries."""
+
+    def test_csv(self, tmp_path):
+        """Test CSV rows are typed and aliases split on semicolons."""
+        path = tmp_path / "registry.csv"
+        path.write_text(
+            "name,public_company,years_since_incorp,state_of_incorp,risk_tier,aliases\n"
+            "Invenergy,no,20,DE,medium,Invenergy Solar Development; Grand Ridge Solar\n"
+        )
+        entities, aliases = load_registry(path)
+        assert entities == {"invenergy": {"public_company": False, "years_since_incorp": 20,
+                                          "state_of_incorp": "DE", "risk_tier": "medium"}}
+        assert EntityMatcher(entities, aliases).match("Grand Ridge Solar LLC").name == "invenergy"
+
+    def test_json_list(self, tmp_path):
+        """Test a JSON list of records with aliases."""
+        path = tmp_path / "registry.json"
+        path.write_text(json.dumps([{"name": "Pine Gate", "risk_tier": "medium", "aliases": ["PGR"]}]))
+        entities, aliases = load_registry(path)
+        assert entities == {"pine gate": {"risk_tier": "medium"}}
+        assert aliases == {"pine gate": ["PGR"]}
+
+    def test_unsupported_format(self, tmp_path):
+        """Test other extensions are rejected."""
+        with pytest.raises(ValueError):
+            load_registry(tmp_path / "registry.xlsx")
+
+
+class TestQuickLookupIntegration:
+    """Test quick_lookup through the matcher."""
+
+    def test_registry_drives_quick_lookup(self, tmp_path):
+        """Test a loaded subsidiary resolves without any SEC request."""
+        path = tmp_path / "registry.json"
+        path.write_text(json.dumps({"acme renewables": {
+            "public_company": False, "years_since_incorp": 7, "state_of_incorp": "TX",
+            "aliases": ["Prairie Sun Project Co"]}}))
+        with patch.dict(KNOWN_ENTITIES), patch.dict(credit_lookup.KNOWN_ENTITY_ALIASES), \
+                patch.object(credit_lookup, '_known_matcher', None):
+            credit_lookup.load_entity_registry(path)
+            result = quick_lookup("Prairie Sun Project Co LLC")
+        assert result["state_of_incorp"] == "TX"
+        assert result["risk_tier"] == "medium"  # derived from years_since_incorp
+        assert result["data_sources"] == ["Known Entities DB"]
+
+    def test_fuzzy_quick_lookup(self):
+        """Test fuzzy lookups are labelled as such."""
+        result = quick_lookup("Lanceleef Solar LLC", fuzzy=True)
+        assert result["state_of_incorp"] == "IL"
+        assert result["data_sources"] == ["Known Entities DB (fuzzy)"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
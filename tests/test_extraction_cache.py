@@ -0,0 +1,136 @@
+"""
+Unit tests for the content-addressed extraction cache
+"""
+import pytest
+import os
+import stat
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import document_extractor
+from document_extractor import process_document
+from extraction_cache import ExtractionCache, file_digest, replace_file
+
+LEASE_TEXT = """
+This lease is for a term of 25 years.
+The annual rent shall be $95,680 payable semi-annually.
+Rent shall escalate at 2.5% annually.
+"""
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "lanceleaf_lease.pdf"
+    path.write_bytes(b"%PDF-1.4 fake lease bytes")
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(tmp_path / "cache")
+
+
+class TestExtractionCache:
+    """Test storage, hit/miss accounting and eviction."""
+
+    def test_roundtrip(self, cache):
+        """Test text and lease entries come back unchanged."""
+        cache.put_text("ab" * 32, "1", "hello")
+        cache.put_lease("ab" * 32, "1", {"annual_rent": 1000})
+        assert cache.get_text("ab" * 32, "1") == "hello"
+        assert cache.get_lease("ab" * 32, "1") == {"annual_rent": 1000}
+        assert cache.get_text("ab" * 32, "2") is None
+        assert cache.stats() == {"hits": 2, "misses": 1}
+
+    def test_lru_eviction(self, tmp_path):
+        """Test the least recently used entry goes first when over budget."""
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=250)
+        for i, digest in enumerate(["aa" * 32, "bb" * 32]):
+            cache.put_text(digest, "1", "x" * 100)
+            path = cache._path("text", digest, "1", ".txt")
+            os.utime(path, (1000 + i, 1000 + i))
+        cache.get_text("aa" * 32, "1")  # touch: bb is now least recent
+        cache.put_text("cc" * 32, "1", "x" * 100)
+        assert cache.get_text("bb" * 32, "1") is None
+        assert cache.get_text("aa" * 32, "1") is not None
+        assert cache.get_text("cc" * 32, "1") is not None
+        assert cache.size_bytes() <= 250
+
+    def test_overwrite_counts_bytes_once(self, tmp_path):
+        """Test rewriting an entry replaces its size instead of adding to it."""
+        cache = ExtractionCache(tmp_path / "cache", max_bytes=250)
+        cache.put_text("aa" * 32, "1", "x" * 100)
+        with patch.object(cache, 'evict') as evict:
+            for _ in range(3):
+                cache.put_text("bb" * 32, "1", "x" * 100)
+        evict.assert_not_called()
+        assert cache._total_bytes == cache.size_bytes() == 200
+
+    @patch('extraction_cache._UMASK', 0o022)
+    def test_replace_file_mode(self, tmp_path):
+        """Test replaced files get the umask mode, or keep the one they had."""
+        target = tmp_path / "report.md"
+        for expected in (0o644, 0o640):
+            tmp = tmp_path / ".report.md.tmp"
+            tmp.write_text("x")
+            os.chmod(tmp, 0o600)  # as mkstemp creates it
+            replace_file(str(tmp), target)
+            assert stat.S_IMODE(target.stat().st_mode) == expected
+            os.chmod(target, 0o640)
+
+    def test_clear(self, cache):
+        """Test clear drops everything."""
+        cache.put_text("ab" * 32, "1", "hello")
+        cache.clear()
+        assert cache.get_text("ab" * 32, "1") is None
+        assert cache.size_bytes() == 0
+
+
+class TestCachedProcessDocument:
+    """Test process_document with a cache."""
+
+    def test_warm_run_skips_pdf_parsing(self, pdf_file, cache):
+        """Test the second run neither parses the PDF nor reruns the regexes."""
+        with patch('document_extractor.extract_text_from_pdf', return_value=LEASE_TEXT) as mock_pdf:
+            first = process_document(pdf_file, cache)
+            with patch('document_extractor.extract_lease_data_from_text') as mock_regex:
+                second = process_document(pdf_file, cache)
+        assert mock_pdf.call_count == 1
+        mock_regex.assert_not_called()
+        assert second == first
+        assert first["annual_rent"] == 95680
+
+    def test_extractor_version_bump_reuses_text(self, pdf_file, cache):
+        """Test a new EXTRACTOR_VERSION re-runs regexes on cached text only."""
+        with patch('document_extractor.extract_text_from_pdf', return_value=LEASE_TEXT) as mock_pdf:
+            process_document(pdf_file, cache)
+            with patch.object(document_extractor, 'EXTRACTOR_VERSION', 'next'):
+                result = process_document(pdf_file, cache)
+        assert mock_pdf.call_count == 1
+        assert result["term_years"] == 25
+
+    def test_renamed_copy_hits_with_new_name(self, pdf_file, cache, tmp_path):
+        """Test identical contents under a new name reuse the entry."""
+        copy = tmp_path / "other_site.pdf"
+        copy.write_bytes(pdf_file.read_bytes())
+        assert file_digest(copy) == file_digest(pdf_file)
+        with patch('document_extractor.extract_text_from_pdf', return_value=LEASE_TEXT) as mock_pdf:
+            process_document(pdf_file, cache)
+            result = process_document(copy, cache)
+        assert mock_pdf.call_count == 1
+        assert result["name"] == "Other Site"
+
+    def test_empty_text_not_cached(self, pdf_file, cache):
+        """Test failed extractions are retried on the next run."""
+        with patch('document_extractor.extract_text_from_pdf', return_value="") as mock_pdf:
+            assert process_document(pdf_file, cache) is None
+            assert process_document(pdf_file, cache) is None
+        assert mock_pdf.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
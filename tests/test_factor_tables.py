@@ -0,0 +1,119 @@
+"""
+Unit tests for the cached discount, growth and annuity factor tables
+"""
+import pytest
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from factor_tables import (MAX_TERM, TABLE_CACHE_SIZE, cache_stats, clear_caches,
+                           factor_table, growing_annuity_factors)
+from lease_valuation import LeaseParams, PortfolioValuer, present_value, pv_buyout, pv_buyout_batch
+
+
+class TestTables:
+    """Test the table contents and the cache around them."""
+
+    def test_factors_match_direct_powers(self):
+        """Test discount, growth and annuity factors against explicit powers."""
+        table = factor_table(0.10)
+        years = np.arange(MAX_TERM + 1)
+        np.testing.assert_allclose(table.discount, 1.10 ** -years, rtol=1e-14)
+        np.testing.assert_allclose(table.growth, 1.10 ** years, rtol=1e-14)
+        assert table.annuity[0] == 0
+        assert table.annuity[25] == pytest.approx(sum(1.10 ** -k for k in range(1, 26)), rel=1e-14)
+
+    @pytest.mark.parametrize("rate,escalator", [(0.10, 0.025), (0.08, 0.08), (0.0, 0.02)])
+    def test_growing_annuity_matches_sum(self, rate, escalator):
+        """Test each cumulative factor equals the explicit discounted sum."""
+        factors = growing_annuity_factors(rate, escalator)
+        for term in (1, 23, MAX_TERM):
+            expected = sum((1 + escalator) ** (k - 1) / (1 + rate) ** k for k in range(1, term + 1))
+            assert factors[term] == pytest.approx(expected, rel=1e-13)
+
+    def test_tables_are_shared_and_read_only(self):
+        """Test repeat lookups hit the cache and nobody can scribble on a table."""
+        clear_caches()
+        first = growing_annuity_factors(0.10, 0.02)
+        assert growing_annuity_factors(np.float64(0.10), 0.02) is first
+        assert cache_stats()["hits"] >= 1
+        with pytest.raises(ValueError):
+            first[3] = 0.0
+        with pytest.raises(ValueError):
+            factor_table(0.10).discount[0] = 2.0
+
+    def test_cache_is_bounded(self):
+        """Test a long sweep of rates evicts old tables instead of growing."""
+        clear_caches()
+        for rate in np.linspace(0.0, 0.2, 3 * TABLE_CACHE_SIZE):
+            growing_annuity_factors(rate, 0.025)
+        assert cache_stats()["entries"] <= 2 * TABLE_CACHE_SIZE
+
+    def test_term_cap(self):
+        """Test tables refuse terms past MAX_TERM."""
+        with pytest.raises(ValueError):
+            factor_table(0.10, MAX_TERM + 1)
+
+    def test_concurrent_lookups(self):
+        """Test threads racing on a cold cache all see the same factors."""
+        clear_caches()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: growing_annuity_factors(0.09, 0.015)[30], range(64)))
+        assert len(set(results)) == 1
+
+
+class TestValuationPaths:
+    """Test the valuation paths that read the tables."""
+
+    def test_long_terms_use_closed_form(self):
+        """Test terms beyond MAX_TERM still agree with the cash-flow array."""
+        params = LeaseParams(annual_rent=50000, term_years=MAX_TERM + 10, escalator=0.02, balloon_cost=1000)
+        assert params.present_value(0.10) == pytest.approx(present_value(params.cash_flows(), 0.10), rel=1e-12)
+        offers = pv_buyout_batch(annual_rent=[50000, 50000], term_years=[MAX_TERM, MAX_TERM + 10], escalator=0.02)
+        assert offers[1] == pv_buyout(annual_rent=50000, term_years=MAX_TERM + 10, escalator=0.02)
+
+    @pytest.mark.parametrize("term", [23.5, MAX_TERM + 0.5])
+    def test_part_year_paid_in_full(self, term):
+        """Test every path prices a part final year as a full year of rent."""
+        params = LeaseParams(annual_rent=95680, term_years=term, escalator=0.025, balloon_cost=1000)
+        assert params.present_value(0.10) == pytest.approx(present_value(params.cash_flows(), 0.10), rel=1e-12)
+        offer = pv_buyout(annual_rent=95680, term_years=term, escalator=0.025)
+        assert offer == pv_buyout(annual_rent=95680, term_years=int(term) + 1, escalator=0.025)
+        assert pv_buyout_batch(annual_rent=[95680], term_years=[term], escalator=0.025).tolist() == [offer]
+        if term == 23.5:
+            assert offer == 833174.31  # the original per-year loop
+
+    def test_cash_flows_are_writable(self):
+        """Test cash flows built from a shared growth table are private copies."""
+        params = LeaseParams(annual_rent=1000, term_years=3, escalator=0.02, balloon_cost=100)
+        np.testing.assert_allclose(params.cash_flows(), [1000, 1020, 1040.4 - 100])
+        assert factor_table(0.02).growth[2] == pytest.approx(1.0404)
+
+    def test_many_escalators_match_scalar(self):
+        """Test books with more (rate, escalator) pairs than the cache holds match pv_buyout."""
+        rng = np.random.default_rng(5)
+        escalators = rng.uniform(0.0, 0.04, 500)
+        terms = rng.integers(1, 45, 500)
+        valuer = PortfolioValuer(annual_rent=np.full(500, 80000.0), term_years=terms,
+                                 escalator=escalators, balloon_cost=0.0)
+        expected = [pv_buyout(annual_rent=80000.0, term_years=int(t), escalator=g) for t, g in zip(terms, escalators)]
+        np.testing.assert_allclose(valuer.buyout_offers(), expected, atol=0.01)
+
+    def test_valuer_reprices_from_tables(self):
+        """Test repricing a book at new rates matches per-lease offers exactly."""
+        valuer = PortfolioValuer(annual_rent=[95680.0, 230000.0, 50000.0], term_years=[23, 25, 25],
+                                 escalator=[0.025, 0.015, 0.02], balloon_cost=[0.0, 40000.0, 0.0])
+        for rate in (0.08, 0.10):
+            expected = [pv_buyout(annual_rent=r, term_years=t, escalator=g, discount_rate=rate, balloon_cost=b)
+                        for r, t, g, b in zip([95680.0, 230000.0, 50000.0], [23, 25, 25],
+                                              [0.025, 0.015, 0.02], [0.0, 40000.0, 0.0])]
+            assert valuer.buyout_offers(rate).tolist() == expected
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,151 @@
+"""
+Unit tests for pipeline instrumentation
+"""
+import pytest
+import json
+import sys
+import os
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import instrumentation
+from process_leases import process_documents
+
+
+@pytest.fixture
+def enabled():
+    instrumentation.enable()
+    yield instrumentation.REGISTRY
+    instrumentation.disable()
+    instrumentation.REGISTRY.reset()
+
+
+@pytest.fixture
+def lease_folder(tmp_path):
+    leases = [
+        {"name": "Alpha", "annual_rent": 95680, "term_years": 25, "escalator": 0.025, "developer": "Alpha Solar"},
+        {"name": "Bravo", "annual_rent": 230000, "term_years": 25, "escalator": 0.015},
+        {"name": "Charlie", "annual_rent": 52500, "term_years": 30, "escalator": 0.025},
+        {"name": "NoTerm", "annual_rent": 50000, "term_years": None},
+        {"name": "Broken", "annual_rent": "lots", "term_years": 25, "escalator": 0.0},
+    ]
+    paths = []
+    for i, lease in enumerate(leases):
+        path = tmp_path / f"{i:02d}.json"
+        path.write_text(json.dumps(lease))
+        paths.append(path)
+    return paths
+
+
+class TestRecording:
+    """Test stages, counters and histograms."""
+
+    def test_disabled_is_a_no_op(self):
+        """Test nothing is recorded and stage() returns the shared no-op."""
+        assert not instrumentation.is_enabled()
+        assert instrumentation.stage('a') is instrumentation.stage('b')
+        with instrumentation.stage('a'):
+            instrumentation.count('hits')
+            instrumentation.observe('pages', 3)
+        assert instrumentation.REGISTRY.snapshot() == {'stages': {}, 'counters': {}, 'histograms': {}}
+        assert instrumentation.take() is None
+
+    def test_enabled_records(self, enabled):
+        """Test timings, counts and bucketed values are kept."""
+        for _ in range(3):
+            with instrumentation.stage('irr'):
+                pass
+        instrumentation.count('hits', 2)
+        instrumentation.count('hits')
+        for pages in (1, 2, 7):
+            instrumentation.observe('pages', pages, bounds=(1, 5))
+        snapshot = enabled.snapshot()
+        assert snapshot['stages']['irr']['count'] == 3
+        assert snapshot['counters'] == {'hits': 3}
+        assert snapshot['histograms']['pages']['buckets'] == [1, 1, 1]
+        assert snapshot['histograms']['pages']['max'] == 7
+
+    def test_stage_timed_when_block_raises(self, enabled):
+        """Test a failing stage is still timed and the error propagates."""
+        with pytest.raises(ValueError):
+            with instrumentation.stage('extraction'):
+                raise ValueError("bad pdf")
+        assert enabled.snapshot()['stages']['extraction']['count'] == 1
+
+    def test_take_and_merge(self, enabled):
+        """Test worker snapshots fold into the parent registry."""
+        with instrumentation.stage('document'):
+            instrumentation.count('hits')
+        worker = instrumentation.take()
+        assert enabled.snapshot()['counters'] == {}
+        instrumentation.merge(worker)
+        instrumentation.merge(worker)
+        snapshot = enabled.snapshot()
+        assert snapshot['stages']['document']['count'] == 2
+        assert snapshot['counters'] == {'hits': 2}
+
+
+class TestExport:
+    """Test the JSON report, Prometheus text and profiler output."""
+
+    def test_report_and_prometheus(self, enabled, tmp_path):
+        """Test both exports carry the same stages and counters."""
+        with instrumentation.stage('credit_lookup'):
+            instrumentation.count('credit_lookup_failures')
+        path = instrumentation.write_report(tmp_path / 'run_report.json', documents=4)
+        report = json.loads(path.read_text())
+        assert report['documents'] == 4
+        assert report['stages']['credit_lookup']['count'] == 1
+        text = instrumentation.write_prometheus(tmp_path / 'spiceflow.prom').read_text()
+        assert '# TYPE spiceflow_stage_seconds histogram' in text
+        assert 'spiceflow_stage_seconds_bucket{stage="credit_lookup",le="+Inf"} 1' in text
+        assert 'spiceflow_stage_seconds_count{stage="credit_lookup"} 1' in text
+        assert 'spiceflow_credit_lookup_failures_total 1' in text
+
+    def test_profiled_writes_stats_and_folded_stacks(self, tmp_path):
+        """Test the profiler writes cProfile stats and folded stacks."""
+        import pstats
+
+        def busy():
+            total = 0
+            for i in range(3_000_000):
+                total += i
+            return total
+
+        with instrumentation.profiled(tmp_path / 'profile', interval=0.001) as (prof_path, folded_path):
+            busy()
+        assert 'busy' in str(pstats.Stats(str(prof_path)).stats)
+        lines = folded_path.read_text().splitlines()
+        assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert any('test_instrumentation:busy' in line for line in lines)
+
+
+@patch('process_leases.quick_lookup', side_effect=lambda name: {"company_name": name, "risk_tier": "low"})
+class TestPipeline:
+    """Test the pipeline reports its stages."""
+
+    def test_sequential_stages(self, mock_lookup, enabled, lease_folder):
+        """Test per-document stages and outcome counters."""
+        process_documents(lease_folder)
+        snapshot = enabled.snapshot()
+        assert snapshot['stages']['document']['count'] == 5
+        assert snapshot['stages']['pv_buyout']['count'] == 3
+        assert snapshot['stages']['credit_lookup']['count'] == 1
+        assert snapshot['counters']['documents_valued'] == 3
+        assert snapshot['counters']['documents_rejected'] == 1
+        assert snapshot['counters']['documents_failed'] == 1
+
+    def test_worker_metrics_are_merged(self, mock_lookup, enabled, lease_folder):
+        """Test stages timed in pool workers, failing ones included, reach the parent once."""
+        process_documents(lease_folder, workers=2, credit_workers=2)
+        snapshot = enabled.snapshot()
+        assert snapshot['stages']['document']['count'] == 5
+        assert snapshot['stages']['manual_override_check']['count'] == 5
+        assert snapshot['stages']['irr']['count'] == 3
+        assert snapshot['counters']['documents_valued'] == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
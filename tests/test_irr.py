@@ -0,0 +1,116 @@
+"""
+Unit tests for the vectorised IRR solver
+"""
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from irr import (
+    CONVERGED,
+    NO_IRR,
+    POLYNOMIAL_ROOT,
+    lease_cash_flow_matrix,
+    solve_irr,
+)
+from lease_valuation import pv_buyout_batch
+
+
+def npv(cash_flows, rate):
+    return sum(cf / (1 + rate) ** t for t, cf in enumerate(cash_flows))
+
+
+class TestSolveIRR:
+    """Test batch IRR solutions and status reporting."""
+
+    def test_simple_two_period(self):
+        """Test -100 then 110 gives exactly 10%."""
+        result = solve_irr([[-100, 110]])
+        assert result.rate[0] == pytest.approx(0.10, abs=1e-10)
+        assert result.status[0] == CONVERGED
+
+    def test_ragged_rows(self):
+        """Test rows of different length are zero-padded without changing IRR."""
+        flows = [[-1000, 600, 600], [-500, 100, 100, 400]]
+        result = solve_irr(flows)
+        for row, rate in zip(flows, result.rate):
+            assert abs(npv(row, rate)) < 1e-6
+        assert result.converged.all()
+
+    def test_negative_irr(self):
+        """Test leases that never pay back get a negative IRR."""
+        result = solve_irr([[-1000, 300, 300, 300]])
+        assert result.rate[0] < 0
+        assert abs(npv([-1000, 300, 300, 300], result.rate[0])) < 1e-6
+
+    def test_no_sign_change(self):
+        """Test all-positive flows report no IRR instead of a made-up rate."""
+        result = solve_irr([[100, 100, 100]])
+        assert np.isnan(result.rate[0])
+        assert result.status[0] == NO_IRR
+        assert not result.converged[0]
+        assert result.status_names() == ["no_irr"]
+
+    def test_multiple_roots_prefers_guess(self):
+        """Test -100, 230, -132 (IRRs 10% and 20%) picks the root near guess."""
+        assert solve_irr([[-100, 230, -132]], guess=0.10).rate[0] == pytest.approx(0.10)
+        assert solve_irr([[-100, 230, -132]], guess=0.25).rate[0] == pytest.approx(0.20)
+
+    def test_polynomial_fallback(self):
+        """Test a touching root the grid cannot bracket uses numpy.roots."""
+        # NPV = -(1 - 1.12x)**2 * 100 touches zero at r = 12% without crossing
+        x_coeffs = -100 * np.array([1.0, -2.24, 1.2544])
+        result = solve_irr([x_coeffs])
+        assert result.status[0] == POLYNOMIAL_ROOT
+        assert result.rate[0] == pytest.approx(0.12, abs=1e-6)
+
+    def test_empty_input(self):
+        """Test an empty book returns empty results."""
+        result = solve_irr(np.zeros((0, 5)))
+        assert result.rate.shape == (0,)
+
+
+class TestLeaseBook:
+    """Test IRR across a synthetic lease book."""
+
+    def test_book_matches_scalar_npv(self):
+        """Test every lease in a mixed book solves to NPV zero."""
+        rng = np.random.default_rng(3)
+        n = 2000
+        rent = rng.uniform(5000, 500000, n)
+        term = rng.integers(15, 46, n)
+        escalator = rng.choice([0.0, 0.01, 0.025], n)
+        offers = pv_buyout_batch(annual_rent=rent, term_years=term, escalator=escalator, buyout_pct=0.85)
+        cash_flows = lease_cash_flow_matrix(offers, rent, term, escalator)
+
+        result = solve_irr(cash_flows)
+        assert (result.status == CONVERGED).all()
+        # Paying 85% of PV at 10% must return more than 10%
+        assert (result.rate > 0.10).all()
+        years = np.arange(cash_flows.shape[1])
+        residual = (cash_flows / (1 + result.rate[:, None]) ** years).sum(axis=1)
+        assert np.abs(residual / offers).max() < 1e-8
+
+    def test_cash_flow_matrix_layout(self):
+        """Test investment column and zero padding after the term."""
+        matrix = lease_cash_flow_matrix([100.0, 200.0], [10.0, 20.0], [2, 3], 0.10)
+        np.testing.assert_allclose(matrix, [[-100, 10, 11, 0], [-200, 20, 22, 24.2]])
+
+
+class TestCalculateIRR:
+    """Test the pipeline's scalar calculate_irr wrapper."""
+
+    def test_lanceleaf_cash_flows(self):
+        """Test the wrapper solves a typical buyout to NPV zero."""
+        from process_leases import calculate_irr
+
+        flows = [-800000] + [95680 * 1.025 ** i for i in range(45)]
+        rate = calculate_irr(flows)
+        assert abs(npv(flows, rate)) < 1e-4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,203 @@
+"""
+Unit tests for the columnar LeaseBook
+"""
+import pytest
+import json
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lease_book import LeaseBook, PortfolioAccumulator
+from process_leases import (
+    LeaseResult,
+    generate_executive_report,
+    generate_leases_json,
+    generate_summary_table,
+)
+
+
+def make_result(name, rent, offer, tier="medium", developer="Lanceleaf Solar", **overrides):
+    fields = dict(
+        name=name, annual_rent=rent, annual_rent_per_acre=rent / 36.8, term_years=25,
+        renewal_options="4 × 5-yr", total_potential_term=45, escalator=0.025, risk_tier=tier,
+        location="Kendall County, Illinois", acres=36.8, developer=developer, pv_value=offer / 0.85,
+        undiscounted_value=rent * 30.0, buyout_offer=offer, multiple=0.11, discount_rate=0.10,
+        credit_data={"risk_tier": tier},
+    )
+    fields.update(overrides)
+    return LeaseResult(**fields)
+
+
+@pytest.fixture
+def results():
+    return [
+        make_result("Alpha", 95680, 1000000.0),
+        make_result("Bravo", 230000, 2500000.0, tier="low", developer="NextEra", acres=1150,
+                    annual_rent_per_acre=None, total_potential_term=None, renewal_options=None),
+        make_result("Charlie", 52500, 2500000.0, tier="high", credit_data={}),
+        make_result("Delta", 10000.5, 90000.0),
+    ]
+
+
+class TestLeaseBook:
+    """Test storage, row views and interning."""
+
+    def test_rows_round_trip(self, results):
+        """Test every LeaseResult attribute reads back unchanged."""
+        book = LeaseBook.from_results(results)
+        assert len(book) == 4
+        for result, row in zip(results, book):
+            for field in LeaseResult.__dataclass_fields__:
+                assert getattr(row, field) == getattr(result, field), field
+        assert isinstance(book[0].annual_rent, int)
+        assert book[-1].annual_rent == 10000.5
+
+    def test_rows_use_slots(self, results):
+        """Test row views carry no per-row __dict__."""
+        row = LeaseBook.from_results(results)[0]
+        assert not hasattr(row, '__dict__')
+        with pytest.raises(AttributeError):
+            row.name = "changed"
+
+    def test_strings_are_interned(self, results):
+        """Test repeated developers and credit dicts share one entry."""
+        book = LeaseBook.from_results(results * 100)
+        assert len(book._pools['developer']) == 2
+        assert len(book._pools['location']) == 1
+        assert len(book._credit) == 3
+        assert book[0].credit_data is book[4].credit_data
+
+    def test_growth(self, results):
+        """Test appending past capacity keeps earlier rows intact."""
+        book = LeaseBook()
+        for i in range(50):
+            book.append(results[i % 4])
+        assert len(book) == 50
+        assert [r.name for r in book][:5] == ["Alpha", "Bravo", "Charlie", "Delta", "Alpha"]
+        assert book.column('buyout_offer')[49] == results[1].buyout_offer
+
+    def test_columns(self, results):
+        """Test numeric columns are read-only and string columns decode."""
+        book = LeaseBook.from_results(results)
+        offers = book.column('buyout_offer')
+        assert offers.tolist() == [1000000.0, 2500000.0, 2500000.0, 90000.0]
+        with pytest.raises(ValueError):
+            offers[0] = 1.0
+        assert book.column('risk_tier').tolist() == ["medium", "low", "high", "medium"]
+
+    def test_records_match_row_views(self, results):
+        """Test batch-decoded records carry the same values as LeaseRow."""
+        book = LeaseBook.from_results(results)
+        records = list(book.records(batch_size=3))
+        assert len(records) == 4
+        for record, row in zip(records, book):
+            for field in record._fields:
+                assert getattr(record, field) == getattr(row, field)
+        assert records[1].annual_rent_per_acre is None
+        assert records[1].total_potential_term is None
+        assert isinstance(records[0].annual_rent, int)
+        assert records[3].annual_rent == 10000.5
+
+    def test_sorted_by_is_stable(self, results):
+        """Test descending sort keeps insertion order for ties, like sorted()."""
+        book = LeaseBook.from_results(results)
+        expected = sorted(results, key=lambda r: r.buyout_offer, reverse=True)
+        assert [r.name for r in book.sorted_by('buyout_offer', reverse=True)] == [r.name for r in expected]
+
+
+class TestPortfolioTotals:
+    """Test vectorised aggregates against the generator sums they replace."""
+
+    def test_totals(self, results):
+        """Test each aggregate matches the per-row Python computation."""
+        totals = LeaseBook.from_results(results).totals()
+        assert totals.count == 4
+        assert totals.total_buyout == pytest.approx(sum(r.buyout_offer for r in results))
+        assert totals.total_pv == pytest.approx(sum(r.pv_value for r in results))
+        assert totals.total_acres == pytest.approx(sum(r.acres for r in results))
+        assert totals.avg_multiple == pytest.approx(0.11)
+        rent = sum(r.annual_rent for r in results)
+        assert totals.weighted_term == pytest.approx(sum(r.term_years * r.annual_rent for r in results) / rent)
+        assert totals.max_buyout == 2500000.0
+        assert list(totals.risk_breakdown.items()) == [("medium", 2), ("low", 1), ("high", 1)]
+
+    def test_reports_accept_lists_and_books(self, results, tmp_path):
+        """Test the writers produce identical output from a list or a LeaseBook."""
+        generate_summary_table(results, tmp_path / "list.md")
+        generate_summary_table(LeaseBook.from_results(results), tmp_path / "book.md")
+        assert (tmp_path / "list.md").read_text() == (tmp_path / "book.md").read_text()
+        generate_executive_report(LeaseBook.from_results(results), 0.10, tmp_path / "exec.md")
+        assert "**1. Bravo**" in (tmp_path / "exec.md").read_text()
+
+
+
+class TestPortfolioAccumulator:
+    """Test one-pass aggregation and the top-N heap."""
+
+    def test_matches_vectorised_totals(self, results):
+        """Test streaming totals equal the LeaseBook's column totals."""
+        streamed = PortfolioAccumulator().update(results).totals()
+        vectorised = LeaseBook.from_results(results).totals()
+        for field in ("count", "max_buyout", "risk_breakdown"):
+            assert getattr(streamed, field) == getattr(vectorised, field)
+        for field in ("total_buyout", "total_pv", "total_annual_rent", "total_acres",
+                      "avg_multiple", "weighted_term"):
+            assert getattr(streamed, field) == pytest.approx(getattr(vectorised, field))
+
+    def test_top_n_keeps_largest_with_stable_ties(self, results):
+        """Test the heap keeps the largest offers, earlier leases winning ties."""
+        assert [r.name for r in PortfolioAccumulator(top_n=2).update(results).top()] == ["Bravo", "Charlie"]
+        assert [r.name for r in PortfolioAccumulator(top_n=1).update(results).top()] == ["Bravo"]
+        everything = PortfolioAccumulator().update(results).top()
+        expected = sorted(results, key=lambda r: r.buyout_offer, reverse=True)
+        assert [r.name for r in everything] == [r.name for r in expected]
+
+    def test_memory_bounded_by_top_n(self):
+        """Test only top_n leases are held however many stream through."""
+        acc = PortfolioAccumulator(top_n=5)
+        acc.update(make_result(f"L{i}", 1000, float(i % 97)) for i in range(10000))
+        assert len(acc._heap) == 5
+        assert [r.buyout_offer for r in acc.top()] == [96.0] * 5
+        assert acc.totals().count == 10000
+
+    def test_empty(self):
+        """Test an empty stream gives zero totals."""
+        totals = PortfolioAccumulator(top_n=3).totals()
+        assert totals.count == 0
+        assert totals.weighted_term == 0.0
+
+
+class TestStreamingWriters:
+    """Test the streaming report writers."""
+
+    def test_leases_json_matches_json_dump(self, results, tmp_path):
+        """Test per-entry streaming produces the same file as one json.dump."""
+        generate_leases_json(results, tmp_path / "leases.json")
+        entries = json.loads((tmp_path / "leases.json").read_text())
+        assert (tmp_path / "leases.json").read_text() == json.dumps(entries, indent=2)
+        assert [e["name"] for e in entries] == ["Alpha", "Bravo", "Charlie", "Delta"]
+        generate_leases_json([], tmp_path / "empty.json")
+        assert (tmp_path / "empty.json").read_text() == "[]"
+
+    def test_writers_accept_generators(self, results, tmp_path):
+        """Test reports stream from a one-shot iterator."""
+        generate_summary_table(iter(results), tmp_path / "gen.md")
+        generate_summary_table(results, tmp_path / "list.md")
+        assert (tmp_path / "gen.md").read_text() == (tmp_path / "list.md").read_text()
+        assert "- **Total Investment**: $6,090,000" in (tmp_path / "gen.md").read_text()
+
+    def test_executive_report_lists_top_n(self, results, tmp_path):
+        """Test the report lists the largest offers and says how many it left out."""
+        generate_executive_report(iter(results), 0.10, tmp_path / "exec.md", top_n=2)
+        text = (tmp_path / "exec.md").read_text()
+        assert "**4 solar ground leases**" in text
+        assert "**1. Bravo**" in text and "**2. Charlie**" in text
+        assert "Alpha" not in text
+        assert "*Top 2 of 4 offers shown; see lease_summary.md for every lease.*" in text
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,150 @@
+"""
+Unit tests for Parquet / Arrow / CSV lease export and import
+"""
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lease_book import LeaseBook
+from lease_io import _credit_dict, _credit_struct, format_for, read_columns, read_leases, write_leases
+from lease_valuation import pv_buyout_batch
+from process_leases import LeaseResult
+
+
+def make_result(name, rent, offer, **overrides):
+    fields = dict(
+        name=name, annual_rent=rent, annual_rent_per_acre=rent / 36.8, term_years=25,
+        renewal_options="4 × 5-yr", total_potential_term=45, escalator=0.025, risk_tier="medium",
+        location="Kendall County, Illinois", acres=36.8, developer="Lanceleaf Solar", pv_value=offer / 0.85,
+        undiscounted_value=rent * 30.0, buyout_offer=offer, multiple=0.11, discount_rate=0.10,
+        credit_data={"company_name": "Lanceleaf Solar", "risk_tier": "medium", "public_company": False,
+                     "years_since_incorp": 8, "state_of_incorp": None, "data_sources": ["Known Entities DB"],
+                     "match_score": 0.9, "sec_filings": None},
+    )
+    fields.update(overrides)
+    return LeaseResult(**fields)
+
+
+@pytest.fixture
+def book():
+    return LeaseBook.from_results([
+        make_result("Alpha", 95680, 1039179.21),
+        make_result("Bravo", 230000, 2500000.0, risk_tier="low", developer="NextEra", acres=1150,
+                    annual_rent_per_acre=None, total_potential_term=None, renewal_options=None,
+                    credit_data={"company_name": "NextEra", "risk_tier": "low", "public_company": True}),
+        make_result("Charlie", 52500.5, 213218.44, risk_tier="high", location="Unknown", credit_data={}),
+    ])
+
+
+def assert_same_book(actual, expected):
+    assert len(actual) == len(expected)
+    for a, b in zip(actual.records(), expected.records()):
+        assert a._replace(credit_data=None) == b._replace(credit_data=None)
+        assert a.credit_data == b.credit_data
+
+
+class TestFormats:
+    """Test format selection."""
+
+    def test_format_from_suffix(self):
+        """Test suffixes map to formats and unknown ones are rejected."""
+        assert format_for("x/leases.parquet") == "parquet"
+        assert format_for("leases.ARROW") == "arrow"
+        assert format_for("leases.feather") == "arrow"
+        assert format_for("leases.txt", "csv") == "csv"
+        with pytest.raises(ValueError):
+            format_for("leases.txt")
+        with pytest.raises(ValueError):
+            format_for("leases.csv", "xlsx")
+
+
+class TestCsv:
+    """Test the dependency-free CSV path."""
+
+    def test_round_trip(self, book, tmp_path):
+        """Test a CSV export loads back into an identical LeaseBook."""
+        path = write_leases(book, tmp_path / "leases.csv")
+        assert_same_book(read_leases(path), book)
+
+    def test_columns_feed_batch_valuation(self, book, tmp_path):
+        """Test read_columns output plugs straight into pv_buyout_batch."""
+        path = write_leases(book, tmp_path / "leases.csv")
+        cols = read_columns(path, ["annual_rent", "term_years", "escalator"])
+        assert cols["term_years"].dtype == np.int32
+        offers = pv_buyout_batch(**cols, discount_rate=0.10, buyout_pct=0.85)
+        assert len(offers) == 3
+
+    def test_missing_values(self, book, tmp_path):
+        """Test unknown per-acre rent and total term survive as NaN / 0."""
+        path = write_leases(book, tmp_path / "leases.csv")
+        cols = read_columns(path)
+        assert np.isnan(cols["annual_rent_per_acre"][1])
+        assert cols["total_potential_term"][1] == 0
+        assert cols["renewal_options"][1] is None
+        assert "credit_data" not in cols
+
+
+class TestFromColumns:
+    """Test building a LeaseBook from columns."""
+
+    def test_dictionary_encoded_strings(self, book):
+        """Test (codes, values) string columns decode to the same rows."""
+        columns = {}
+        for field in book.records().__next__()._fields:
+            if field in ("renewal_options", "risk_tier", "location", "developer", "credit_data"):
+                codes, values = book.encoded(field)
+                columns[field] = (codes.copy(), list(values))
+            else:
+                columns[field] = book.column(field)
+        assert_same_book(LeaseBook.from_columns(columns), book)
+
+
+class TestCreditStruct:
+    """Test credit assessments survive the fixed-field struct."""
+
+    def test_null_fields_round_trip(self):
+        """Test keys holding None come back, and absent keys stay absent."""
+        credit = {"company_name": "NextEra", "risk_tier": None, "clean_name": None, "notes": None, "score": 2}
+        assert _credit_dict(_credit_struct(credit)) == credit
+        assert _credit_dict(_credit_struct({"company_name": "NextEra"})) == {"company_name": "NextEra"}
+
+
+class TestArrow:
+    """Test Parquet and Arrow IPC export (needs pyarrow)."""
+
+    @pytest.fixture(autouse=True)
+    def pyarrow(self):
+        return pytest.importorskip("pyarrow")
+
+    @pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+    def test_round_trip(self, book, tmp_path, suffix):
+        """Test batches, dictionary columns and credit structs round-trip."""
+        path = write_leases(book, tmp_path / f"leases{suffix}", batch_rows=2)
+        assert_same_book(read_leases(path), book)
+
+    @pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+    def test_schema(self, book, tmp_path, suffix, pyarrow):
+        """Test string columns are dictionary-encoded and credit data is a struct."""
+        path = write_leases(book, tmp_path / f"leases{suffix}")
+        if suffix == ".parquet":
+            import pyarrow.parquet as pq
+            schema = pq.read_schema(path)
+        else:
+            schema = pyarrow.ipc.open_file(pyarrow.memory_map(str(path))).schema
+        assert pyarrow.types.is_dictionary(schema.field("developer").type)
+        assert pyarrow.types.is_struct(schema.field("credit_data").type)
+
+    def test_arrow_numeric_columns_are_zero_copy(self, book, tmp_path):
+        """Test a single-batch Arrow file gives views onto the mapped file."""
+        path = write_leases(book, tmp_path / "leases.arrow")
+        cols = read_columns(path, ["annual_rent", "escalator"])
+        assert not cols["annual_rent"].flags.owndata
+        np.testing.assert_array_equal(cols["escalator"], book.column("escalator"))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
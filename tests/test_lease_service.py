@@ -0,0 +1,160 @@
+"""
+Unit tests for the watch-folder lease service
+"""
+import pytest
+import json
+import os
+import sys
+import threading
+import urllib.request
+import urllib.error
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import process_leases
+from lease_service import LeaseService, PollingWatcher, make_http_server
+
+
+def fake_credit(name):
+    return {"company_name": name, "risk_tier": "low", "data_sources": ["Test"]}
+
+
+def write_lease(folder, name, rent=95680):
+    path = folder / f"{name.lower()}.json"
+    path.write_text(json.dumps({"name": name, "annual_rent": rent, "term_years": 25, "escalator": 0.025}))
+    return path
+
+
+@pytest.fixture
+def folders(tmp_path):
+    (tmp_path / "in").mkdir()
+    return tmp_path / "in", tmp_path / "out"
+
+
+@pytest.fixture
+def service(folders):
+    return LeaseService(*folders, debounce=0.05, queue_size=4)
+
+
+@patch('process_leases.quick_lookup', side_effect=fake_credit)
+class TestRefresh:
+    """Test refreshes process only what changed and write outputs atomically."""
+
+    def test_refresh_writes_outputs(self, mock_lookup, folders, service):
+        """Test the first refresh writes all three reports."""
+        write_lease(folders[0], "Alpha")
+        assert service.refresh()
+        leases = json.loads((folders[1] / "leases.json").read_text())
+        assert [lease["name"] for lease in leases] == ["Alpha"]
+        assert (folders[1] / "lease_summary.md").exists()
+        assert (folders[1] / "executive_report.md").exists()
+        assert not list(folders[1].glob("*.tmp"))
+
+    def test_unchanged_folder_skips_rewrite(self, mock_lookup, folders, service):
+        """Test a refresh with nothing new leaves the outputs alone."""
+        write_lease(folders[0], "Alpha")
+        service.refresh()
+        with patch('lease_service.publish') as write:
+            assert not service.refresh()
+        write.assert_not_called()
+
+    def test_only_new_documents_processed(self, mock_lookup, folders, service):
+        """Test warm state: a new file is the only document re-processed."""
+        write_lease(folders[0], "Alpha")
+        service.refresh()
+        write_lease(folders[0], "Bravo", rent=230000)
+        with patch('process_leases.process_lease_document',
+                   wraps=process_leases.process_lease_document) as processed:
+            service.refresh()
+        assert [c.args[0].name for c in processed.call_args_list] == ["bravo.json"]
+        assert service.metrics["leases"] == 2
+        assert service.metrics["documents_processed"] == 2
+
+    def test_edit_after_warm_scan_is_seen(self, mock_lookup, folders, service):
+        """Test a same-size edit is re-processed by a long-lived manifest."""
+        path = write_lease(folders[0], "Alpha", rent=95680)
+        service.refresh()
+        write_lease(folders[0], "Alpha", rent=95681)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert service.refresh()
+        assert json.loads((folders[1] / "leases.json").read_text())[0]["annual_rent"] == 95681
+
+    def test_failed_refresh_reports_degraded(self, mock_lookup, folders, service):
+        """Test a refresh that raises keeps the service up and flips /healthz."""
+        write_lease(folders[0], "Alpha")
+        with patch('lease_service.publish', side_effect=OSError("disk full")):
+            service._safe_refresh()
+        status, body = service.health()
+        assert status == 503
+        assert body["last_error"] == "OSError: disk full"
+        assert "spiceflow_refresh_errors_total 1" in service.prometheus()
+
+
+class TestIntake:
+    """Test change detection, debouncing and the bounded queue."""
+
+    def test_polling_watcher_reports_changes(self, folders):
+        """Test added, modified and removed documents are all reported."""
+        seen = []
+        alpha = write_lease(folders[0], "Alpha")
+        watcher = PollingWatcher(folders[0], seen.append)
+        write_lease(folders[0], "Bravo")
+        (folders[0] / "notes.txt").write_text("not a lease")
+        watcher.poll()
+        assert [p.name for p in seen] == ["bravo.json"]
+        alpha.unlink()
+        watcher.poll()
+        assert [p.name for p in seen] == ["bravo.json", "alpha.json"]
+        watcher.poll()
+        assert len(seen) == 2
+
+    def test_burst_is_one_batch(self, service, folders):
+        """Test events arriving within the debounce window are coalesced."""
+        for name in ["a.json", "b.json", "a.json"]:
+            service.notify(folders[0] / name)
+        assert {p.name for p in service.next_batch()} == {"a.json", "b.json"}
+        assert service.next_batch(timeout=0.01) == set()
+
+    def test_full_queue_blocks_watcher(self, service, folders):
+        """Test notify waits for the worker instead of growing the queue."""
+        for i in range(4):
+            service.notify(folders[0] / f"{i}.json")
+        blocked = threading.Thread(target=service.notify, args=(folders[0] / "late.json",))
+        blocked.start()
+        blocked.join(timeout=0.2)
+        assert blocked.is_alive()
+        service.next_batch()
+        blocked.join(timeout=2)
+        assert not blocked.is_alive()
+        assert service.metrics["events"] == 5
+
+
+class TestHttp:
+    """Test the localhost health and metrics endpoints."""
+
+    def test_endpoints(self, service):
+        """Test /healthz, /metrics and unknown paths."""
+        server = make_http_server(service, port=0)
+        assert server.server_address[0] == "127.0.0.1"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/healthz") as response:
+                assert json.load(response)["status"] == "ok"
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                text = response.read().decode()
+            assert "# TYPE spiceflow_refreshes_total counter" in text
+            assert "spiceflow_queue_depth 0" in text
+            with pytest.raises(urllib.error.HTTPError) as err:
+                urllib.request.urlopen(f"{base}/nope")
+            assert err.value.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
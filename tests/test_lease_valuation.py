@@ -9,7 +9,14 @@ import os
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from lease_valuation import LeaseParams, generate_cash_flows, present_value, pv_buyout
+from lease_valuation import (
+    LeaseParams,
+    PortfolioValuer,
+    generate_cash_flows,
+    present_value,
+    pv_buyout,
+    pv_buyout_batch,
+)
 
 
 class TestLeaseParams:
@@ -82,6 +89,40 @@ class TestPresentValue:
         assert abs(pv - expected) < 0.01
 
 
+class TestClosedFormPresentValue:
+    """Test the growing-annuity fast path against explicit cash flows."""
+
+    @pytest.mark.parametrize("escalator,rate", [
+        (0.0, 0.10),
+        (0.025, 0.10),
+        (0.10, 0.10),  # g == r
+        (0.15, 0.10),  # g > r
+        (0.02, 0.0),
+        (0.0200001, 0.02),  # q very close to 1
+    ])
+    def test_matches_array_path(self, escalator, rate):
+        """Closed form equals summing the per-year discounted rents."""
+        params = LeaseParams(annual_rent=95680, term_years=30, escalator=escalator, balloon_cost=40000)
+        expected = present_value(params.cash_flows(), rate)
+        assert params.present_value(rate) == pytest.approx(expected, rel=1e-12)
+
+    def test_equal_growth_and_discount(self):
+        """With g == r every rent discounts to rent / (1 + r)."""
+        params = LeaseParams(annual_rent=1000, term_years=5, escalator=0.08)
+        assert params.present_value(0.08) == pytest.approx(5 * 1000 / 1.08)
+
+    def test_custom_escalators_fall_back(self):
+        """Custom escalator paths are valued from the cash-flow array."""
+        params = LeaseParams(annual_rent=100000, term_years=3, custom_escalators=[0.02, 0.03, 0.05])
+        assert params.present_value(0.10) == present_value(params.cash_flows(), 0.10)
+
+    def test_pv_buyout_uses_closed_form(self):
+        """pv_buyout agrees with the array-based PV to the cent."""
+        params = LeaseParams(annual_rent=95680, term_years=23, escalator=0.025)
+        expected = round(present_value(params.cash_flows(), 0.10) * 0.80, 2)
+        assert pv_buyout(annual_rent=95680, term_years=23, escalator=0.025) == expected
+
+
 class TestRealLeaseFixtures:
     """Test with real lease data fixtures."""
     
@@ -179,5 +220,74 @@ class TestIntegrationFlow:
         assert abs(buyout - direct_buyout) < 1.0  # Should match within rounding
 
 
+class TestBatchValuation:
+    """Test vectorised portfolio valuation against the scalar path."""
+
+    def test_matches_scalar_exactly(self):
+        """Batch offers equal per-lease pv_buyout offers to the cent."""
+        rng = np.random.default_rng(7)
+        n = 500
+        book = {
+            "annual_rent": rng.uniform(1000, 1e6, n).round(),
+            "term_years": rng.integers(1, 51, n),
+            "escalator": rng.choice([0.0, 0.01, 0.015, 0.02, 0.025], n),
+            "discount_rate": rng.uniform(0.06, 0.14, n),
+            "buyout_pct": rng.choice([0.80, 0.85], n),
+            "balloon_cost": rng.choice([0.0, 50000.0, -25000.0], n),
+        }
+        offers = pv_buyout_batch(**book)
+        expected = [
+            pv_buyout(**{k: v[i].item() for k, v in book.items()})
+            for i in range(n)
+        ]
+        np.testing.assert_array_equal(offers, expected)
+
+    def test_scalar_arguments_broadcast(self):
+        """Scalar rate and percentage apply to every lease."""
+        offers = pv_buyout_batch(
+            annual_rent=[95680, 230000],
+            term_years=[23, 25],
+            escalator=[0.025, 0.015],
+            discount_rate=0.10,
+            buyout_pct=0.85,
+        )
+        assert offers[0] == pv_buyout(annual_rent=95680, term_years=23, escalator=0.025, buyout_pct=0.85)
+        assert offers[1] == pv_buyout(annual_rent=230000, term_years=25, escalator=0.015, buyout_pct=0.85)
+
+    def test_invalid_terms(self):
+        """Zero terms are rejected; a part final year is paid in full."""
+        with pytest.raises(ValueError):
+            pv_buyout_batch(annual_rent=[1000], term_years=[0])
+        assert pv_buyout_batch(annual_rent=[1000], term_years=[2.5]).tolist() == [
+            pv_buyout(annual_rent=1000, term_years=3)
+        ]
+
+    def test_portfolio_valuer(self):
+        """PortfolioValuer re-prices a book built from LeaseParams."""
+        leases = [
+            LeaseParams(annual_rent=95680, term_years=45, escalator=0.025),
+            LeaseParams(annual_rent=52500, term_years=30, escalator=0.025, balloon_cost=10000),
+        ]
+        valuer = PortfolioValuer.from_params(leases)
+        assert len(valuer) == 2
+        for rate in (0.08, 0.12):
+            offers = valuer.buyout_offers(discount_rate=rate, buyout_pct=0.85)
+            for offer, p in zip(offers, leases):
+                assert offer == pv_buyout(
+                    annual_rent=p.annual_rent,
+                    term_years=p.term_years,
+                    escalator=p.escalator,
+                    discount_rate=rate,
+                    buyout_pct=0.85,
+                    balloon_cost=p.balloon_cost,
+                )
+
+    def test_portfolio_valuer_rejects_custom_escalators(self):
+        """Custom escalator paths need the scalar engine."""
+        leases = [LeaseParams(annual_rent=1000, term_years=2, custom_escalators=[0.01, 0.02])]
+        with pytest.raises(ValueError):
+            PortfolioValuer.from_params(leases)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Unit tests for the lease processing pipeline
+"""
+import pytest
+import json
+import sys
+import os
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import process_leases
+from deal_store import DealStore
+from process_leases import calculate_irr, process_documents, process_lease_document, sweep_results
+
+
+def fake_credit(name):
+    return {"company_name": name, "risk_tier": "low", "data_sources": ["Test"]}
+
+
+@pytest.fixture
+def lease_folder(tmp_path):
+    """Folder of JSON leases, one of which raises during validation."""
+    leases = [
+        {"name": "Alpha", "annual_rent": 95680, "term_years": 25, "escalator": 0.025, "developer": "Alpha Solar"},
+        {"name": "Bravo", "annual_rent": 230000, "term_years": 25, "escalator": 0.015},
+        {"name": "Broken", "annual_rent": "lots", "term_years": 25, "escalator": 0.0},
+        {"name": "Charlie", "annual_rent": 52500, "term_years": 30, "escalator": 0.025, "developer": "Charlie Wind"},
+        {"name": "NoTerm", "annual_rent": 50000, "term_years": None},
+    ]
+    paths = []
+    for i, lease in enumerate(leases):
+        path = tmp_path / f"{i:02d}_{lease['name'].lower()}.json"
+        path.write_text(json.dumps(lease))
+        paths.append(path)
+    return paths
+
+
+class TestProcessDocuments:
+    """Test sequential and parallel document processing."""
+
+    @patch('process_leases.quick_lookup', side_effect=fake_credit)
+    def test_sequential_outcomes(self, mock_lookup, lease_folder):
+        """Test outcomes keep input order and isolate the failing file."""
+        outcomes = process_documents(lease_folder)
+        assert [o.path for o in outcomes] == lease_folder
+        assert [o.result.name if o.result else None for o in outcomes] == [
+            "Alpha", "Bravo", None, "Charlie", None
+        ]
+        assert isinstance(outcomes[2].error, TypeError)
+        assert outcomes[4].error is None
+        assert outcomes[0].result.risk_tier == "low"
+        assert outcomes[1].result.risk_tier == "medium"  # no developer to look up
+
+    @patch('process_leases.quick_lookup', side_effect=fake_credit)
+    def test_parallel_matches_sequential(self, mock_lookup, lease_folder):
+        """Test the process pool returns the same results in the same order."""
+        sequential = process_documents(lease_folder)
+        parallel = process_documents(lease_folder, workers=2, credit_workers=2)
+
+        assert [o.path for o in parallel] == lease_folder
+        assert [o.result for o in parallel] == [o.result for o in sequential]
+        assert isinstance(parallel[2].error, TypeError)
+        # Credit lookups run in the parent's thread pool, once per developer
+        assert mock_lookup.call_count == 4
+
+    @patch('process_leases.quick_lookup', side_effect=RuntimeError("SEC down"))
+    def test_credit_failure_keeps_lease(self, mock_lookup, lease_folder):
+        """Test a failed credit lookup falls back to the lease's own risk tier."""
+        result = process_lease_document(lease_folder[0])
+        assert result.name == "Alpha"
+        assert result.risk_tier == "medium"
+        assert result.credit_data == {}
+
+
+class TestSweep:
+    """Test the --sweep scenario grid over processed leases."""
+
+    @patch('process_leases.quick_lookup', side_effect=fake_credit)
+    def test_base_scenario_matches_pipeline(self, mock_lookup, lease_folder):
+        """Test the 10% / 85% cell reproduces each lease's buyout offer."""
+        results = [o.result for o in process_documents(lease_folder) if o.result]
+        grid = sweep_results(results, discount_rates=[0.08, 0.10], buyout_pcts=[0.85])
+        assert grid.names == ["Alpha", "Bravo", "Charlie"]
+        assert list(grid.offers(0.85)[1, 0]) == [r.buyout_offer for r in results]
+
+
+
+class TestNoIRR:
+    """Test leases whose cash flows have no IRR."""
+
+    def test_calculate_irr_status(self):
+        """Test no-IRR and unconverged solutions come back as None, not NaN."""
+        assert calculate_irr([-1000, 600, 600]) == pytest.approx(0.1306624)
+        assert calculate_irr([100, 100, 100]) is None
+        assert calculate_irr([-1000, 600, 600], max_iterations=0) is None
+
+    @patch('process_leases.quick_lookup', side_effect=fake_credit)
+    def test_pipeline_reports_missing_irr(self, mock_lookup, lease_folder, tmp_path):
+        """Test a lease without an IRR is null in every output and left out of the average."""
+        solve = process_leases.calculate_irr
+        with patch('process_leases.calculate_irr',
+                   side_effect=lambda flows: None if flows[1] == 230000 else solve(flows)):
+            book = process_leases.run_pipeline(lease_folder)
+        multiples = [row.multiple for row in book]
+        assert multiples[1] is None
+        assert book.totals().avg_multiple == pytest.approx((multiples[0] + multiples[2]) / 2)
+
+        summary, report, leases_json = process_leases.write_reports(book, 0.10, tmp_path / 'out')
+
+        def reject(constant):
+            raise ValueError(constant)
+
+        entries = json.loads(leases_json.read_text(), parse_constant=reject)
+        assert entries[1]["name"] == "Bravo" and entries[1]["multiple"] is None
+        assert "| 🟡 n/a |" in summary.read_text()
+        assert "(n/a annualized return)" in report.read_text()
+        assert "nan%" not in report.read_text()
+
+        with DealStore(tmp_path / 'deals.sqlite3') as store:
+            store.record_run(book)
+            assert [lease.multiple for lease in store.query()] == multiples
+
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+STARTUP_BUDGET_US = 100_000  # import of the CLI module, microseconds
+HEAVY_MODULES = ('numpy', 'requests', 'pdfplumber', 'docx', 'document_extractor', 'credit_lookup')
+
+
+def run_python(*args, cwd=SRC):
+    return subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True, text=True, check=True)
+
+
+def import_times(module):
+    """``-X importtime`` cumulative microseconds for each module imported by ``import module``."""
+    run_python('-c', f'import {module}')  # warm the bytecode cache
+    times = {}
+    for line in run_python('-X', 'importtime', '-c', f'import {module}').stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line.split('|')
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    """Test the CLI starts without its heavy dependencies."""
+
+    def test_import_budget(self):
+        """Test importing the pipeline stays within budget and loads no heavy modules."""
+        times = import_times('process_leases')
+        assert times['process_leases'] < STARTUP_BUDGET_US
+        assert not set(HEAVY_MODULES) & set(times)
+
+    def test_export_formats_match_lease_io(self):
+        """Test the --format choices kept out of start-up match lease_io."""
+        from lease_io import FORMATS
+        assert process_leases.EXPORT_FORMATS == FORMATS
+
+    def test_json_run_loads_only_what_it_uses(self, tmp_path):
+        """Test a JSON-only run without developers never imports the credit client or PDF/DOCX readers."""
+        leases = tmp_path / 'leases'
+        leases.mkdir()
+        (leases / 'alpha.json').write_text(json.dumps(
+            {"name": "Alpha", "annual_rent": 95680, "term_years": 25, "escalator": 0.025}))
+        script = (
+            "import sys, process_leases\n"
+            f"process_leases.main(['--input', {str(leases)!r}, '--output-dir', {str(tmp_path / 'out')!r},"
+            f" '--cache-dir', {str(tmp_path / 'cache')!r}])\n"
+            f"print(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        loaded = run_python('-c', script).stdout.strip().splitlines()[-1]
+        assert loaded == "['document_extractor', 'numpy']"
+        assert (tmp_path / 'out' / 'leases.json').exists()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
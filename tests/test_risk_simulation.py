@@ -0,0 +1,132 @@
+"""
+Unit tests for the Monte Carlo lease risk engine
+"""
+import pytest
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lease_valuation import LeaseParams
+from manual_overrides import MANUAL_LEASE_DATA
+from risk_simulation import (
+    LeaseRisk,
+    SimulationAssumptions,
+    lease_risk_from_record,
+    simulate_portfolio,
+)
+
+NO_RISK = SimulationAssumptions(default_hazard={"low": 0.0, "medium": 0.0, "high": 0.0},
+                                termination_hazard=0.0, renewal_prob=0.0)
+
+
+def lanceleaf(**kwargs):
+    return LeaseRisk(LeaseParams(annual_rent=95680, term_years=25, escalator=0.025), **kwargs)
+
+
+class TestDeterministicLimits:
+    """Test the simulation collapses to closed-form PVs without risk."""
+
+    def test_no_risk_matches_present_value(self):
+        """Test every path equals LeaseParams.present_value."""
+        lease = lanceleaf(renewal_terms=4, renewal_years=5)
+        lease.params.balloon_cost = 50000
+        result = simulate_portfolio([lease], n_paths=100, assumptions=NO_RISK, seed=1)
+        np.testing.assert_allclose(result.pv[0], lease.params.present_value(0.10))
+
+    def test_certain_renewals(self):
+        """Test renewal_prob=1 values the full potential term."""
+        assumptions = SimulationAssumptions(default_hazard=NO_RISK.default_hazard,
+                                            termination_hazard=0.0, renewal_prob=1.0)
+        result = simulate_portfolio([lanceleaf(renewal_terms=4, renewal_years=5)], n_paths=10,
+                                    assumptions=assumptions)
+        full = LeaseParams(annual_rent=95680, term_years=45, escalator=0.025).present_value(0.10)
+        np.testing.assert_allclose(result.pv[0], full)
+
+    def test_termination_at_first_exit(self):
+        """Test a certain exercise of a 15.75-year out pays 16 years."""
+        assumptions = SimulationAssumptions(default_hazard=NO_RISK.default_hazard,
+                                            termination_hazard=1.0, renewal_prob=0.0)
+        result = simulate_portfolio([lanceleaf(termination_year=15.75)], n_paths=10,
+                                    assumptions=assumptions)
+        sixteen = LeaseParams(annual_rent=95680, term_years=16, escalator=0.025).present_value(0.10)
+        np.testing.assert_allclose(result.pv[0], sixteen)
+
+    def test_flat_cpi_matches_fixed_escalator(self):
+        """Test zero-volatility CPI at 2.5% reproduces a 2.5% escalator."""
+        assumptions = SimulationAssumptions(default_hazard=NO_RISK.default_hazard, termination_hazard=0.0,
+                                            renewal_prob=0.0, cpi_mean=0.025, cpi_vol=0.0)
+        lease = LeaseRisk(LeaseParams(annual_rent=95680, term_years=25, escalator=0.0), cpi_linked=True)
+        result = simulate_portfolio([lease], n_paths=10, assumptions=assumptions)
+        np.testing.assert_allclose(result.pv[0], lanceleaf().params.present_value(0.10))
+
+
+class TestDistributions:
+    """Test risk moves the distribution the right way."""
+
+    def test_riskier_tier_lowers_value(self):
+        """Test expected PV falls from low to high risk tier."""
+        leases = [lanceleaf(risk_tier=tier) for tier in ("low", "medium", "high")]
+        means = simulate_portfolio(leases, n_paths=20000, seed=3).mean()
+        assert means[0] > means[1] > means[2]
+        assert means[0] < lanceleaf().params.present_value(0.10)
+
+    def test_percentiles_shape_and_order(self):
+        """Test per-lease and portfolio percentiles are ordered."""
+        result = simulate_portfolio([lanceleaf(), lanceleaf(risk_tier="high")], n_paths=5000, seed=3)
+        lease_q = result.lease_percentiles((5, 50, 95))
+        assert lease_q.shape == (2, 3)
+        assert (np.diff(lease_q, axis=1) >= 0).all()
+        portfolio_q = result.portfolio_percentiles((5, 50, 95))
+        assert portfolio_q[0] <= portfolio_q[1] <= portfolio_q[2]
+        assert result.portfolio_pv.shape == (5000,)
+
+    def test_unknown_tier_rejected(self):
+        """Test an unmapped risk tier fails loudly."""
+        with pytest.raises(ValueError):
+            simulate_portfolio([lanceleaf(risk_tier="junk")], n_paths=10)
+
+
+class TestReproducibility:
+    """Test seeded streams."""
+
+    def test_same_seed_same_paths(self):
+        """Test two runs with one seed match exactly."""
+        leases = [lanceleaf(termination_year=15.75, renewal_terms=2, renewal_years=5, cpi_linked=True)]
+        first = simulate_portfolio(leases, n_paths=1000, seed=11)
+        second = simulate_portfolio(leases, n_paths=1000, seed=11)
+        np.testing.assert_array_equal(first.pv, second.pv)
+
+    def test_lease_streams_independent_of_neighbours(self):
+        """Test appending a lease leaves earlier leases' paths unchanged."""
+        one = simulate_portfolio([lanceleaf()], n_paths=1000, seed=11)
+        two = simulate_portfolio([lanceleaf(), lanceleaf(risk_tier="high")], n_paths=1000, seed=11)
+        np.testing.assert_array_equal(one.pv[0], two.pv[0])
+
+    def test_workers_do_not_change_results(self):
+        """Test the process-pool split reproduces the in-process run."""
+        leases = [lanceleaf(risk_tier=tier, cpi_linked=(tier == "low"))
+                  for tier in ("low", "medium", "high", "medium")]
+        serial = simulate_portfolio(leases, n_paths=500, seed=5)
+        parallel = simulate_portfolio(leases, n_paths=500, seed=5, workers=2)
+        np.testing.assert_array_equal(serial.pv, parallel.pv)
+
+
+class TestLeaseRecords:
+    """Test building LeaseRisk from pipeline records."""
+
+    def test_kentucky_override(self):
+        """Test the 15.75-year out and 2 × 5-yr renewals are picked up."""
+        record = MANUAL_LEASE_DATA["SOL-KY-03_GROUND_LEASE_SULLIVAN,_RON__GWYNETTE_Redacted.pdf"]
+        lease = lease_risk_from_record(record)
+        assert lease.termination_year == 15.75
+        assert (lease.renewal_terms, lease.renewal_years) == (2, 5)
+        assert lease.horizon == 40
+        assert lease.risk_tier == "medium"
+        assert not lease.cpi_linked
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,202 @@
+"""
+Unit tests for incremental pipeline runs and the run manifest
+"""
+import pytest
+import json
+import os
+import sys
+from datetime import datetime
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import manual_overrides
+import process_leases
+from credit_cache import DAY, CreditCache
+from process_leases import manifest_config, run_pipeline
+from run_manifest import RunManifest, fingerprint
+
+
+def fake_credit(name):
+    return {"company_name": name, "risk_tier": "low", "data_sources": ["Test"]}
+
+
+LEASES = [
+    {"name": "Alpha", "annual_rent": 95680, "term_years": 25, "escalator": 0.025, "developer": "Alpha Solar"},
+    {"name": "Bravo", "annual_rent": 230000, "term_years": 25, "escalator": 0.015},
+    {"name": "Charlie", "annual_rent": 52500, "term_years": 30, "escalator": 0.025},
+]
+
+
+@pytest.fixture
+def lease_folder(tmp_path):
+    folder = tmp_path / "leases"
+    folder.mkdir()
+    for i, lease in enumerate(LEASES):
+        (folder / f"{i:02d}_{lease['name'].lower()}.json").write_text(json.dumps(lease))
+    return folder
+
+
+@pytest.fixture
+def manifest_path(tmp_path):
+    return tmp_path / "out" / "lease_manifest.json"
+
+
+def incremental_run(folder, manifest_path, discount_rate=0.10):
+    """One --incremental run; returns (book, paths that were processed)."""
+    documents = process_leases.find_documents(folder)
+    manifest = RunManifest.load(manifest_path, manifest_config(discount_rate))
+    with patch('process_leases.process_lease_document',
+               wraps=process_leases.process_lease_document) as processed:
+        book = run_pipeline(documents, discount_rate, manifest=manifest)
+    return book, [call.args[0].name for call in processed.call_args_list]
+
+
+@patch('process_leases.quick_lookup', side_effect=fake_credit)
+class TestIncrementalRun:
+    """Test which documents an incremental run re-processes."""
+
+    def test_second_run_processes_nothing(self, mock_lookup, lease_folder, manifest_path):
+        """Test unchanged documents are served from the manifest."""
+        first, processed = incremental_run(lease_folder, manifest_path)
+        assert len(processed) == 3
+        second, processed = incremental_run(lease_folder, manifest_path)
+        assert processed == []
+        assert [r.name for r in second] == ["Alpha", "Bravo", "Charlie"]
+        assert second.totals() == first.totals()
+        assert second[0].credit_data == first[0].credit_data
+
+    def test_matches_full_run(self, mock_lookup, lease_folder, manifest_path):
+        """Test a reused book equals a non-incremental run field for field."""
+        incremental_run(lease_folder, manifest_path)
+        reused, _ = incremental_run(lease_folder, manifest_path)
+        full = run_pipeline(process_leases.find_documents(lease_folder))
+        for a, b in zip(reused, full):
+            assert (a.name, a.pv_value, a.buyout_offer, a.total_potential_term) == \
+                (b.name, b.pv_value, b.buyout_offer, b.total_potential_term)
+
+    def test_touched_file_not_reprocessed(self, mock_lookup, lease_folder, manifest_path):
+        """Test a new mtime with identical content is not re-processed."""
+        incremental_run(lease_folder, manifest_path)
+        path = lease_folder / "01_bravo.json"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        _, processed = incremental_run(lease_folder, manifest_path)
+        assert processed == []
+        # The new mtime is remembered, so the next run skips hashing too
+        entry = json.loads(manifest_path.read_text())['documents'][str(path)]
+        assert entry['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+    def test_edited_and_new_files(self, mock_lookup, lease_folder, manifest_path):
+        """Test only edited and added documents are processed."""
+        incremental_run(lease_folder, manifest_path)
+        (lease_folder / "01_bravo.json").write_text(json.dumps({**LEASES[1], "annual_rent": 240000}))
+        (lease_folder / "03_delta.json").write_text(json.dumps({**LEASES[2], "name": "Delta"}))
+        book, processed = incremental_run(lease_folder, manifest_path)
+        assert sorted(processed) == ["01_bravo.json", "03_delta.json"]
+        assert [r.name for r in book] == ["Alpha", "Bravo", "Charlie", "Delta"]
+        assert book[1].annual_rent == 240000
+
+    def test_removed_file_pruned(self, mock_lookup, lease_folder, manifest_path):
+        """Test a deleted document drops out of the book and the manifest."""
+        incremental_run(lease_folder, manifest_path)
+        (lease_folder / "02_charlie.json").unlink()
+        book, processed = incremental_run(lease_folder, manifest_path)
+        assert processed == []
+        assert [r.name for r in book] == ["Alpha", "Bravo"]
+        assert len(json.loads(manifest_path.read_text())['documents']) == 2
+
+    def test_override_change_reprocesses_one(self, mock_lookup, lease_folder, manifest_path):
+        """Test editing one document's override re-processes only that document."""
+        incremental_run(lease_folder, manifest_path)
+        override = {**LEASES[0], "annual_rent": 100000}
+        with patch.dict(manual_overrides.MANUAL_LEASE_DATA, {"00_alpha.json": override}):
+            book, processed = incremental_run(lease_folder, manifest_path)
+        assert processed == ["00_alpha.json"]
+        assert book[0].annual_rent == 100000
+
+    def test_config_change_invalidates_all(self, mock_lookup, lease_folder, manifest_path):
+        """Test a different discount rate re-processes every document."""
+        incremental_run(lease_folder, manifest_path)
+        _, processed = incremental_run(lease_folder, manifest_path, discount_rate=0.08)
+        assert len(processed) == 3
+        _, processed = incremental_run(lease_folder, manifest_path, discount_rate=0.08)
+        assert processed == []
+
+    def test_registry_change_invalidates_all(self, mock_lookup, lease_folder, manifest_path, tmp_path):
+        """Test editing the --entity-registry file changes the manifest config."""
+        registry = tmp_path / "registry.json"
+        registry.write_text(json.dumps({"Alpha Solar": {"risk_tier": "low"}}))
+        before = manifest_config(0.10, registry)
+        assert before != manifest_config(0.10)
+        registry.write_text(json.dumps({"Alpha Solar": {"risk_tier": "high"}}))
+        assert manifest_config(0.10, registry) != before
+
+    def test_expired_credit_is_refreshed(self, mock_lookup, lease_folder, manifest_path):
+        """Test unchanged rows get new credit data once their assessment is past its TTL."""
+        mock_lookup.side_effect = lambda name: {**fake_credit(name), "data_sources": ["SEC EDGAR"],
+                                                "lookup_timestamp": "2025-01-01T00:00:00"}
+        incremental_run(lease_folder, manifest_path)
+        mock_lookup.side_effect = lambda name: {**fake_credit(name), "risk_tier": "high",
+                                                "data_sources": ["SEC EDGAR"],
+                                                "lookup_timestamp": "2025-01-10T00:00:00"}
+        documents = process_leases.find_documents(lease_folder)
+        fresh = CreditCache(clock=lambda: datetime(2025, 1, 5).timestamp())
+        manifest = RunManifest.load(manifest_path, manifest_config(0.10))
+        assert run_pipeline(documents, manifest=manifest, credit_cache=fresh)[0].risk_tier == "low"
+
+        stale = CreditCache(clock=lambda: datetime(2025, 1, 5).timestamp() + 7 * DAY)
+        manifest = RunManifest.load(manifest_path, manifest_config(0.10))
+        with patch('process_leases.process_lease_document') as processed:
+            book = run_pipeline(documents, manifest=manifest, credit_cache=stale)
+        assert not processed.called
+        assert book[0].risk_tier == "high" and book[0].buyout_offer > 0
+        assert [book[1].risk_tier, book[2].risk_tier] == ["medium", "medium"]  # no developer, no lookup
+        stored = RunManifest.load(manifest_path, manifest_config(0.10)).rows(documents)
+        assert stored[0]["credit_data"]["lookup_timestamp"] == "2025-01-10T00:00:00"
+
+    def test_failures_are_retried(self, mock_lookup, lease_folder, manifest_path):
+        """Test a document that raised is not recorded and runs again."""
+        broken = lease_folder / "03_broken.json"
+        broken.write_text(json.dumps({"name": "Broken", "annual_rent": "lots", "term_years": 25}))
+        incremental_run(lease_folder, manifest_path)
+        _, processed = incremental_run(lease_folder, manifest_path)
+        assert processed == ["03_broken.json"]
+
+
+class TestRunManifest:
+    """Test manifest persistence."""
+
+    def test_missing_or_corrupt_starts_empty(self, tmp_path):
+        """Test unreadable manifests are treated as empty."""
+        path = tmp_path / "manifest.json"
+        assert RunManifest.load(path, "cfg").documents == {}
+        path.write_text("{not json")
+        assert RunManifest.load(path, "cfg").documents == {}
+
+    def test_save_is_skipped_when_clean(self, tmp_path):
+        """Test a run that changed nothing does not rewrite the manifest."""
+        doc = tmp_path / "lease.json"
+        doc.write_text("{}")
+        path = tmp_path / "manifest.json"
+        manifest = RunManifest.load(path, "cfg")
+        manifest.record(doc, "rules", None)
+        manifest.save()
+        mtime = path.stat().st_mtime_ns
+        os.utime(path, ns=(mtime - 10**9, mtime - 10**9))
+
+        reloaded = RunManifest.load(path, "cfg")
+        assert reloaded.changed([doc], lambda p: "rules") == []
+        reloaded.save()
+        assert path.stat().st_mtime_ns == mtime - 10**9
+        assert list(tmp_path.glob("*.tmp")) == []
+
+    def test_fingerprint_is_order_independent(self):
+        """Test dict key order does not change a fingerprint."""
+        assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,100 @@
+"""
+Unit tests for the scenario grid / sensitivity sweep
+"""
+import pytest
+import csv
+import numpy as np
+import sys
+import os
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lease_valuation import LeaseParams, PortfolioValuer, pv_buyout, pv_buyout_batch
+from scenarios import scenario_grid
+
+RATES = [0.06, 0.10, 0.14]
+PCTS = [0.75, 0.85, 0.90]
+SHOCKS = [-0.005, 0.0, 0.01]
+
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(9)
+    n = 500
+    return PortfolioValuer(
+        annual_rent=rng.uniform(5000, 500000, n).round(),
+        term_years=rng.integers(15, 46, n),
+        escalator=rng.choice([0.0, 0.01, 0.025], n),
+        balloon_cost=rng.choice([0.0, 25000.0], n),
+    )
+
+
+class TestScenarioGrid:
+    """Test the cube against the per-scenario batch pricer."""
+
+    def test_matches_pv_buyout_batch(self, book):
+        """Test every cell equals pv_buyout_batch with the shocked escalator."""
+        grid = scenario_grid(book, RATES, PCTS, SHOCKS)
+        assert grid.shape == (3, 3, 3, 500)
+        for i, rate in enumerate(RATES):
+            for k, shock in enumerate(SHOCKS):
+                for pct in PCTS:
+                    expected = pv_buyout_batch(
+                        annual_rent=book.annual_rent, term_years=book.term_years,
+                        escalator=book.escalator + shock, discount_rate=rate,
+                        buyout_pct=pct, balloon_cost=book.balloon_cost,
+                    )
+                    np.testing.assert_array_equal(grid.offers(pct)[i, k], expected)
+
+    def test_matches_scalar_pv_buyout(self):
+        """Test LeaseParams input and a single lease agree with pv_buyout."""
+        lease = LeaseParams(annual_rent=95680, term_years=23, escalator=0.025)
+        grid = scenario_grid([lease], [0.10], [0.80])
+        assert grid.offers(0.80)[0, 0, 0] == 819461.21 == pv_buyout(
+            annual_rent=95680, term_years=23, escalator=0.025, discount_rate=0.10, buyout_pct=0.80)
+
+    def test_portfolio_totals(self, book):
+        """Test portfolio offers sum the rounded per-lease offers."""
+        grid = scenario_grid(book, RATES, PCTS, SHOCKS)
+        totals = grid.portfolio_offers()
+        assert totals.shape == (3, 3, 3)
+        assert totals[1, 1, 1] == pytest.approx(book.buyout_offers(0.10, 0.85).sum(), abs=1e-6)
+        # Offers fall with the discount rate and rise with the buyout %
+        assert (np.diff(totals, axis=0) < 0).all()
+        assert (np.diff(totals, axis=1) > 0).all()
+
+    def test_rejects_zero_term(self):
+        """Test leases without a term are refused."""
+        with pytest.raises(ValueError):
+            scenario_grid(PortfolioValuer([1000.0], [0], [0.0], [0.0]), RATES, PCTS)
+
+
+class TestScenarioCSV:
+    """Test the CSV writers."""
+
+    def test_long_csv(self, book, tmp_path):
+        """Test one row per (rate, pct, shock) with portfolio totals."""
+        grid = scenario_grid(book, RATES, PCTS, SHOCKS)
+        path = tmp_path / "grid.csv"
+        grid.to_csv(path)
+        rows = list(csv.DictReader(open(path)))
+        assert len(rows) == 27
+        row = next(r for r in rows if (r["discount_rate"], r["buyout_pct"], r["escalator_shock"]) == ("0.1", "0.85", "0.0"))
+        assert float(row["portfolio_offer"]) == pytest.approx(grid.portfolio_offers()[1, 1, 1], abs=0.01)
+
+    def test_heatmap_csv(self, book, tmp_path):
+        """Test the heatmap is a rate x pct matrix for the chosen shock."""
+        grid = scenario_grid(book, RATES, PCTS, SHOCKS)
+        path = tmp_path / "heatmap.csv"
+        grid.to_heatmap_csv(path, escalator_shock=0.01)
+        rows = list(csv.reader(open(path)))
+        assert rows[0] == ["discount_rate", "0.75", "0.85", "0.9"]
+        assert [r[0] for r in rows[1:]] == ["0.06", "0.1", "0.14"]
+        assert float(rows[1][1]) == pytest.approx(grid.portfolio_offers()[0, 0, 2], abs=0.01)
+        with pytest.raises(ValueError):
+            grid.to_heatmap_csv(path, escalator_shock=0.5)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,99 @@
+"""
+Unit tests for the synthetic lease corpus generator
+"""
+import pytest
+import json
+import re
+import sys
+import os
+import time
+import zipfile
+from unittest.mock import patch
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from synthetic_leases import TRUTH_DIR, evaluate_corpus, generate_corpus, load_truth
+from document_extractor import extract_lease_data_from_text
+from process_leases import find_documents, process_documents
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    generate_corpus(tmp_path, 60, formats=('txt', 'pdf', 'docx', 'json'), seed=7, size_kb=4, adversarial=0.1)
+    return tmp_path
+
+
+class TestGeneration:
+    """Test the corpus is reproducible and well-formed."""
+
+    def test_deterministic_across_workers(self, tmp_path):
+        """Test the same seed writes identical documents sequentially and in parallel."""
+        generate_corpus(tmp_path / 'a', 30, seed=3, chunk=7)
+        generate_corpus(tmp_path / 'b', 30, seed=3, chunk=7, workers=2)
+        for path in (tmp_path / 'a').glob('*.txt'):
+            assert path.read_text() == (tmp_path / 'b' / path.name).read_text()
+        generate_corpus(tmp_path / 'c', 1, seed=4)
+        assert (tmp_path / 'c' / 'synthetic_lease_000000.txt').read_text() != \
+            (tmp_path / 'a' / 'synthetic_lease_000000.txt').read_text()
+
+    def test_truth_kept_out_of_pipeline_input(self, corpus):
+        """Test every document has a truth record that find_documents does not pick up."""
+        truths = [load_truth(corpus, f"synthetic_lease_{i:06d}") for i in range(60)]
+        assert any(t['adversarial'] for t in truths)
+        assert all(t['annual_rent'] >= 1000 for t in truths if not t['adversarial'])
+        assert not any(TRUTH_DIR in p.parts for p in find_documents(corpus))
+
+    def test_binary_formats_are_valid(self, corpus):
+        """Test DOCX is a Word package and the PDF's xref points at its objects."""
+        with zipfile.ZipFile(corpus / 'synthetic_lease_000001.docx') as docx:
+            assert 'word/document.xml' in docx.namelist()
+            assert 'Lessee:' in docx.read('word/document.xml').decode()
+        pdf = (corpus / 'synthetic_lease_000001.pdf').read_bytes()
+        assert pdf.startswith(b'%PDF-1.4') and pdf.rstrip().endswith(b'%%EOF')
+        xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+        offsets = [int(o) for o in re.findall(rb'(\d{10}) 00000 n', pdf[xref:])]
+        for number, offset in enumerate(offsets, 1):
+            assert pdf[offset:].startswith(b'%d 0 obj' % number)
+        assert b'/Count 2' in pdf  # 4 KB of text spans two pages
+
+    def test_unknown_format_rejected(self, tmp_path):
+        """Test an unsupported format is an error before anything is written."""
+        with pytest.raises(ValueError):
+            generate_corpus(tmp_path / 'x', 1, formats=('rtf',))
+        assert not (tmp_path / 'x').exists()
+
+
+class TestExtraction:
+    """Test the corpus against the extractor and the pipeline."""
+
+    def test_extraction_accuracy(self, corpus):
+        """Test the extractor recovers the stated terms from plain text."""
+        accuracy = evaluate_corpus(corpus, sorted(corpus.glob('*.txt')))
+        assert accuracy['annual_rent'] >= 0.95
+        assert accuracy['escalator'] >= 0.95
+        assert accuracy['developer'] >= 0.85
+        assert accuracy['term_years'] >= 0.6  # renewals are folded into the term when it stays <= 35
+
+    def test_adversarial_text_is_fast_and_empty(self, tmp_path):
+        """Test keyword-dense text without values yields no rent or term in bounded time."""
+        generate_corpus(tmp_path, 3, seed=1, size_kb=64, adversarial=1.0)
+        for path in sorted(tmp_path.glob('*.txt')):
+            start = time.perf_counter()
+            data = extract_lease_data_from_text(path.read_text(), path.stem)
+            assert time.perf_counter() - start < 5
+            assert data.get('annual_rent') is None and data.get('term_years') is None
+
+    @patch('process_leases.quick_lookup', side_effect=lambda name: {"company_name": name, "risk_tier": "low"})
+    def test_json_corpus_runs_through_pipeline(self, mock_lookup, tmp_path):
+        """Test JSON output is valid pipeline input."""
+        generate_corpus(tmp_path, 20, formats=('json',), seed=2)
+        outcomes = process_documents(find_documents(tmp_path))
+        assert len(outcomes) == 20 and all(o.result is not None for o in outcomes)
+        by_name = {o.result.name: o.result for o in outcomes}
+        truth = load_truth(tmp_path, 'synthetic_lease_000005')
+        assert by_name[truth['name']].annual_rent == truth['annual_rent']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])